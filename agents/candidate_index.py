@@ -0,0 +1,375 @@
+"""
+Candidate Index - Approximate nearest-neighbour search over evaluated resumes.
+
+Every saved evaluation's resume is embedded (one unit vector: the normalized
+mean of its chunk embeddings, see embeddings.py) and added to an IVF index:
+
+- below IVF_MIN_VECTORS candidates, search is an exact matrix-vector product
+- above it, k-means partitions the vectors into ~sqrt(N) lists; a query
+  scores the centroids and only searches the IVF_NPROBE closest lists
+- new candidates are assigned to their nearest list as they are added; the
+  partitions are retrained once the index has doubled since the last training
+
+The index lives in data/candidate_index and is loaded on first use:
+
+    vectors.bin    fixed-size (list, vector) records, one per row
+    ids.txt        evaluation id per row
+    centroids.npy  IVF centroids
+    index.json     model, dimension and committed row count
+
+New rows are appended and replaced rows rewritten in place, in batches; only
+retraining rewrites the files. Vectors from one embedding model only: when the
+configured model changes, rebuild_candidate_index() re-embeds every resume
+into a fresh index and swaps it in.
+"""
+
+import json
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from embeddings import chunk_text, embed_texts
+from hybrid_model import get_hybrid_client
+
+CANDIDATE_INDEX_DIR = Path(__file__).parent.parent / "data" / "candidate_index"
+# Exact search below this many candidates
+IVF_MIN_VECTORS = 1024
+# Lists searched per query
+IVF_NPROBE = 8
+KMEANS_ITERATIONS = 10
+# Vectors sampled for k-means training
+KMEANS_SAMPLE = 20000
+# Changed rows are persisted in batches of this many, or after this long
+INDEX_FLUSH_EVERY = 64
+INDEX_FLUSH_SECONDS = 5.0
+
+
+def document_vector(text: str, model: Optional[str] = None) -> Optional[np.ndarray]:
+    """Unit vector for a whole document (mean of its normalized chunk embeddings)."""
+    chunks = chunk_text(text or "")
+    if not chunks:
+        return None
+    vectors = embed_texts(chunks, model=model)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    mean = vectors.mean(axis=0)
+    return (mean / max(float(np.linalg.norm(mean)), 1e-12)).astype(np.float32)
+
+
+def _kmeans(vectors: np.ndarray, clusters: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids (unit length)."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > KMEANS_SAMPLE:
+        vectors = vectors[rng.choice(len(vectors), KMEANS_SAMPLE, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Empty lists keep their previous centroid
+        centroids = np.where(empty[:, None], centroids, sums / np.maximum(norms, 1e-12))
+    return centroids.astype(np.float32)
+
+
+class CandidateIndex:
+    """
+    IVF index of candidate resume vectors keyed by evaluation id.
+    """
+
+    def __init__(self, index_dir: Path = CANDIDATE_INDEX_DIR):
+        self.index_dir = Path(index_dir)
+        self._lock = threading.Lock()
+        self.model: Optional[str] = None
+        self.ids: List[str] = []
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._positions: Dict[str, int] = {}
+        # Row buffers with spare capacity; rows [0, len(ids)) are in use
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._assign = np.zeros(0, dtype=np.int32)
+        # Persistence state: rows on disk, rows changed since, full rewrite due
+        self._saved_count = 0
+        self._dirty: Set[int] = set()
+        self._rewrite = False
+        self._last_flush = time.monotonic()
+        # Set once a rebuilt index has replaced this one on disk
+        self._retired = False
+        self._load()
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:len(self.ids)]
+
+    @property
+    def assign(self) -> np.ndarray:
+        return self._assign[:len(self.ids)]
+
+    def _record_dtype(self) -> np.dtype:
+        return np.dtype([("assign", "<i4"), ("vector", "<f4", (self._vectors.shape[1],))])
+
+    def _records(self, rows: np.ndarray) -> np.ndarray:
+        records = np.empty(len(rows), dtype=self._record_dtype())
+        records["assign"] = self._assign[rows]
+        records["vector"] = self._vectors[rows]
+        return records
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_dir / "index.json") as f:
+                meta = json.load(f)
+            count, dim = meta["count"], meta["dim"]
+            with open(self.index_dir / "ids.txt") as f:
+                ids = f.read().splitlines()[:count]
+            records = np.fromfile(
+                self.index_dir / "vectors.bin",
+                dtype=np.dtype([("assign", "<i4"), ("vector", "<f4", (dim,))]),
+                count=count,
+            )
+            centroids_path = self.index_dir / "centroids.npy"
+            centroids = np.load(centroids_path) if centroids_path.exists() else None
+        except (OSError, ValueError, KeyError):
+            return
+        if len(ids) != count or len(records) != count:
+            print("> [CandidateIndex] Index files are incomplete; re-adding saved evaluations", file=sys.stderr)
+            return
+        self._reserve(count, dim)
+        self.model = meta.get("model")
+        self.ids = ids
+        self.trained_size = meta.get("trained_size", 0)
+        self.centroids = centroids
+        self._vectors[:count] = records["vector"]
+        self._assign[:count] = records["assign"]
+        self._positions = {eval_id: i for i, eval_id in enumerate(ids)}
+        self._saved_count = count
+        # Drop rows appended after the last committed flush
+        with open(self.index_dir / "vectors.bin", "r+b") as f:
+            f.truncate(count * records.dtype.itemsize)
+        with open(self.index_dir / "ids.txt", "w") as f:
+            f.writelines(eval_id + "\n" for eval_id in ids)
+        print(f"> [CandidateIndex] Loaded {len(ids)} candidates ({self.model})", file=sys.stderr)
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        """Grow the row buffers (doubling) to hold rows vectors. Caller holds the lock."""
+        if self._vectors.shape[1] != dim:
+            self._vectors = np.zeros((0, dim), dtype=np.float32)
+        if rows <= len(self._vectors):
+            return
+        capacity = max(rows, 2 * len(self._vectors), 64)
+        vectors = np.zeros((capacity, dim), dtype=np.float32)
+        assign = np.zeros(capacity, dtype=np.int32)
+        count = len(self.ids)
+        vectors[:count] = self._vectors[:count]
+        assign[:count] = self._assign[:count]
+        self._vectors, self._assign = vectors, assign
+
+    def _flush(self) -> None:
+        """
+        Persist changed rows, then ids, then the metadata that commits them. Caller holds the lock.
+
+        Rows are appended to vectors.bin / ids.txt and updated in place; only
+        retraining (which reassigns every row) rewrites the files.
+        """
+        if self._retired or not (self._dirty or self._rewrite):
+            return
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        count = len(self.ids)
+        records_path = self.index_dir / "vectors.bin"
+        if self._rewrite or self._saved_count == 0:
+            tmp_path = self.index_dir / "vectors.bin.tmp"
+            self._records(np.arange(count)).tofile(tmp_path)
+            tmp_path.replace(records_path)
+            tmp_path = self.index_dir / "ids.txt.tmp"
+            with open(tmp_path, "w") as f:
+                f.writelines(eval_id + "\n" for eval_id in self.ids)
+            tmp_path.replace(self.index_dir / "ids.txt")
+            if self.centroids is not None:
+                tmp_path = self.index_dir / "centroids.tmp.npy"
+                np.save(tmp_path, self.centroids)
+                tmp_path.replace(self.index_dir / "centroids.npy")
+        else:
+            itemsize = self._record_dtype().itemsize
+            with open(records_path, "r+b") as f:
+                for row in sorted(row for row in self._dirty if row < self._saved_count):
+                    f.seek(row * itemsize)
+                    f.write(self._records(np.array([row])).tobytes())
+                f.seek(self._saved_count * itemsize)
+                f.write(self._records(np.arange(self._saved_count, count)).tobytes())
+            with open(self.index_dir / "ids.txt", "a") as f:
+                f.writelines(eval_id + "\n" for eval_id in self.ids[self._saved_count:])
+
+        tmp_path = self.index_dir / "index.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "model": self.model,
+                "dim": int(self._vectors.shape[1]),
+                "count": count,
+                "trained_size": self.trained_size,
+            }, f)
+        tmp_path.replace(self.index_dir / "index.json")
+        self._saved_count = count
+        self._dirty.clear()
+        self._rewrite = False
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        """Persist rows added since the last flush."""
+        with self._lock:
+            self._flush()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, eval_id: str) -> bool:
+        return eval_id in self._positions
+
+    def _train(self) -> None:
+        """(Re)partition into ~sqrt(N) lists. Caller holds the lock."""
+        vectors = self.vectors
+        clusters = max(1, int(np.sqrt(len(vectors))))
+        self.centroids = _kmeans(vectors, clusters)
+        self._assign[:len(vectors)] = np.argmax(vectors @ self.centroids.T, axis=1)
+        self.trained_size = len(vectors)
+        self._rewrite = True
+
+    def add(self, eval_id: str, vector: np.ndarray, model: Optional[str] = None) -> bool:
+        """
+        Add or replace a candidate's vector.
+
+        Changes are written every INDEX_FLUSH_EVERY rows or INDEX_FLUSH_SECONDS
+        (and on flush()); rows lost to a crash are re-added by the backfill.
+
+        Returns:
+            False when the vector can't join this index (another embedding
+            model or dimension; see rebuild_candidate_index)
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if self._retired:
+                return False
+            if self.ids and (model != self.model or self._vectors.shape[1] != len(vector)):
+                print(f"> [CandidateIndex] Skipped {eval_id}: embedded with {model} ({len(vector)} dims) "
+                      f"but the index holds {self.model} ({self._vectors.shape[1]} dims); "
+                      f"re-embed to switch models", file=sys.stderr)
+                return False
+            if not self.ids:
+                self.model = model
+
+            cluster = int(np.argmax(self.centroids @ vector)) if self.centroids is not None else 0
+            position = self._positions.get(eval_id)
+            if position is None:
+                position = len(self.ids)
+                self._reserve(position + 1, len(vector))
+                self._positions[eval_id] = position
+                self.ids.append(eval_id)
+            self._vectors[position] = vector
+            self._assign[position] = cluster
+            self._dirty.add(position)
+
+            if len(self.ids) >= IVF_MIN_VECTORS and len(self.ids) >= 2 * self.trained_size:
+                self._train()
+            if len(self._dirty) >= INDEX_FLUSH_EVERY or time.monotonic() - self._last_flush >= INDEX_FLUSH_SECONDS:
+                self._flush()
+            return True
+
+    def add_text(self, eval_id: str, resume_text: str, model: Optional[str] = None) -> bool:
+        """Embed a resume (with the index's model by default) and add it; False when it has no text."""
+        model = model or self.model or get_hybrid_client().embed_model
+        vector = document_vector(resume_text, model=model)
+        if vector is None:
+            return False
+        return self.add(eval_id, vector, model=model)
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: int = IVF_NPROBE) -> List[Tuple[str, float]]:
+        """Top-k (evaluation id, cosine similarity) for a unit query vector."""
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            if not self.ids or self._vectors.shape[1] != len(query):
+                return []
+            if self.centroids is None:
+                candidates = np.arange(len(self.ids))
+            else:
+                probe = np.argsort(-(self.centroids @ query))[:nprobe]
+                candidates = np.flatnonzero(np.isin(self.assign, probe))
+            scores = self._vectors[candidates] @ query
+            ids = self.ids
+        k = min(k, len(candidates))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[candidates[i]], round(float(scores[i]), 4)) for i in top]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "candidates": len(self.ids),
+                "model": self.model,
+                "lists": 0 if self.centroids is None else len(self.centroids),
+                "trained_size": self.trained_size,
+                "unsaved": len(self._dirty),
+            }
+
+
+_candidate_index: Optional[CandidateIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_candidate_index() -> CandidateIndex:
+    """Get or load the global candidate index"""
+    global _candidate_index
+    with _index_lock:
+        if _candidate_index is None:
+            _candidate_index = CandidateIndex()
+        return _candidate_index
+
+
+def rebuild_candidate_index(documents: Iterable[Tuple[str, str]], model: str) -> CandidateIndex:
+    """
+    Re-embed (eval_id, resume text) documents with model into a fresh index and swap it in.
+
+    The current index keeps serving searches (with its own model) until the
+    new one is complete; an embedding failure leaves it in place.
+    """
+    global _candidate_index
+    staging_dir = CANDIDATE_INDEX_DIR.with_name(CANDIDATE_INDEX_DIR.name + ".rebuild")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    rebuilt = CandidateIndex(staging_dir)
+    for eval_id, resume_text in documents:
+        rebuilt.add_text(eval_id, resume_text, model=model)
+    rebuilt.flush()
+
+    old_dir = CANDIDATE_INDEX_DIR.with_name(CANDIDATE_INDEX_DIR.name + ".old")
+    with _index_lock:
+        if _candidate_index is not None:
+            with _candidate_index._lock:
+                _candidate_index._retired = True
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if CANDIDATE_INDEX_DIR.exists():
+            CANDIDATE_INDEX_DIR.rename(old_dir)
+        staging_dir.rename(CANDIDATE_INDEX_DIR)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        with rebuilt._lock:
+            rebuilt.index_dir = CANDIDATE_INDEX_DIR
+        _candidate_index = rebuilt
+    print(f"> [CandidateIndex] Rebuilt {len(rebuilt)} candidates with {model}", file=sys.stderr)
+    return rebuilt
+
+
+def search_candidates(job_description: str, k: int = 10) -> List[Tuple[str, float]]:
+    """
+    Top-k evaluated candidates for a job description.
+
+    Raises:
+        RuntimeError: if the embedding endpoint is unavailable
+    """
+    index = get_candidate_index()
+    query = document_vector(job_description, model=index.model)
+    if query is None:
+        return []
+    return index.search(query, k)
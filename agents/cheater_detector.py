@@ -17,6 +17,8 @@ from dataclasses import dataclass, field
 
 import structlog
 
+from repo_features import get_repo_features
+
 logger = structlog.get_logger(__name__)
 
 
@@ -207,18 +209,15 @@ def detect_github_gaming(github_analysis: Optional[dict] = None) -> tuple[bool,
     if not github_analysis:
         return False, findings
     
-    metadata = github_analysis.get("metadata", {})
+    features = get_repo_features(github_analysis)
     
     # Check if it's just a fork with no original work
-    if metadata.get("is_fork", False):
+    if features.is_fork:
         findings.append("Repository is a fork (may not be original work)")
     
     # Check for very recent account but claiming experience
-    created_at = metadata.get("created_at", "")
-    if created_at:
-        # Simple year extraction
-        if "2025" in created_at or "2026" in created_at:
-            findings.append("GitHub repository created very recently")
+    if features.created_year in (2025, 2026):
+        findings.append("GitHub repository created very recently")
     
     is_flagged = len(findings) > 0
     return is_flagged, findings
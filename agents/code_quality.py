@@ -15,6 +15,8 @@ from dataclasses import dataclass
 
 import structlog
 
+from repo_features import get_repo_features
+
 logger = structlog.get_logger(__name__)
 
 
@@ -167,10 +169,8 @@ def scan_code_quality(
     # If we have pre-fetched GitHub analysis
     if github_analysis:
         content = github_analysis.get("content", {})
-        metadata = github_analysis.get("metadata", {})
-        
-        if metadata:
-            primary_language = metadata.get("language", "Unknown")
+        features = get_repo_features(github_analysis)
+        primary_language = features.primary_language
         
         # Analyze main files
         main_files = content.get("main_files", {})
@@ -183,35 +183,31 @@ def scan_code_quality(
                 files_analyzed += 1
         
         # Bonus for having tests
-        file_tree = content.get("file_tree", [])
-        test_files = [f for f in file_tree if "test" in f.lower()]
-        if test_files:
-            all_positives.append(f"Test suite present ({len(test_files)} test files)")
+        test_count = features.count("test")
+        if test_count:
+            all_positives.append(f"Test suite present ({test_count} test files)")
             total_score += 10
         
         # Bonus for CI/CD
-        ci_files = [f for f in file_tree if any(ci in f.lower() for ci in [".github/workflows", "jenkinsfile", ".gitlab-ci", ".travis"])]
-        if ci_files:
+        if features.count("ci"):
             all_positives.append("CI/CD configuration present")
             total_score += 5
         
         # Bonus for documentation
-        doc_files = [f for f in file_tree if any(d in f.lower() for d in ["docs/", "documentation/", "wiki/"])]
-        if doc_files:
+        if features.count("docs"):
             all_positives.append("Documentation directory present")
             total_score += 5
         
         # Analyze README quality
-        readme = content.get("readme", "")
-        if readme:
+        if features.readme_length:
             files_analyzed += 1
-            if len(readme) > 500:
+            if features.readme_length > 500:
                 all_positives.append("Comprehensive README")
                 total_score += 5
-            if "## Installation" in readme or "## Setup" in readme:
+            if features.has_section("Installation", "Setup"):
                 all_positives.append("README has installation instructions")
                 total_score += 3
-            if "## Usage" in readme or "## Examples" in readme:
+            if features.has_section("Usage", "Examples"):
                 all_positives.append("README has usage examples")
                 total_score += 3
     
@@ -238,11 +234,7 @@ def scan_code_quality(
                 }
             
             # Convert to dict and recurse
-            github_dict = {
-                "metadata": analysis.metadata.__dict__ if analysis.metadata else {},
-                "content": analysis.content.__dict__ if analysis.content else {}
-            }
-            return scan_code_quality(github_analysis=github_dict)
+            return scan_code_quality(github_analysis=analysis.as_dict())
             
         except ImportError:
             logger.warning("GitHub fetcher not available, using fallback")
@@ -2,29 +2,49 @@
 Enhanced Code Quality Agent - AI-Powered Code Analysis
 """
 
-import json
 import sys
 import os
-import re
 import base64
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from hybrid_model import get_hybrid_client
+from hedging import hedged_call
+from prompt_compaction import compact_code
 
-def scan_code_quality(code_sample, use_ai_models=True, ollama_available=True):
-    """Analyze code quality using AI if available"""
+CODE_QUALITY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 100},
+        "verdict": {"type": "string", "enum": ["GOOD", "BAD", "EXCELLENT", "ACCEPTABLE"]},
+        "flags": {"type": "array", "items": {"type": "string"}},
+        "security_risk": {"type": "string", "enum": ["LOW", "MEDIUM", "HIGH"]},
+    },
+    "required": ["score", "verdict", "flags", "security_risk"],
+}
+
+def scan_code_quality(code_sample, use_ai_models=True, ollama_available=True, fused_verdict=None, on_upgrade=None):
+    """Analyze code quality using AI if available (reusing a fused verdict section when given)"""
     print(f"> [CodeQualityEnhanced] Analyzing code...", file=sys.stderr)
     
     # AI Analysis
     if use_ai_models and ollama_available and len(code_sample) > 10:
-        try:
-            client = get_hybrid_client()
-            prompt = f"""You are a Senior Principal Engineer. Analyze this code snippet for security vulnerabilities, best practices, and maintainability.
+        section = (fused_verdict or {}).get('sections', {}).get('code_quality')
+        if section is not None:
+            result = dict(section)
+            result['agent'] = 'code_quality'
+            result['backend_used'] = fused_verdict.get('backend', 'ollama')
+            result['mode'] = 'fused'
+            return result
+        
+        def ask_llm():
+            try:
+                client = get_hybrid_client()
+                prompt = f"""You are a Senior Principal Engineer. Analyze this code snippet for security vulnerabilities, best practices, and maintainability.
 
 Code Snippet:
-{code_sample[:1500]}
+{compact_code(code_sample)}
 
 Return ONLY a valid JSON object:
 {{
@@ -34,19 +54,25 @@ Return ONLY a valid JSON object:
     "security_risk": "<LOW|MEDIUM|HIGH>"
 }}
 """
-            response = client.chat(prompt, max_tokens=300, temperature=0.2)
-            
-            text = response.get('response', '{}')
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                result['agent'] = 'code_quality'
-                result['backend_used'] = response.get('backend', 'ollama')
-                return result
+                response = client.chat(prompt, max_tokens=300, temperature=0.2, stop_at_json=True, schema=CODE_QUALITY_SCHEMA)
                 
-        except Exception as e:
-            print(f"> [CodeQualityEnhanced] AI failed: {e}", file=sys.stderr)
+                result = response.get('parsed')
+                if result is not None:
+                    result['agent'] = 'code_quality'
+                    result['backend_used'] = response.get('backend', 'ollama')
+                    return result
+                    
+            except Exception as e:
+                print(f"> [CodeQualityEnhanced] AI failed: {e}", file=sys.stderr)
+            return None
+        
+        return hedged_call('code_quality', ask_llm, lambda: _heuristic_code_quality(code_sample), on_upgrade)
+
+    return _heuristic_code_quality(code_sample)
+
 
+def _heuristic_code_quality(code_sample):
+    """Pattern heuristics used when the LLM is unavailable or too slow"""
     # Fallback Heuristics
     score = 75
     flags = []
@@ -5,16 +5,26 @@ Enhanced Competitive Programming Agent - AI-Powered Analysis
 import json
 import sys
 import os
-import re
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from hybrid_model import get_hybrid_client
-from competitive_programming import evaluate_cp_profile
+from hedging import hedged_call
+from problem_solving import evaluate_cp_profile
 
-def analyze_cp_enhanced(leetcode_user, codeforces_user=None, use_ai_models=True, ollama_available=True):
-    """Analyze CP profile and generate AI reasoning"""
+CP_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 10},
+        "reasoning": {"type": "string"},
+        "verdict": {"type": "string", "enum": ["Strong", "Competent", "Weak", "Unknown"]},
+    },
+    "required": ["score", "reasoning", "verdict"],
+}
+
+def analyze_cp_enhanced(leetcode_user, codeforces_user=None, use_ai_models=True, ollama_available=True, fused_verdict=None, on_upgrade=None):
+    """Analyze CP profile and generate AI reasoning (reusing a fused verdict section when given)"""
     print(f"> [CPEnhanced] Analyzing LC:{leetcode_user} CF:{codeforces_user}", file=sys.stderr)
     
     # 1. Get deterministic stats
@@ -22,10 +32,19 @@ def analyze_cp_enhanced(leetcode_user, codeforces_user=None, use_ai_models=True,
     
     # 2. AI Synthesis
     if use_ai_models and ollama_available:
-        try:
-            client = get_hybrid_client()
-            
-            prompt = f"""You are a Competitive Programming Coach. Analyze these stats and provide a verdict on the candidate's algorithmic ability.
+        section = (fused_verdict or {}).get('sections', {}).get('cp')
+        if section is not None:
+            stats_result['reasoning'] = section.get('reasoning', stats_result['reasoning'])
+            stats_result['verdict'] = section.get('verdict', 'Unknown')
+            stats_result['backend_used'] = 'hybrid (stats+ai)'
+            stats_result['mode'] = 'fused'
+            return stats_result
+        
+        def ask_llm():
+            try:
+                client = get_hybrid_client()
+                
+                prompt = f"""You are a Competitive Programming Coach. Analyze these stats and provide a verdict on the candidate's algorithmic ability.
             
             Stats:
             {json.dumps(stats_result['details'], indent=2)}
@@ -39,22 +58,24 @@ def analyze_cp_enhanced(leetcode_user, codeforces_user=None, use_ai_models=True,
                 "verdict": "<Strong|Competent|Weak|Unknown>"
             }}
             """
-            
-            response = client.chat(prompt, max_tokens=200, temperature=0.3)
-            text = response.get('response', '{}')
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            
-            if json_match:
-                ai_result = json.loads(json_match.group())
                 
-                # Merge AI reasoning with deterministic stats
-                stats_result['reasoning'] = ai_result.get('reasoning', stats_result['reasoning'])
-                stats_result['verdict'] = ai_result.get('verdict', 'Unknown')
-                stats_result['backend_used'] = 'hybrid (stats+ai)'
-                return stats_result
+                response = client.chat(prompt, max_tokens=200, temperature=0.3, stop_at_json=True, schema=CP_SCHEMA)
+                ai_result = response.get('parsed')
                 
-        except Exception as e:
-            print(f"> [CPEnhanced] AI failed: {e}", file=sys.stderr)
+                if ai_result is not None:
+                    
+                    # Merge AI reasoning with (a copy of) the deterministic stats
+                    merged = dict(stats_result)
+                    merged['reasoning'] = ai_result.get('reasoning', stats_result['reasoning'])
+                    merged['verdict'] = ai_result.get('verdict', 'Unknown')
+                    merged['backend_used'] = 'hybrid (stats+ai)'
+                    return merged
+                    
+            except Exception as e:
+                print(f"> [CPEnhanced] AI failed: {e}", file=sys.stderr)
+            return None
+        
+        return hedged_call('cp', ask_llm, lambda: {**stats_result, 'backend_used': 'heuristics'}, on_upgrade)
             
     stats_result['backend_used'] = 'heuristics'
     return stats_result
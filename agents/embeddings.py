@@ -0,0 +1,199 @@
+"""
+Embeddings - Text embeddings from the local Ollama server with a persistent vector cache.
+
+Vectors are keyed by a hash of (embedding model, text) and stored one .npy
+file per vector under data/vector_cache, so a resume chunk is embedded once
+ever and a job description once per process (later requests hit the
+in-memory layer). Concurrent requests for the same text share one call.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from hybrid_model import get_hybrid_client
+
+VECTOR_CACHE_DIR = Path(__file__).parent.parent / "data" / "vector_cache"
+# Vectors kept in memory on top of the disk cache
+VECTOR_MEMORY_ENTRIES = 20000
+# Chunk size for embedding long documents (nomic-embed-text handles ~2k tokens)
+CHUNK_CHARS = 1000
+# Texts sent per /api/embed call
+EMBED_BATCH_SIZE = 32
+
+
+def chunk_text(text: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """Split text into line-aligned chunks of at most max_chars (long lines are cut)."""
+    chunks, current, size = [], [], 0
+    for raw in text.splitlines():
+        line = " ".join(raw.split())
+        while len(line) > max_chars:
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if not line:
+            continue
+        if size + len(line) + 1 > max_chars and current:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class VectorCache:
+    """
+    Content-addressed float32 vector store: memory LRU over one file per vector.
+    """
+
+    def __init__(self, cache_dir: Path = VECTOR_CACHE_DIR, memory_entries: int = VECTOR_MEMORY_ENTRIES):
+        self.cache_dir = Path(cache_dir)
+        self.memory_entries = memory_entries
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._inflight: Dict[str, threading.Event] = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.npy"
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """Add to the memory layer. Caller holds the lock."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Cached vector (memory, then disk) or None."""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return vector
+        try:
+            vector = np.load(self._path(key))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self.stats["disk_hits"] += 1
+            self._remember(key, vector)
+        return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """Store a vector in memory and on disk."""
+        vector = np.asarray(vector, dtype=np.float32)
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, vector)
+            tmp_path.replace(path)
+        except OSError:
+            pass  # the memory layer still serves it
+        with self._lock:
+            self._remember(key, vector)
+
+    def claim(self, key: str) -> Optional[threading.Event]:
+        """
+        Reserve a missing key for the caller to compute.
+
+        Returns:
+            None when the caller now owns the key (call release() after
+            put()), or the event to wait on when another caller owns it
+        """
+        with self._lock:
+            event = self._inflight.get(key)
+            if event is None:
+                self._inflight[key] = threading.Event()
+                self.stats["misses"] += 1
+                return None
+            self.stats["coalesced"] += 1
+            return event
+
+    def release(self, key: str) -> None:
+        """Wake callers waiting on a claimed key."""
+        with self._lock:
+            event = self._inflight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def status(self) -> Dict[str, int]:
+        with self._lock:
+            return {"memory_entries": len(self._memory), **self.stats}
+
+
+_vector_cache: Optional[VectorCache] = None
+
+
+def get_vector_cache() -> VectorCache:
+    """Get or create the global vector cache"""
+    global _vector_cache
+    if _vector_cache is None:
+        _vector_cache = VectorCache()
+    return _vector_cache
+
+
+def embed_texts(texts: List[str], model: Optional[str] = None, cache: Optional[VectorCache] = None) -> np.ndarray:
+    """
+    Embeddings for texts as a (len(texts), dim) float32 matrix.
+
+    Cached vectors are reused; the rest are embedded in batches. A text that
+    another thread is already embedding is waited for instead of re-sent.
+
+    Raises:
+        RuntimeError: if the embedding endpoint is unavailable
+    """
+    client = get_hybrid_client()
+    cache = cache or get_vector_cache()
+    model = model or client.embed_model
+    keys = [cache.make_key(model, text) for text in texts]
+
+    vectors: Dict[str, np.ndarray] = {}
+    mine: Dict[str, str] = {}
+    waiting: Dict[str, threading.Event] = {}
+    for key, text in zip(keys, texts):
+        if key in vectors or key in mine or key in waiting:
+            continue
+        cached = cache.get(key)
+        if cached is not None:
+            vectors[key] = cached
+            continue
+        event = cache.claim(key)
+        if event is None:
+            mine[key] = text
+        else:
+            waiting[key] = event
+
+    try:
+        pending = list(mine.items())
+        for start in range(0, len(pending), EMBED_BATCH_SIZE):
+            batch = pending[start:start + EMBED_BATCH_SIZE]
+            embedded = client.embed([text for _, text in batch], model=model)
+            for (key, _), vector in zip(batch, embedded):
+                vector = np.asarray(vector, dtype=np.float32)
+                cache.put(key, vector)
+                vectors[key] = vector
+    finally:
+        for key in mine:
+            cache.release(key)
+
+    for key, event in waiting.items():
+        event.wait()
+        vector = cache.get(key)
+        if vector is None:
+            raise RuntimeError("embedding failed in a concurrent request")
+        vectors[key] = vector
+
+    return np.stack([vectors[key] for key in keys]) if keys else np.zeros((0, 0), dtype=np.float32)
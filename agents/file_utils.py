@@ -0,0 +1,44 @@
+"""
+File Utils - Small file helpers shared by the API server and offline tools.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any
+
+
+def _read_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Mode a plain open() gives a new file; read once at import, since setting
+# the umask to read it is process-wide and not thread-safe
+NEW_FILE_MODE = 0o666 & ~_read_umask()
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Write JSON via a temp file + rename so readers never see a partial file
+
+    The file keeps its existing permissions (new files get the umask default;
+    mkstemp alone would leave them 0600).
+    """
+    directory = os.path.dirname(path) or '.'
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = NEW_FILE_MODE
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,175 @@
+"""
+Fused Evaluation - One LLM call covering every enhanced agent for a candidate.
+
+The enhanced agents each send their own prompt, so a candidate costs four or
+five generations that all re-evaluate overlapping resume context. Fused mode
+sends a single prompt with one shared context block and asks for a combined
+verdict with one section per agent (each section uses that agent's schema).
+Agents accept the combined verdict via their fused_verdict argument and only
+fall back to their own prompt when their section is missing.
+"""
+
+import sys
+import json
+from typing import Any, Dict, Optional
+
+from hybrid_model import get_hybrid_client
+from model_router import DIFFICULTY_HARD
+from prompt_compaction import compact_code, compact_job, compact_resume
+from relevance_gate import gate_relevance
+from integrity_enhanced import INTEGRITY_SCHEMA
+from code_quality_enhanced import CODE_QUALITY_SCHEMA
+from uniqueness_enhanced import UNIQUENESS_SCHEMA
+from relevance_enhanced import RELEVANCE_SCHEMA
+from competitive_programming_enhanced import CP_SCHEMA
+
+# Per-agent section: schema, reviewer instruction and the token budget the
+# agent's own prompt uses (the fused call gets the sum of included sections)
+FUSED_SECTIONS = {
+    "integrity": (
+        INTEGRITY_SCHEMA,
+        "hiring integrity officer: check the resume for authenticity, hidden text, keyword stuffing or inconsistencies (score 0-10)",
+        300,
+    ),
+    "relevance": (
+        RELEVANCE_SCHEMA,
+        "technical recruiter: compare the resume to the job description (score 0-10)",
+        300,
+    ),
+    "code_quality": (
+        CODE_QUALITY_SCHEMA,
+        "senior principal engineer: review the code snippet for security vulnerabilities, best practices and maintainability (score 0-100)",
+        300,
+    ),
+    "uniqueness": (
+        UNIQUENESS_SCHEMA,
+        "startup CTO: decide whether the project is a generic tutorial clone or an original engineering project (score 0-10, 10 is highly original)",
+        200,
+    ),
+    "cp": (
+        CP_SCHEMA,
+        "competitive programming coach: judge algorithmic ability from the stats; Codeforces > 1600 is very strong and LeetCode Hards matter more than Easies (score 0-10)",
+        200,
+    ),
+}
+
+
+def build_fused_prompt(context: Dict[str, str], sections: list) -> str:
+    """Prompt with the shared candidate context and one instruction per section."""
+    blocks = []
+    if context.get("job_description"):
+        blocks.append(f"Job Description:\n{compact_job(context['job_description'])}")
+    if context.get("resume_text"):
+        blocks.append(f"Resume Excerpt:\n{compact_resume(context['resume_text'], job_description=context.get('job_description', ''))}")
+    if context.get("repo_url"):
+        blocks.append(f"Project: {context['repo_url']}")
+    if context.get("code_sample"):
+        blocks.append(f"Code Snippet:\n{compact_code(context['code_sample'])}")
+    if context.get("cp_stats"):
+        blocks.append(f"Competitive Programming Stats:\n{json.dumps(context['cp_stats'], indent=2)}")
+
+    reviewers = "\n".join(f'- "{name}": {FUSED_SECTIONS[name][1]}' for name in sections)
+    shared = "\n\n".join(blocks)
+
+    return f"""You are a hiring panel reviewing one candidate. Each reviewer below writes one section of a single verdict, using only the shared context.
+
+{shared}
+
+Reviewers:
+{reviewers}
+
+Return ONLY a valid JSON object with exactly these keys: {", ".join(sections)}. Each value is that reviewer's verdict.
+"""
+
+
+def applicable_sections(context: Dict[str, str]) -> list:
+    """Sections whose inputs are present in the context (relevance only when the heuristic is unsure)."""
+    sections = []
+    if context.get("resume_text"):
+        sections.append("integrity")
+    if context.get("resume_text") and context.get("job_description"):
+        if gate_relevance(context["resume_text"], context["job_description"])[1]["use_llm"]:
+            sections.append("relevance")
+    if len(context.get("code_sample") or "") > 10:
+        sections.append("code_quality")
+    if context.get("repo_url"):
+        sections.append("uniqueness")
+    if context.get("cp_stats"):
+        sections.append("cp")
+    return sections
+
+
+def evaluate_candidate_fused(
+    resume_text: str = "",
+    job_description: str = "",
+    code_sample: str = "",
+    repo_url: str = "",
+    cp_stats: Optional[dict] = None,
+    use_cache: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    Run every applicable agent's LLM judgment in one call.
+
+    Args:
+        resume_text: Resume text (integrity, relevance)
+        job_description: Job description (relevance)
+        code_sample: Code to review (code_quality)
+        repo_url: GitHub project URL (uniqueness)
+        cp_stats: Deterministic CP stats details (cp)
+        use_cache: Allow the LLM response cache
+
+    Returns:
+        {"sections": {agent: verdict}, "backend", "model", "timing", "cache"},
+        or None when no valid combined verdict was produced (agents then use
+        their own prompts)
+    """
+    context = {
+        "resume_text": resume_text,
+        "job_description": job_description,
+        "code_sample": code_sample,
+        "repo_url": repo_url,
+        "cp_stats": cp_stats,
+    }
+    sections = applicable_sections(context)
+    if not sections:
+        return None
+
+    schema = {
+        "type": "object",
+        "properties": {name: FUSED_SECTIONS[name][0] for name in sections},
+        "required": sections,
+    }
+    max_tokens = sum(FUSED_SECTIONS[name][2] for name in sections)
+
+    print(f"> [FusedEvaluation] One call for: {', '.join(sections)}", file=sys.stderr)
+    try:
+        client = get_hybrid_client()
+        response = client.chat(
+            build_fused_prompt(context, sections),
+            max_tokens=max_tokens,
+            temperature=0.2,
+            use_cache=use_cache,
+            stop_at_json=True,
+            schema=schema,
+            difficulty=DIFFICULTY_HARD,
+        )
+    except Exception as e:
+        print(f"> [FusedEvaluation] Failed: {e}", file=sys.stderr)
+        return None
+
+    if response.get("parsed") is None or response.get("backend") != "ollama":
+        return None
+
+    return {
+        "sections": response["parsed"],
+        "backend": response["backend"],
+        "model": response.get("model"),
+        "timing": response.get("timing"),
+        "cache": response.get("cache"),
+    }
+
+
+if __name__ == "__main__":
+    resume = open(sys.argv[1]).read() if len(sys.argv) > 1 else ""
+    job = open(sys.argv[2]).read() if len(sys.argv) > 2 else ""
+    print(json.dumps(evaluate_candidate_fused(resume_text=resume, job_description=job), indent=2))
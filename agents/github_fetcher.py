@@ -5,22 +5,44 @@ Fetches repository metadata and code content via GitHub API.
 Designed for lightweight operation with rate limit awareness.
 """
 
+import os
 import re
 import time
 import json
+import zlib
+import random
 import hashlib
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterable, Optional
 from dataclasses import dataclass, field
+from datetime import datetime
 
 import requests
 import structlog
 
+from repo_features import RepoFeatures, categorize_path, extract_repo_features, get_repo_features, PATH_CATEGORIES
+
 logger = structlog.get_logger(__name__)
 
 # Simple file-based cache directory
 CACHE_DIR = Path(__file__).parent.parent / "data" / "github_cache"
 CACHE_TTL_SECONDS = 3600  # 1 hour
+# Expired entries younger than TTL + grace are served immediately while a
+# background refresh updates them (stale-while-revalidate). 0 disables.
+CACHE_STALE_GRACE_SECONDS = 86400  # 1 day
+
+# Bounded file-tree handling for very large repositories
+FILE_TREE_SAMPLE_SIZE = 100  # representative paths kept in RepoContent.file_tree
+TREE_WALK_MAX_REQUESTS = 40  # subtree requests allowed when GitHub truncates a tree
+
+EXT_TO_LANG = {
+    ".py": "Python", ".js": "JavaScript", ".ts": "TypeScript",
+    ".go": "Go", ".rs": "Rust", ".java": "Java", ".cpp": "C++",
+    ".c": "C", ".rb": "Ruby", ".php": "PHP", ".swift": "Swift",
+    ".kt": "Kotlin", ".cs": "C#", ".html": "HTML", ".css": "CSS",
+}
 
 
 @dataclass
@@ -50,9 +72,99 @@ class RepoContent:
     """Repository content analysis."""
     readme: str
     main_files: dict[str, str]  # filename -> content
-    file_tree: list[str]  # list of file paths
+    file_tree: list[str]  # bounded representative sample of file paths
     total_files: int
     languages_breakdown: dict[str, float]  # language -> percentage
+    tree_stats: dict[str, Any] = field(default_factory=dict)  # TreeScanner.as_dict()
+
+
+def languages_from_extensions(extensions: dict[str, int]) -> dict[str, float]:
+    """Language percentages derived from a file-extension histogram."""
+    total = sum(extensions.values())
+    return {
+        EXT_TO_LANG[ext]: round(count / total * 100, 1)
+        for ext, count in extensions.items()
+        if ext in EXT_TO_LANG
+    }
+
+
+class TreeScanner:
+    """
+    Single-pass accumulator for repository tree statistics.
+    
+    Paths are consumed one at a time; only counters, an extension histogram
+    and a fixed-size reservoir sample are retained, so memory stays bounded
+    regardless of repository size.
+    """
+    
+    def __init__(self, seed: str = "", watch: Iterable[str] = (), sample_size: int = FILE_TREE_SAMPLE_SIZE):
+        """
+        Args:
+            seed: Seed for the reservoir sample (keeps samples stable per repo)
+            watch: Paths whose presence should be recorded (case-insensitive)
+            sample_size: Maximum number of paths kept in the sample
+        """
+        self.total_files = 0
+        self.max_depth = 0
+        self.extensions: dict[str, int] = {}
+        self.counts = dict.fromkeys(PATH_CATEGORIES, 0)
+        self.truncated = False
+        self.present: set[str] = set()
+        self.sample: list[str] = []
+        self._watch = {w.lower() for w in watch}
+        self._sample_size = sample_size
+        self._rng = random.Random(seed)
+    
+    def add(self, path: str) -> None:
+        """Account for one file (blob) path."""
+        self.total_files += 1
+        lower = path.lower()
+        
+        self.max_depth = max(self.max_depth, path.count("/") + 1)
+        ext = Path(lower).suffix
+        if ext:
+            self.extensions[ext] = self.extensions.get(ext, 0) + 1
+        
+        for category in categorize_path(path):
+            self.counts[category] += 1
+        
+        if lower in self._watch:
+            self.present.add(lower)
+        
+        # Reservoir sampling (Algorithm R)
+        if len(self.sample) < self._sample_size:
+            self.sample.append(path)
+        else:
+            j = self._rng.randrange(self.total_files)
+            if j < self._sample_size:
+                self.sample[j] = path
+    
+    def add_entries(self, entries: Iterable[dict], prefix: str = "") -> list[tuple[str, str]]:
+        """
+        Consume GitHub tree entries.
+        
+        Returns:
+            (path, sha) pairs of subtree entries, for lazy walking
+        """
+        subtrees = []
+        for item in entries:
+            if item.get("type") == "blob":
+                self.add(prefix + item["path"])
+            elif item.get("type") == "tree":
+                subtrees.append((prefix + item["path"], item.get("sha", "")))
+        return subtrees
+    
+    def as_dict(self) -> dict[str, Any]:
+        """Compact, JSON-serializable summary (used for caching and RepoContent)."""
+        return {
+            "total_files": self.total_files,
+            "max_depth": self.max_depth,
+            "extensions": self.extensions,
+            "counts": self.counts,
+            "truncated": self.truncated,
+            "present": sorted(self.present),
+            "sample": sorted(self.sample),
+        }
 
 
 @dataclass
@@ -62,7 +174,34 @@ class GitHubAnalysis:
     metadata: Optional[RepoMetadata]
     content: Optional[RepoContent]
     error: Optional[str] = None
-    cached: bool = False
+    features: Optional[RepoFeatures] = None  # shared agent signals, see repo_features
+    cached: bool = False  # True when every response was served from cache
+    stale: bool = False  # True when any cached response was past its TTL
+    
+    def as_dict(self) -> dict[str, Any]:
+        """Dict form consumed by the agents (and stored by the analysis cache)."""
+        return {
+            "url": self.url,
+            "metadata": self.metadata.__dict__ if self.metadata else {},
+            "content": self.content.__dict__ if self.content else {},
+            "features": self.features.__dict__ if self.features else {},
+            "error": self.error,
+            "cached": self.cached,
+            "stale": self.stale,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "GitHubAnalysis":
+        """Rebuild an analysis from as_dict() output."""
+        return cls(
+            url=data.get("url", ""),
+            metadata=RepoMetadata(**data["metadata"]) if data.get("metadata") else None,
+            content=RepoContent(**data["content"]) if data.get("content") else None,
+            error=data.get("error"),
+            features=get_repo_features(data) if data.get("features") else None,
+            cached=data.get("cached", False),
+            stale=data.get("stale", False),
+        )
 
 
 class GitHubFetcher:
@@ -77,6 +216,9 @@ class GitHubFetcher:
     """
     
     BASE_URL = "https://api.github.com"
+    GRAPHQL_URL = "https://api.github.com/graphql"
+    
+    README_NAMES = ["README.md", "readme.md", "README.rst", "README"]
     
     # File patterns to fetch for code analysis
     IMPORTANT_FILES = [
@@ -89,14 +231,25 @@ class GitHubFetcher:
         "Dockerfile", "docker-compose.yml",
     ]
     
-    def __init__(self, token: Optional[str] = None):
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        stale_grace_seconds: int = CACHE_STALE_GRACE_SECONDS,
+        use_graphql: bool = True,
+    ):
         """
         Initialize the GitHub fetcher.
         
         Args:
             token: Optional GitHub PAT for higher rate limits
+            stale_grace_seconds: How long past the TTL a cache entry may be
+                served while it is refreshed in the background
+            use_graphql: Use the GraphQL fast path when a token is set
+                (GraphQL requires authentication)
         """
         self.token = token
+        self.stale_grace_seconds = stale_grace_seconds
+        self.use_graphql = use_graphql and bool(token)
         self.session = requests.Session()
         self.session.headers.update({
             "Accept": "application/vnd.github.v3+json",
@@ -110,6 +263,15 @@ class GitHubFetcher:
         
         self._rate_limit_remaining = 60
         self._rate_limit_reset = 0
+        # GraphQL has its own point budget, separate from the REST core limit
+        self._graphql_rate_limit_remaining = 5000
+        self._graphql_rate_limit_reset = 0
+        
+        # Per-thread cache statistics for the analysis in progress
+        self._trace = threading.local()
+        # Endpoints with a background refresh in flight
+        self._refreshing: set[str] = set()
+        self._refresh_lock = threading.Lock()
     
     def parse_github_url(self, url: str) -> tuple[Optional[str], Optional[str], bool]:
         """
@@ -189,38 +351,99 @@ class GitHubFetcher:
         """Generate cache key from endpoint."""
         return hashlib.md5(endpoint.encode()).hexdigest()
     
-    def _get_cached(self, endpoint: str) -> Optional[dict]:
-        """Get cached response if valid."""
+    def _get_cached(self, endpoint: str) -> tuple[Optional[dict], bool]:
+        """
+        Get cached response if valid.
+        
+        Returns:
+            Tuple of (data, is_stale). Entries past CACHE_TTL_SECONDS but
+            within the stale grace window are returned with is_stale=True.
+        """
         cache_key = self._get_cache_key(endpoint)
         cache_file = CACHE_DIR / f"{cache_key}.json"
         
         if not cache_file.exists():
-            return None
+            return None, False
         
         try:
             with open(cache_file, "r") as f:
                 cached = json.load(f)
             
             # Check TTL
-            if time.time() - cached.get("timestamp", 0) > CACHE_TTL_SECONDS:
+            age = time.time() - cached.get("timestamp", 0)
+            if age > CACHE_TTL_SECONDS + self.stale_grace_seconds:
                 cache_file.unlink()
-                return None
+                return None, False
             
-            return cached.get("data")
+            return cached.get("data"), age > CACHE_TTL_SECONDS
         except (json.JSONDecodeError, IOError):
-            return None
+            return None, False
     
     def _set_cached(self, endpoint: str, data: dict) -> None:
         """Cache response data."""
         cache_key = self._get_cache_key(endpoint)
         cache_file = CACHE_DIR / f"{cache_key}.json"
+        tmp_file = cache_file.with_suffix(f".{threading.get_ident()}.tmp")
         
         try:
-            with open(cache_file, "w") as f:
+            # Write-then-rename so concurrent readers never see a partial file
+            with open(tmp_file, "w") as f:
                 json.dump({"timestamp": time.time(), "data": data}, f)
+            tmp_file.replace(cache_file)
         except IOError:
             pass  # Caching is optional, don't fail on errors
     
+    def _reset_trace(self) -> None:
+        """Start collecting cache statistics for the current thread."""
+        self._trace.cache_hits = 0
+        self._trace.stale_hits = 0
+        self._trace.network_calls = 0
+    
+    def _record(self, counter: str) -> None:
+        """Increment a cache statistic if a trace is active on this thread."""
+        if hasattr(self._trace, counter):
+            setattr(self._trace, counter, getattr(self._trace, counter) + 1)
+    
+    def _schedule_refresh(self, endpoint: str, fetch) -> None:
+        """Refresh a stale cache entry in a background thread (once per endpoint)."""
+        with self._refresh_lock:
+            if endpoint in self._refreshing:
+                return
+            self._refreshing.add(endpoint)
+        
+        def refresh():
+            try:
+                fetch()
+                logger.debug("Refreshed stale cache entry", endpoint=endpoint)
+            except Exception as e:
+                logger.warning("Background cache refresh failed", endpoint=endpoint, error=str(e))
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(endpoint)
+        
+        threading.Thread(target=refresh, name="github-cache-refresh", daemon=True).start()
+    
+    def _lookup_cached(self, endpoint: str, refresh) -> Optional[dict]:
+        """
+        Look up a cache entry, recording hit statistics.
+        
+        Stale entries are returned immediately and refresh() is run in the
+        background; refresh() must store its own result in the cache.
+        
+        Returns:
+            Cached data, or None on a miss
+        """
+        cached, stale = self._get_cached(endpoint)
+        if cached is None:
+            self._record("network_calls")
+            return None
+        
+        self._record("cache_hits")
+        if stale:
+            self._record("stale_hits")
+            self._schedule_refresh(endpoint, refresh)
+        return cached
+    
     def _request(self, endpoint: str, use_cache: bool = True) -> tuple[Optional[dict], Optional[str]]:
         """
         Make a GitHub API request with caching and rate limit handling.
@@ -228,12 +451,20 @@ class GitHubFetcher:
         Returns:
             Tuple of (data, error_message)
         """
-        # Check cache first
         if use_cache:
-            cached = self._get_cached(endpoint)
+            cached = self._lookup_cached(endpoint, lambda: self._fetch_api(endpoint))
             if cached is not None:
                 return cached, None
         
+        return self._fetch_api(endpoint, store=use_cache)
+    
+    def _fetch_api(self, endpoint: str, store: bool = True) -> tuple[Optional[dict], Optional[str]]:
+        """
+        Fetch an API endpoint from GitHub, bypassing the cache.
+        
+        Returns:
+            Tuple of (data, error_message)
+        """
         # Check rate limit
         if self._rate_limit_remaining <= 1 and time.time() < self._rate_limit_reset:
             wait_time = int(self._rate_limit_reset - time.time()) + 1
@@ -260,7 +491,7 @@ class GitHubFetcher:
             data = response.json()
             
             # Cache successful responses
-            if use_cache:
+            if store:
                 self._set_cached(endpoint, data)
             
             return data, None
@@ -313,19 +544,39 @@ class GitHubFetcher:
         """
         Fetch raw file content from repository.
         
+        Misses (404) are cached too, so README guesses don't repeat.
+        
         Returns:
             File content as string, or None if not found
         """
         # Use raw.githubusercontent.com for file content (doesn't count against API rate limit)
         url = f"https://raw.githubusercontent.com/{owner}/{repo}/HEAD/{path}"
         
+        entry = self._lookup_cached(url, lambda: self._fetch_raw(url))
+        if entry is None:
+            entry = self._fetch_raw(url)
+        return entry.get("text") if entry else None
+    
+    def _fetch_raw(self, url: str) -> Optional[dict]:
+        """
+        Fetch a raw file, caching both hits and 404 misses.
+        
+        Returns:
+            Dict with "text" (None if not found), or None on transient errors
+        """
         try:
             response = self.session.get(url, timeout=10)
             if response.status_code == 200:
-                return response.text[:10000]  # Limit to 10KB per file
-            return None
+                entry = {"text": response.text[:10000]}  # Limit to 10KB per file
+            elif response.status_code == 404:
+                entry = {"text": None}
+            else:
+                return None
         except requests.RequestException:
             return None
+        
+        self._set_cached(url, entry)
+        return entry
     
     def fetch_content(self, owner: str, repo: str) -> tuple[Optional[RepoContent], Optional[str]]:
         """
@@ -336,68 +587,293 @@ class GitHubFetcher:
         """
         # Fetch README
         readme = None
-        for readme_name in ["README.md", "readme.md", "README.rst", "README"]:
+        for readme_name in self.README_NAMES:
             content = self.fetch_file_content(owner, repo, readme_name)
             if content:
                 readme = content
                 break
         
-        # Fetch tree to understand structure
-        data, error = self._request(f"/repos/{owner}/{repo}/git/trees/HEAD?recursive=1")
-        if error:
-            # Try with default branch
-            data, error = self._request(f"/repos/{owner}/{repo}/git/trees/main?recursive=1")
-        
-        file_tree = []
-        if data and "tree" in data:
-            file_tree = [item["path"] for item in data["tree"] if item["type"] == "blob"]
-        
+        # Scan tree to understand structure
+        tree = self._scan_tree(owner, repo)
+        present = set(tree["present"])
         
         main_files = {}
         for pattern in self.IMPORTANT_FILES:
             # Check root level
-            if pattern in file_tree or pattern.lower() in [f.lower() for f in file_tree]:
+            if pattern.lower() in present:
                 content = self.fetch_file_content(owner, repo, pattern)
                 if content:
                     main_files[pattern] = content
             
             
             src_path = f"src/{pattern}"
-            if src_path in file_tree:
+            if src_path.lower() in present:
                 content = self.fetch_file_content(owner, repo, src_path)
                 if content:
                     main_files[src_path] = content
         
+        return self._build_content(readme, main_files, tree), None
+    
+    def _tree_watch_paths(self) -> list[str]:
+        """Important-file paths whose presence the tree scan records."""
+        return self.IMPORTANT_FILES + [f"src/{p}" for p in self.IMPORTANT_FILES]
+    
+    def _scan_tree(self, owner: str, repo: str) -> dict[str, Any]:
+        """
+        Get the repository tree summary (TreeScanner.as_dict()).
         
-        languages_breakdown = {}
-        if file_tree:
-            extensions = {}
-            for f in file_tree:
-                ext = Path(f).suffix.lower()
-                if ext:
-                    extensions[ext] = extensions.get(ext, 0) + 1
+        Only the compact summary is cached, never the raw recursive tree.
+        """
+        endpoint = f"tree-scan:/repos/{owner}/{repo}"
+        cached = self._lookup_cached(endpoint, lambda: self._walk_tree(owner, repo, endpoint))
+        if cached is not None:
+            return cached
+        return self._walk_tree(owner, repo, endpoint)
+    
+    def _walk_tree(self, owner: str, repo: str, cache_endpoint: str) -> dict[str, Any]:
+        """
+        Stream the repository tree through a TreeScanner.
+        
+        Uses one recursive call when possible. If GitHub reports the tree as
+        truncated, directories are walked lazily instead: each subtree is
+        requested recursively, and split one level further only if it is
+        itself truncated, within TREE_WALK_MAX_REQUESTS.
+        """
+        scanner = TreeScanner(seed=f"{owner}/{repo}", watch=self._tree_watch_paths())
+        base = f"/repos/{owner}/{repo}/git/trees"
+        
+        data, error = self._fetch_api(f"{base}/HEAD?recursive=1", store=False)
+        if error:
+            # Try with default branch
+            data, error = self._fetch_api(f"{base}/main?recursive=1", store=False)
+        if error or not data or "tree" not in data:
+            return scanner.as_dict()
+        
+        if not data.get("truncated"):
+            scanner.add_entries(data["tree"])
+        else:
+            logger.info("Tree truncated by GitHub, walking subtrees", repo=f"{owner}/{repo}")
+            root_sha = data.get("sha", "HEAD")
+            del data  # release the partial recursive listing before walking
             
-            total = sum(extensions.values())
-            ext_to_lang = {
-                ".py": "Python", ".js": "JavaScript", ".ts": "TypeScript",
-                ".go": "Go", ".rs": "Rust", ".java": "Java", ".cpp": "C++",
-                ".c": "C", ".rb": "Ruby", ".php": "PHP", ".swift": "Swift",
-                ".kt": "Kotlin", ".cs": "C#", ".html": "HTML", ".css": "CSS",
-            }
-            for ext, count in extensions.items():
-                if ext in ext_to_lang:
-                    lang = ext_to_lang[ext]
-                    languages_breakdown[lang] = round(count / total * 100, 1)
+            # (path prefix, tree sha, try recursive listing first)
+            pending = deque([("", root_sha, False)])
+            budget = TREE_WALK_MAX_REQUESTS
+            while pending:
+                if budget <= 0:
+                    scanner.truncated = True
+                    break
+                prefix, sha, recursive = pending.popleft()
+                sub, sub_error = self._fetch_api(f"{base}/{sha}" + ("?recursive=1" if recursive else ""), store=False)
+                budget -= 1
+                if sub_error or not sub:
+                    scanner.truncated = True
+                    continue
+                if recursive and sub.get("truncated"):
+                    pending.appendleft((prefix, sha, False))
+                    continue
+                for path, subtree_sha in scanner.add_entries(sub.get("tree", []), prefix):
+                    if not recursive:
+                        pending.append((f"{path}/", subtree_sha, True))
         
-        content = RepoContent(
+        summary = scanner.as_dict()
+        self._set_cached(cache_endpoint, summary)
+        return summary
+    
+    def _build_content(self, readme: Optional[str], main_files: dict[str, str], tree: dict[str, Any]) -> RepoContent:
+        """Assemble RepoContent from fetched files and a tree summary."""
+        return RepoContent(
             readme=readme or "",
             main_files=main_files,
-            file_tree=file_tree[:100],  # Limit to first 100 files
-            total_files=len(file_tree),
-            languages_breakdown=languages_breakdown,
+            file_tree=tree.get("sample", []),
+            total_files=tree.get("total_files", 0),
+            languages_breakdown=languages_from_extensions(tree.get("extensions", {})),
+            tree_stats=tree,
         )
+    
+    # ------------------------------------------------------------------
+    # GraphQL fast path
+    # ------------------------------------------------------------------
+    
+    _GRAPHQL_METADATA_FIELDS = """
+        name
+        nameWithOwner
+        owner { login }
+        description
+        stargazerCount
+        forkCount
+        watchers { totalCount }
+        primaryLanguage { name }
+        languages(first: 25, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+        createdAt
+        updatedAt
+        pushedAt
+        defaultBranchRef { name }
+        issues(states: OPEN) { totalCount }
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+        isFork
+        licenseInfo { spdxId }
+    """
+    
+    def _graphql_content_paths(self) -> list[str]:
+        """Blob paths requested alongside metadata, in fetch_content order."""
+        paths = list(self.README_NAMES)
+        for pattern in self.IMPORTANT_FILES:
+            paths.extend([pattern, f"src/{pattern}"])
+        return list(dict.fromkeys(paths))
+    
+    def _graphql_repo_selection(self, alias: str, owner: str, repo: str, include_content: bool) -> str:
+        """Build the selection for one aliased repository in a batched query."""
+        fields = self._GRAPHQL_METADATA_FIELDS
+        if include_content:
+            fields += 'root: object(expression: "HEAD:") { ... on Tree { entries { name type } } }\n'
+            for i, path in enumerate(self._graphql_content_paths()):
+                fields += f'f{i}: object(expression: {json.dumps("HEAD:" + path)}) {{ ... on Blob {{ text }} }}\n'
+        return f"{alias}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) {{{fields}}}"
+    
+    def _graphql(self, query: str) -> tuple[Optional[dict], Optional[str]]:
+        """
+        Run a GraphQL query through the response cache.
+        
+        Returns:
+            Tuple of (data, error_message)
+        """
+        cache_endpoint = f"graphql:{query}"
+        cached = self._lookup_cached(cache_endpoint, lambda: self._fetch_graphql(query, cache_endpoint))
+        if cached is not None:
+            return cached, None
+        return self._fetch_graphql(query, cache_endpoint)
+    
+    def _fetch_graphql(self, query: str, cache_endpoint: str) -> tuple[Optional[dict], Optional[str]]:
+        """POST a GraphQL query, caching fully successful responses."""
+        if self._graphql_rate_limit_remaining <= 1 and time.time() < self._graphql_rate_limit_reset:
+            wait_time = int(self._graphql_rate_limit_reset - time.time()) + 1
+            return None, f"GraphQL rate limited. Reset in {wait_time} seconds."
+        
+        try:
+            response = self.session.post(self.GRAPHQL_URL, json={"query": query}, timeout=15)
+            
+            # These headers describe the GraphQL budget on a GraphQL response
+            if "X-RateLimit-Remaining" in response.headers:
+                self._graphql_rate_limit_remaining = int(response.headers["X-RateLimit-Remaining"])
+                self._graphql_rate_limit_reset = int(response.headers.get("X-RateLimit-Reset", 0))
+            
+            if response.status_code != 200:
+                return None, f"GitHub GraphQL error: {response.status_code}"
+            
+            body = response.json()
+            data = body.get("data")
+            self._update_graphql_rate_limit((data or {}).get("rateLimit"))
+            if body.get("errors"):
+                # NOT_FOUND on a repository still returns partial data
+                if not data:
+                    return None, f"GitHub GraphQL error: {body['errors'][0].get('message', 'unknown')}"
+                return data, None
+            
+            self._set_cached(cache_endpoint, data)
+            return data, None
+        
+        except requests.Timeout:
+            return None, "Request timeout"
+        except requests.RequestException as e:
+            return None, f"Request failed: {str(e)}"
+    
+    def _update_graphql_rate_limit(self, rate_limit: Optional[dict]) -> None:
+        """Record the GraphQL budget from a query's rateLimit { remaining resetAt } field."""
+        if not rate_limit or rate_limit.get("remaining") is None:
+            return
+        self._graphql_rate_limit_remaining = int(rate_limit["remaining"])
+        reset_at = rate_limit.get("resetAt")
+        if reset_at:
+            self._graphql_rate_limit_reset = int(datetime.fromisoformat(reset_at.replace("Z", "+00:00")).timestamp())
+    
+    def _parse_graphql_metadata(self, node: dict) -> RepoMetadata:
+        """Convert a GraphQL repository node into RepoMetadata."""
+        return RepoMetadata(
+            owner=node["owner"]["login"],
+            name=node["name"],
+            full_name=node["nameWithOwner"],
+            description=node.get("description") or "",
+            stars=node.get("stargazerCount", 0),
+            forks=node.get("forkCount", 0),
+            watchers=(node.get("watchers") or {}).get("totalCount", 0),
+            language=(node.get("primaryLanguage") or {}).get("name") or "Unknown",
+            languages={
+                edge["node"]["name"]: edge["size"]
+                for edge in (node.get("languages") or {}).get("edges", [])
+            },
+            created_at=node.get("createdAt", ""),
+            updated_at=node.get("updatedAt", ""),
+            pushed_at=node.get("pushedAt") or "",
+            default_branch=(node.get("defaultBranchRef") or {}).get("name", "main"),
+            open_issues=(node.get("issues") or {}).get("totalCount", 0),
+            topics=[t["topic"]["name"] for t in (node.get("repositoryTopics") or {}).get("nodes", [])],
+            is_fork=node.get("isFork", False),
+            license=(node.get("licenseInfo") or {}).get("spdxId"),
+        )
+    
+    def _parse_graphql_content(self, owner: str, repo: str, node: dict) -> RepoContent:
+        """Convert a GraphQL repository node (with content fields) into RepoContent."""
+        blobs = {}
+        for i, path in enumerate(self._graphql_content_paths()):
+            blob = node.get(f"f{i}")
+            if blob and blob.get("text"):
+                blobs[path] = blob["text"][:10000]  # Limit to 10KB per file
+        
+        readme = next((blobs[name] for name in self.README_NAMES if name in blobs), None)
+        main_files = {}
+        for pattern in self.IMPORTANT_FILES:
+            for path in (pattern, f"src/{pattern}"):
+                if path in blobs:
+                    main_files[path] = blobs[path]
+        
+        # The tree scan is a single REST call for most repos; fall back to root entries
+        tree = self._scan_tree(owner, repo)
+        if not tree.get("total_files"):
+            scanner = TreeScanner(seed=f"{owner}/{repo}", watch=self._tree_watch_paths())
+            root = node.get("root") or {}
+            scanner.add_entries({"path": e["name"], "type": e.get("type")} for e in root.get("entries", []))
+            tree = scanner.as_dict()
+        
+        return self._build_content(readme, main_files, tree)
+    
+    def fetch_repos_graphql(
+        self,
+        repos: list[tuple[str, str]],
+        content_repos: int = 1,
+    ) -> dict[tuple[str, str], tuple[Optional[RepoMetadata], Optional[RepoContent], Optional[str]]]:
+        """
+        Fetch several repositories in a single GraphQL query.
+        
+        Args:
+            repos: List of (owner, repo) pairs
+            content_repos: How many of the leading repos also get their README
+                and important-file blobs requested (0 for metadata only)
+            
+        Returns:
+            Dict of (owner, repo) -> (RepoMetadata, RepoContent, error_message)
+        """
+        selections = [
+            self._graphql_repo_selection(f"r{i}", owner, repo, i < content_repos)
+            for i, (owner, repo) in enumerate(repos)
+        ]
+        selections.append("rateLimit { remaining resetAt }")
+        data, error = self._graphql("query {\n" + "\n".join(selections) + "\n}")
         
-        return content, None
+        results = {}
+        for i, (owner, repo) in enumerate(repos):
+            node = (data or {}).get(f"r{i}")
+            if not node:
+                results[(owner, repo)] = (None, None, error or "Repository not found")
+                continue
+            try:
+                metadata = self._parse_graphql_metadata(node)
+                content = self._parse_graphql_content(owner, repo, node) if i < content_repos else None
+                results[(owner, repo)] = (metadata, content, None)
+            except (KeyError, TypeError) as e:
+                results[(owner, repo)] = (None, None, f"Failed to parse metadata: {str(e)}")
+        
+        return results
     
     def analyze_profile(self, username: str) -> dict:
         """
@@ -420,15 +896,29 @@ class GitHubFetcher:
         # Analyze the top repo in detail
         top_repo = repos[0] if repos else None
         top_repo_analysis = None
+        metadata = content = None
+        
+        if top_repo and self.use_graphql:
+            # One query: full details for the top repo, metadata for the rest
+            batch = self.fetch_repos_graphql([(username, r["name"]) for r in repos], content_repos=1)
+            for r in repos:
+                repo_metadata = batch.get((username, r["name"]), (None, None, None))[0]
+                if repo_metadata:
+                    r["languages"] = list(repo_metadata.languages)
+                    r["topics"] = repo_metadata.topics
+            metadata, content, gql_error = batch.get((username, top_repo["name"]), (None, None, None))
+            if not metadata:
+                logger.warning("GraphQL fetch failed, falling back to REST", error=gql_error)
         
-        if top_repo:
+        if top_repo and not metadata:
             metadata, _ = self.fetch_metadata(username, top_repo["name"])
             content, _ = self.fetch_content(username, top_repo["name"])
-            if metadata:
-                top_repo_analysis = {
-                    "metadata": metadata,
-                    "content": content
-                }
+        
+        if metadata:
+            top_repo_analysis = {
+                "metadata": metadata,
+                "content": content
+            }
         
         return {
             "username": username,
@@ -449,6 +939,7 @@ class GitHubFetcher:
             GitHubAnalysis with metadata and content
         """
         owner, repo, is_profile = self.parse_github_url(github_url)
+        self._reset_trace()
         
         if not owner:
             return GitHubAnalysis(
@@ -478,6 +969,26 @@ class GitHubFetcher:
         
         logger.info("Analyzing GitHub repository", owner=owner, repo=repo)
         
+        # Derived-analysis cache: one file read and one decode on a hit
+        cached = self._get_cached_analysis(owner, repo)
+        if cached is not None:
+            cached.url = github_url
+            return cached
+        
+        analysis = self._build_analysis(github_url, owner, repo)
+        if analysis.metadata and not analysis.error:
+            self._set_cached_analysis(owner, repo, analysis)
+        return analysis
+    
+    def _build_analysis(self, github_url: str, owner: str, repo: str) -> GitHubAnalysis:
+        """Fetch and assemble a repository analysis (through the response cache)."""
+        # GraphQL fast path: metadata, languages, README and key files in one query
+        if self.use_graphql:
+            metadata, content, gql_error = self.fetch_repos_graphql([(owner, repo)])[(owner, repo)]
+            if metadata:
+                return self._finish_analysis(github_url, metadata, content, None)
+            logger.warning("GraphQL fetch failed, falling back to REST", error=gql_error)
+        
         # Fetch metadata
         metadata, meta_error = self.fetch_metadata(owner, repo)
         if meta_error:
@@ -491,14 +1002,125 @@ class GitHubFetcher:
         # Fetch content
         content, content_error = self.fetch_content(owner, repo)
         
+        return self._finish_analysis(github_url, metadata, content, content_error)
+    
+    def _finish_analysis(
+        self,
+        github_url: str,
+        metadata: RepoMetadata,
+        content: Optional[RepoContent],
+        error: Optional[str],
+    ) -> GitHubAnalysis:
+        """Build the GitHubAnalysis, attaching features and this thread's cache statistics."""
+        features = extract_repo_features(metadata.__dict__, content.__dict__ if content else {})
+        
+        logger.info(
+            "GitHub analysis complete",
+            cache_hits=self._trace.cache_hits,
+            stale_hits=self._trace.stale_hits,
+            network_calls=self._trace.network_calls,
+        )
+        
         return GitHubAnalysis(
             url=github_url,
             metadata=metadata,
             content=content,
-            error=content_error,
-            cached=False
+            error=error,
+            features=features,
+            cached=self._trace.network_calls == 0,
+            stale=self._trace.stale_hits > 0,
         )
     
+    def _analysis_cache_file(self, owner: str, repo: str) -> Path:
+        """Cache file holding the derived analysis for a repository."""
+        return CACHE_DIR / f"analysis_{self._get_cache_key(f'{owner}/{repo}'.lower())}.json.z"
+    
+    def _get_cached_analysis(self, owner: str, repo: str) -> Optional[GitHubAnalysis]:
+        """
+        Get the cached derived analysis for a repository.
+        
+        Entries are identified by owner/repo@pushed_at and only invalidated
+        by a push. Past CACHE_TTL_SECONDS the entry is revalidated with a
+        single metadata request: in the background while within the stale
+        grace window, inline after that.
+        
+        Returns:
+            GitHubAnalysis with cached=True, or None if it must be rebuilt
+        """
+        cache_file = self._analysis_cache_file(owner, repo)
+        try:
+            entry = json.loads(zlib.decompress(cache_file.read_bytes()))
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error, ValueError):
+            logger.warning("Discarding unreadable analysis cache entry", repo=f"{owner}/{repo}")
+            return None
+        
+        try:
+            analysis = GitHubAnalysis.from_dict(entry["analysis"])
+        except (KeyError, TypeError):
+            return None  # written by an incompatible version
+        analysis.cached = True
+        analysis.stale = False
+        
+        age = time.time() - entry.get("timestamp", 0)
+        if age <= CACHE_TTL_SECONDS:
+            return analysis
+        
+        if age <= CACHE_TTL_SECONDS + self.stale_grace_seconds:
+            analysis.stale = True
+            self._schedule_refresh(
+                f"analysis:{owner}/{repo}",
+                lambda: self._revalidate_analysis(owner, repo, entry, rebuild=True),
+            )
+            return analysis
+        
+        return analysis if self._revalidate_analysis(owner, repo, entry, rebuild=False) else None
+    
+    def _set_cached_analysis(self, owner: str, repo: str, analysis: GitHubAnalysis) -> None:
+        """Store the derived analysis as compressed compact JSON."""
+        payload = analysis.as_dict()
+        payload["cached"] = payload["stale"] = False
+        entry = {
+            "timestamp": time.time(),
+            "key": f"{owner}/{repo}@{analysis.metadata.pushed_at}",
+            "pushed_at": analysis.metadata.pushed_at,
+            "analysis": payload,
+        }
+        cache_file = self._analysis_cache_file(owner, repo)
+        tmp_file = cache_file.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_file.write_bytes(zlib.compress(json.dumps(entry, separators=(",", ":")).encode()))
+            tmp_file.replace(cache_file)
+        except IOError:
+            pass  # Caching is optional, don't fail on errors
+    
+    def _revalidate_analysis(self, owner: str, repo: str, entry: dict, rebuild: bool) -> bool:
+        """
+        Check whether a cached analysis still matches the repository.
+        
+        If pushed_at is unchanged the entry is re-stamped. Otherwise it is
+        rebuilt when rebuild=True (background refresh).
+        
+        Returns:
+            True if the cached entry is still current
+        """
+        data, error = self._fetch_api(f"/repos/{owner}/{repo}")
+        if error or not data:
+            return False
+        
+        if data.get("pushed_at", "") == entry.get("pushed_at"):
+            analysis = GitHubAnalysis.from_dict(entry["analysis"])
+            self._set_cached_analysis(owner, repo, analysis)
+            return True
+        
+        if rebuild:
+            self._reset_trace()
+            analysis = self._build_analysis(entry["analysis"].get("url", ""), owner, repo)
+            if analysis.metadata and not analysis.error:
+                self._set_cached_analysis(owner, repo, analysis)
+        return False
+    
     def get_rate_limit_status(self) -> dict:
         """Get current rate limit status."""
         return {
@@ -513,10 +1135,10 @@ _fetcher: Optional[GitHubFetcher] = None
 
 
 def get_fetcher(token: Optional[str] = None) -> GitHubFetcher:
-    """Get or create the GitHub fetcher singleton."""
+    """Get or create the GitHub fetcher singleton (token defaults to $GITHUB_TOKEN)."""
     global _fetcher
     if _fetcher is None:
-        _fetcher = GitHubFetcher(token)
+        _fetcher = GitHubFetcher(token or os.environ.get("GITHUB_TOKEN"))
     return _fetcher
 
 
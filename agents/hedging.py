@@ -0,0 +1,129 @@
+"""
+Hedged LLM Calls - Bounds agent latency by racing the LLM against its heuristic.
+
+An agent's LLM call can queue behind other work and then block for the full
+request timeout before the agent falls back. hedged_call() starts the LLM
+call on a worker thread, computes the agent's heuristic result meanwhile and
+waits at most the agent's latency SLO for the model:
+
+- LLM answered in time: its result is returned
+- LLM failed: the heuristic result is returned
+- SLO expired: the heuristic result is returned marked provisional, and
+  on_upgrade (if given) receives the LLM result when it arrives later
+
+Only interactive requests are hedged; batch and background work (see
+llm_scheduler.request_priority) waits for the model as before.
+"""
+
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+from llm_scheduler import PRIORITY_INTERACTIVE, current_request, request_priority
+
+# Seconds an interactive caller waits for each agent's LLM answer
+# (override per agent with LLM_SLO_<AGENT>, e.g. LLM_SLO_RELEVANCE=5)
+AGENT_SLO_SECONDS = {
+    "integrity": 8.0,
+    "relevance": 8.0,
+    "code_quality": 10.0,
+    "uniqueness": 5.0,
+    "cp": 5.0,
+}
+DEFAULT_SLO_SECONDS = 8.0
+# LLM calls still running after their SLO keep a worker until they finish
+HEDGE_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+_stats_lock = threading.Lock()
+_stats = {"llm": 0, "llm_failed": 0, "slo_expired": 0, "upgraded": 0, "unhedged": 0}
+
+
+def slo_seconds(agent: str) -> float:
+    """Latency SLO for an agent's LLM call."""
+    override = os.environ.get(f"LLM_SLO_{agent.upper()}")
+    if override:
+        return float(override)
+    return AGENT_SLO_SECONDS.get(agent, DEFAULT_SLO_SECONDS)
+
+
+def _count(outcome: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def hedge_status() -> Dict[str, Any]:
+    """Outcome counters and SLOs (for /api/status)."""
+    with _stats_lock:
+        return {**_stats, "slo_seconds": {agent: slo_seconds(agent) for agent in AGENT_SLO_SECONDS}}
+
+
+def hedged_call(
+    agent: str,
+    ask_llm: Callable[[], Optional[Dict[str, Any]]],
+    heuristic: Callable[[], Dict[str, Any]],
+    on_upgrade: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Agent result from the LLM if it answers within the SLO, else the heuristic.
+
+    Args:
+        agent: Agent name (selects the SLO)
+        ask_llm: Returns the LLM-backed result, or None when the LLM failed
+        heuristic: Returns the heuristic result
+        on_upgrade: Called with the LLM result if it arrives after the SLO
+
+    Returns:
+        Agent result with a "hedge" entry (outcome, slo_seconds, llm_ms);
+        "provisional": True when the SLO expired
+    """
+    priority, deadline = current_request()
+    if priority != PRIORITY_INTERACTIVE:
+        _count("unhedged")
+        return ask_llm() or heuristic()
+
+    slo = slo_seconds(agent)
+    started = time.perf_counter()
+
+    def run_llm():
+        # Worker threads don't inherit the caller's priority and deadline
+        with request_priority(priority, deadline):
+            return ask_llm()
+
+    future = _executor.submit(run_llm)
+    fallback = heuristic()
+
+    try:
+        result = future.result(timeout=max(0.0, slo - (time.perf_counter() - started)))
+    except FutureTimeout:
+        _count("slo_expired")
+        print(f"> [Hedging] {agent}: LLM missed its {slo:g}s SLO, returning provisional heuristic", file=sys.stderr)
+        if on_upgrade is not None:
+            future.add_done_callback(lambda done: _upgrade(agent, done, on_upgrade, slo, started))
+        return {**fallback, "provisional": True, "hedge": {"outcome": "slo_expired", "slo_seconds": slo}}
+    except Exception as e:
+        print(f"> [Hedging] {agent}: LLM call raised {e}", file=sys.stderr)
+        result = None
+
+    llm_ms = round((time.perf_counter() - started) * 1000, 1)
+    if result is None:
+        _count("llm_failed")
+        return {**fallback, "hedge": {"outcome": "llm_failed", "slo_seconds": slo, "llm_ms": llm_ms}}
+    _count("llm")
+    return {**result, "hedge": {"outcome": "llm", "slo_seconds": slo, "llm_ms": llm_ms}}
+
+
+def _upgrade(agent: str, done, on_upgrade: Callable[[Dict[str, Any]], None], slo: float, started: float) -> None:
+    """Hand a late LLM result to the caller's upgrade hook."""
+    if done.exception() is not None or done.result() is None:
+        return
+    llm_ms = round((time.perf_counter() - started) * 1000, 1)
+    try:
+        on_upgrade({**done.result(), "hedge": {"outcome": "upgraded", "slo_seconds": slo, "llm_ms": llm_ms}})
+        _count("upgraded")
+        print(f"> [Hedging] {agent}: upgraded with LLM result after {llm_ms:.0f}ms", file=sys.stderr)
+    except Exception as e:
+        print(f"> [Hedging] {agent}: upgrade failed: {e}", file=sys.stderr)
@@ -6,111 +6,593 @@ Simplified for immediate laptop compatibility
 import os
 import sys
 import json
-import psutil
+import time
+import threading
+from contextlib import contextmanager
 import requests
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional
+
+from llm_cache import LLMResponseCache, LLM_CACHE_MAX_TEMPERATURE
+from structured_output import parse_structured, build_repair_prompt
+from llm_batcher import LLMBatcher
+from llm_scheduler import LLMScheduler, SchedulerRejected, OLLAMA_NUM_PARALLEL
+from model_router import ModelRouter
+from ollama_pool import NoEndpointAvailable, OllamaPool, endpoint_urls
+from hedging import hedge_status
+
+# Point at another server (e.g. benchmarks/mock_ollama.py) with OLLAMA_BASE_URL
+OLLAMA_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+DEFAULT_MODEL = "qwen2.5-coder:14b"
+
+# Connections kept open to Ollama (one per concurrent caller)
+SESSION_POOL_SIZE = 8
+# How long is_available() waits for an in-flight startup probe
+PROBE_WAIT_SECONDS = 3.0
+# Re-probe schedule while Ollama is down (exponential backoff)
+RECOVERY_BACKOFF_INITIAL = 1.0
+RECOVERY_BACKOFF_MAX = 120.0
+# Degraded periods kept for /api/status
+MAX_DEGRADED_HISTORY = 50
+# How long Ollama keeps a model loaded after each request (Ollama duration)
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+# Interval of warm pings while keep_warm() is active (e.g. during a batch)
+WARM_PING_SECONDS = 120
+# A load_duration above this marks a call as a cold start
+COLD_START_MS = 500.0
+# Model served by /api/embed for semantic relevance
+OLLAMA_EMBED_MODEL = os.environ.get("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+
+class JSONObjectScanner:
+    """Finds the first complete top-level JSON object in streamed text"""
+    
+    def __init__(self):
+        self._reset()
+    
+    def _reset(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.buffer = []
+    
+    def feed(self, text: str):
+        """Consume more text; returns the object's source once it is complete and valid"""
+        for ch in text:
+            if self.depth == 0:
+                if ch == "{":
+                    self.depth = 1
+                    self.buffer = ["{"]
+                continue
+            
+            self.buffer.append(ch)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    candidate = "".join(self.buffer)
+                    try:
+                        json.loads(candidate)
+                        return candidate
+                    except ValueError:
+                        self._reset()  # stray braces in prose; keep scanning
+        return None
+
+def ollama_costs(final: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Cold-start and prompt-evaluation costs from Ollama's final response fields"""
+    if not final:
+        # Streaming stopped early: Ollama only reports these on the last chunk
+        return {"load_ms": None, "prompt_eval_ms": None, "prompt_tokens": None, "cold_start": None}
+    load_ms = round(final.get("load_duration", 0) / 1e6, 1)
+    return {
+        "load_ms": load_ms,
+        "prompt_eval_ms": round(final.get("prompt_eval_duration", 0) / 1e6, 1),
+        "prompt_tokens": final.get("prompt_eval_count"),
+        "cold_start": load_ms >= COLD_START_MS,
+    }
 
 class HybridModelClient:
     """Simplified hybrid client: Ollama → Heuristics"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        base_url: str = OLLAMA_URL,
+        model: str = DEFAULT_MODEL,
+        probe: bool = True,
+        base_urls: Optional[List[str]] = None,
+    ):
+        # Several Ollama servers can share the load (OLLAMA_BASE_URLS)
+        urls = base_urls or endpoint_urls(base_url)
+        self.base_url = urls[0]
+        self.model = model
+        self.embed_model = OLLAMA_EMBED_MODEL
         self.ollama_available = False
         self.selected_model = None
-        self.selected_backend = None
-        self._initialize_backends()
+        self.selected_backend = "heuristics"
+        
+        # One pooled keep-alive session for all Ollama traffic
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(urls), pool_maxsize=SESSION_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        self._probe_lock = threading.Lock()
+        self._probe_thread = None
+        self._probe_done = threading.Event()
+        
+        # Health monitoring: degraded periods and the recovery thread
+        self._health_lock = threading.Lock()
+        self._monitor_thread = None
+        self._degraded_since = None
+        self._degraded_reason = None
+        self._degraded_history = []
+        self._next_probe_at = None
+        self._failed_probes = 0
+        
+        # Persistent response cache with in-flight deduplication
+        self.cache = LLMResponseCache()
+        self.router = ModelRouter()
+        self.pool = OllamaPool(urls, self.session, on_change=self._endpoints_changed)
+        # Every endpoint runs OLLAMA_NUM_PARALLEL generations at once
+        self.scheduler = LLMScheduler(OLLAMA_NUM_PARALLEL * len(urls))
+        self.batcher = LLMBatcher(self, parallelism=self.scheduler.max_concurrency)
+        self._recent_models = set()
+        
+        if probe:
+            self.start_background_probe()
     
     def _check_ollama(self) -> bool:
-        """Check if Ollama is running"""
+        """Check if any Ollama endpoint is running and has a configured model"""
         try:
-            response = requests.get("http://localhost:11434/api/tags", timeout=2)
-            return response.status_code == 200
-        except:
+            models = self.pool.refresh()
+            if not models:
+                return False
+            if not self.router.available:
+                print(f"> [HybridModel] No configured model pulled (have: {models})", file=sys.stderr)
+                return False
+            if self.model not in models:
+                print(f"> [HybridModel] Model {self.model} not pulled, routing to {self.router.available}", file=sys.stderr)
+            return True
+        except Exception:
             return False
     
+    def _endpoints_changed(self):
+        """Route only to models some healthy endpoint still serves"""
+        self.router.set_available(self.pool.models(), required=self.model)
+    
     def _initialize_ollama(self):
         """Initialize Ollama client"""
         if not self._check_ollama():
             print("> [HybridModel] Ollama not running", file=sys.stderr)
             return False
         
+        self.ollama_available = True
+        # Largest routable model when the configured one is not pulled
+        self.selected_model = self.model if self.model in self.router.available else self.router.available[-1]
+        print(f"> [HybridModel] Ollama {self.selected_model} available", file=sys.stderr)
+        return True
+    
+    def _warm_model(self, model: Optional[str] = None):
+        """Load a model into memory so the first real request doesn't pay for it"""
+        model = model or self.selected_model
+        for endpoint in self.pool.endpoints_serving(model):
+            try:
+                # An empty prompt makes Ollama load the model without generating
+                self.session.post(
+                    f"{endpoint.url}/api/generate",
+                    json={"model": model, "prompt": "", "keep_alive": OLLAMA_KEEP_ALIVE},
+                    timeout=120
+                )
+                print(f"> [HybridModel] {model} loaded on {endpoint.url}", file=sys.stderr)
+            except Exception as e:
+                print(f"> [HybridModel] Model warm-up failed on {endpoint.url}: {e}", file=sys.stderr)
+    
+    @contextmanager
+    def keep_warm(self, interval: float = WARM_PING_SECONDS):
+        """Ping the models in use every interval so idle gaps (e.g. in a batch) don't unload them"""
+        stop = threading.Event()
+        
+        def ping_loop():
+            while not stop.wait(interval):
+                if not self.ollama_available:
+                    continue
+                models, self._recent_models = self._recent_models | {self.selected_model}, set()
+                for model in models:
+                    self._warm_model(model)
+        
+        thread = threading.Thread(target=ping_loop, name="hybrid-model-keep-warm", daemon=True)
+        thread.start()
         try:
-            # Test with lightweight model
-            response = requests.post(
-                "http://localhost:11434/api/generate",
-                json={
-                    "model": "qwen2.5-coder:14b",
-                    "prompt": "test",
-                    "stream": False
-                },
-                timeout=5
-            )
-            if response.status_code == 200:
-                self.ollama_available = True
-                self.selected_model = "qwen2.5-coder:14b"
-                print("> [HybridModel] Ollama qwen2.5-coder:14b available", file=sys.stderr)
-                return True
-        except Exception as e:
-            print(f"> [HybridModel] Ollama test failed: {e}", file=sys.stderr)
-        
-        return False
+            yield
+        finally:
+            stop.set()
     
     def _initialize_backends(self):
         """Initialize all available backends"""
         print("> [HybridModel] Initializing backends...", file=sys.stderr)
         
-        # Try Ollama
-        if self._initialize_ollama():
-            self.selected_backend = "ollama"
-            print("> [HybridModel] Using Ollama as primary", file=sys.stderr)
-            return
+        try:
+            # Try Ollama
+            if self._initialize_ollama():
+                self.selected_backend = "ollama"
+                print("> [HybridModel] Using Ollama as primary", file=sys.stderr)
+            else:
+                self.selected_backend = "heuristics"
+                print("> [HybridModel] Using heuristics only", file=sys.stderr)
+        finally:
+            self._probe_done.set()
         
-        self.selected_backend = "heuristics"
-        print("> [HybridModel] Using heuristics only", file=sys.stderr)
+        if self.ollama_available:
+            self._warm_model()
+        else:
+            self._mark_unavailable("Ollama not reachable at startup")
+    
+    def _mark_unavailable(self, reason: str):
+        """Switch to heuristics and start re-probing in the background"""
+        with self._health_lock:
+            self.ollama_available = False
+            self.selected_backend = "heuristics"
+            if self._degraded_since is None:
+                self._degraded_since = time.time()
+                self._degraded_reason = reason
+                print(f"> [HybridModel] Degraded to heuristics: {reason}", file=sys.stderr)
+            if self._monitor_thread is None or not self._monitor_thread.is_alive():
+                self._monitor_thread = threading.Thread(
+                    target=self._recovery_loop, name="hybrid-model-health", daemon=True
+                )
+                self._monitor_thread.start()
+    
+    def _recovery_loop(self):
+        """Re-probe Ollama with exponential backoff until it is healthy again"""
+        backoff = RECOVERY_BACKOFF_INITIAL
+        while True:
+            self._next_probe_at = time.time() + backoff
+            time.sleep(backoff)
+            
+            if self._initialize_ollama():
+                with self._health_lock:
+                    self.selected_backend = "ollama"
+                    if self._degraded_since is not None:
+                        ended = time.time()
+                        self._degraded_history.append({
+                            "start": self._degraded_since,
+                            "end": ended,
+                            "duration_seconds": round(ended - self._degraded_since, 1),
+                            "reason": self._degraded_reason,
+                            "failed_probes": self._failed_probes,
+                        })
+                        del self._degraded_history[:-MAX_DEGRADED_HISTORY]
+                    self._degraded_since = None
+                    self._degraded_reason = None
+                    self._next_probe_at = None
+                    self._failed_probes = 0
+                print("> [HybridModel] Ollama recovered", file=sys.stderr)
+                self._warm_model()
+                return
+            
+            self._failed_probes += 1
+            backoff = min(backoff * 2, RECOVERY_BACKOFF_MAX)
+    
+    def health_status(self) -> Dict[str, Any]:
+        """Current backend health, including recent degraded periods"""
+        with self._health_lock:
+            now = time.time()
+            return {
+                "backend": self.selected_backend,
+                "ollama_available": self.ollama_available,
+                "model": self.selected_model or self.model,
+                "degraded": self._degraded_since is not None,
+                "degraded_since": self._degraded_since,
+                "degraded_reason": self._degraded_reason,
+                "failed_probes": self._failed_probes,
+                "next_probe_in": round(max(0.0, self._next_probe_at - now), 1) if self._next_probe_at else None,
+                "degraded_periods": list(self._degraded_history),
+                "cache": self.cache.status(),
+                "batching": self.batcher.status(),
+                "scheduler": self.scheduler.status(),
+                "routing": self.router.status(),
+                "endpoints": self.pool.status()["endpoints"],
+                "hedging": hedge_status(),
+                "keep_alive": OLLAMA_KEEP_ALIVE,
+                "embed_model": self.embed_model,
+            }
+    
+    def degraded_periods_between(self, start: float, end: float) -> list:
+        """Degraded periods (including an ongoing one) overlapping [start, end]"""
+        with self._health_lock:
+            periods = [p for p in self._degraded_history if p["start"] <= end and p["end"] >= start]
+            if self._degraded_since is not None and self._degraded_since <= end:
+                periods.append({
+                    "start": self._degraded_since,
+                    "end": None,
+                    "reason": self._degraded_reason,
+                })
+            return periods
+    
+    def start_background_probe(self) -> threading.Thread:
+        """Probe backends off the request path (no-op if a probe is running)"""
+        with self._probe_lock:
+            if self._probe_thread is None or not self._probe_thread.is_alive():
+                self._probe_done.clear()
+                self._probe_thread = threading.Thread(
+                    target=self._initialize_backends, name="hybrid-model-probe", daemon=True
+                )
+                self._probe_thread.start()
+            return self._probe_thread
     
     def is_available(self) -> bool:
-        """Check if any backend is available"""
+        """Check if any backend is available (waits briefly for a startup probe)"""
+        self._probe_done.wait(PROBE_WAIT_SECONDS)
         return self.ollama_available
     
-    def chat(self, prompt: str, max_tokens: int = 512, temperature: float = 0.3) -> Dict[str, Any]:
-        """Generate response using best available backend"""
+    def chat(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: float = 0.3,
+        use_cache: bool = True,
+        stop_at_json: bool = False,
+        schema: Optional[Dict[str, Any]] = None,
+        difficulty: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Generate response using best available backend
+        
+        Low-temperature prompts are served from the persistent response cache
+        when an identical call was made before, and identical concurrent
+        prompts share a single upstream generation.
+        
+        With stop_at_json=True the generation is streamed and cancelled as
+        soon as a complete JSON object has been produced; "response" is then
+        just that object.
+        
+        With a JSON schema, Ollama constrains decoding to it and the reply is
+        validated; "parsed" holds the resulting dict (None if it could not be
+        made valid) and "schema_errors" what was wrong with it.
+        
+        The model is routed per call (see model_router); difficulty is one of
+        the DIFFICULTY_* hints and is estimated from the prompt when omitted.
+        """
+        # Route first so the cache key names the model that actually answers
+        model = self._route(prompt, max_tokens, difficulty)
+        
+        def generate():
+            if schema is None:
+                return self._generate(prompt, max_tokens, temperature, stop_at_json, None, model)
+            return self._generate_structured(prompt, max_tokens, temperature, stop_at_json, schema, model)
+        
+        if not use_cache or temperature > LLM_CACHE_MAX_TEMPERATURE:
+            return generate()
+        
+        key = self.cache.make_key(
+            model or self.selected_model or self.model, prompt, temperature, max_tokens,
+            stop_at_json=stop_at_json, schema=schema,
+        )
+        result, source = self.cache.get_or_compute(
+            key,
+            generate,
+            cacheable=lambda r: r.get("backend") == "ollama" and (schema is None or r.get("parsed") is not None),
+        )
+        return {**result, "cache": source}
+    
+    def chat_batched(
+        self,
+        shared: str,
+        item: str,
+        schema: Dict[str, Any],
+        max_tokens: int = 512,
+        temperature: float = 0.3,
+    ) -> Dict[str, Any]:
+        """Structured generation for one item against a shared context
+        
+        Concurrent callers with the same shared context, schema and options
+        are packed into one prompt (see llm_batcher). The result has the same
+        shape as chat(schema=...) plus "batch_size".
+        """
+        return self.batcher.submit(shared, item, schema, max_tokens, temperature)
+    
+    def embed(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """Embeddings for texts from Ollama's /api/embed (one call, scheduled like generations)
+        
+        Raises:
+            RuntimeError: if Ollama is unavailable or the reply is unusable
+        """
+        model = model or self.embed_model
+        if not self.is_available():
+            raise RuntimeError("Ollama is not available")
+        payload = {"model": model, "input": texts, "keep_alive": OLLAMA_KEEP_ALIVE}
+        with self.scheduler.slot():
+            try:
+                with self.pool.post("/api/embed", payload, timeout=60) as (_, response):
+                    if response.status_code != 200:
+                        raise RuntimeError(f"Embedding failed: HTTP {response.status_code}")
+                    embeddings = response.json().get("embeddings") or []
+            except NoEndpointAvailable as e:
+                raise RuntimeError(str(e)) from e
+        if len(embeddings) != len(texts):
+            raise RuntimeError(f"Embedding returned {len(embeddings)} vectors for {len(texts)} texts")
+        return embeddings
+    
+    def _route(self, prompt: str, max_tokens: int, difficulty: Optional[int] = None) -> Optional[str]:
+        """Model for a call (see model_router); None while Ollama is unavailable"""
+        if not self.ollama_available:
+            return None
+        return self.router.route(
+            prompt, max_tokens, difficulty, self.scheduler.queued(), self.scheduler.max_concurrency
+        ) or self.selected_model
+    
+    def _generate_structured(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        stop_at_json: bool,
+        schema: Dict[str, Any],
+        model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Generate against a JSON schema, with at most one repair attempt"""
+        result = self._generate(prompt, max_tokens, temperature, stop_at_json, schema, model)
+        parsed, errors = parse_structured(result["response"], schema)
+        if result["backend"] == "ollama":
+            self.router.record_quality(result["model"], valid=not errors, repaired=False)
+        
+        if errors and result["backend"] == "ollama":
+            print(f"> [HybridModel] Reply failed schema ({errors[0]}), repairing", file=sys.stderr)
+            repair_prompt = build_repair_prompt(prompt, result["response"], errors, schema)
+            result = self._generate(repair_prompt, max_tokens, 0.0, stop_at_json, schema, model)
+            parsed, errors = parse_structured(result["response"], schema)
+            result["repaired"] = True
+            if result["backend"] == "ollama":
+                self.router.record_quality(result["model"], valid=not errors, repaired=True)
+        
+        return {**result, "parsed": parsed, "schema_errors": errors}
+    
+    def _generate(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        stop_at_json: bool = False,
+        schema: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run one generation on the best available backend (no caching)"""
+        
+        dropped = None
         
         # Try Ollama
         if self.ollama_available:
+            model = model or self._route(prompt, max_tokens) or self.selected_model
+            self._recent_models.add(model)
+            payload = {
+                "model": model,
+                "prompt": prompt,
+                "stream": stop_at_json,
+                "keep_alive": OLLAMA_KEEP_ALIVE,
+                "options": {
+                    "temperature": temperature,
+                    "num_predict": max_tokens
+                }
+            }
+            if schema is not None:
+                payload["format"] = schema
             try:
-                response = requests.post(
-                    "http://localhost:11434/api/generate",
-                    json={
-                        "model": self.selected_model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": temperature,
-                            "num_predict": max_tokens
-                        }
-                    },
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "response": result.get("response", ""),
-                        "model": self.selected_model,
-                        "backend": "ollama"
-                    }
-                else:
-                    print(f"> [HybridModel] Ollama error: {response.status_code}", file=sys.stderr)
+                with self.scheduler.slot():
+                    if stop_at_json:
+                        result = self._generate_streaming(payload)
+                    else:
+                        result = self._generate_blocking(payload)
+                self.router.record_call(model, result is not None, result and result.get("timing"))
+                if result is not None:
+                    return result
                     
+            except SchedulerRejected as e:
+                print(f"> [HybridModel] Dropped to heuristics: {e}", file=sys.stderr)
+                dropped = str(e)
+            except NoEndpointAvailable as e:
+                # Endpoints are down or lack the model; the pool re-probes them
+                print(f"> [HybridModel] Dropped to heuristics: {e}", file=sys.stderr)
+            except requests.HTTPError as e:
+                # Every endpoint answered with a server error; they are still up
+                print(f"> [HybridModel] Ollama error: {e}", file=sys.stderr)
+                self.router.record_call(model, False)
+            except requests.Timeout as e:
+                # The endpoint is slow, not down; this call falls back on its own
+                print(f"> [HybridModel] Ollama timed out: {e}", file=sys.stderr)
+                self.router.record_call(model, False)
             except Exception as e:
                 print(f"> [HybridModel] Ollama failed: {e}", file=sys.stderr)
-                self.ollama_available = False
+                self.router.record_call(model, False)
+                self._mark_unavailable(f"Request failed: {e}")
         
         # Fall back to heuristics
-        return {
+        result = {
             "response": self._heuristic_response(prompt),
             "model": "heuristics",
             "backend": "heuristics"
         }
+        if dropped:
+            result["dropped"] = dropped
+        return result
+    
+    def _generate_blocking(self, payload: Dict[str, Any]):
+        """Single non-streaming /api/generate call; None on HTTP errors"""
+        started = time.perf_counter()
+        with self.pool.post("/api/generate", payload) as (endpoint, response):
+            if response.status_code != 200:
+                print(f"> [HybridModel] Ollama error: {response.status_code}", file=sys.stderr)
+                return None
+            result = response.json()
+        
+        return {
+            "response": result.get("response", ""),
+            "model": payload["model"],
+            "backend": "ollama",
+            "endpoint": endpoint.url,
+            "timing": {
+                "total_ms": round((time.perf_counter() - started) * 1000, 1),
+                "tokens": result.get("eval_count"),
+                "early_stop": False,
+                **ollama_costs(result),
+            }
+        }
+    
+    def _generate_streaming(self, payload: Dict[str, Any]):
+        """Stream /api/generate and stop once a JSON object is complete; None on HTTP errors"""
+        started = time.perf_counter()
+        first_token_at = None
+        tokens = 0
+        pieces = []
+        completed = None
+        final = None
+        scanner = JSONObjectScanner()
+        
+        # Leaving the block closes the connection, which cancels generation in Ollama
+        with self.pool.post("/api/generate", payload, stream=True) as (endpoint, response):
+            if response.status_code != 200:
+                print(f"> [HybridModel] Ollama error: {response.status_code}", file=sys.stderr)
+                return None
+            
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("response", "")
+                if token:
+                    tokens += 1
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    pieces.append(token)
+                    completed = scanner.feed(token)
+                    if completed is not None:
+                        break
+                if chunk.get("done"):
+                    final = chunk
+                    break
+        
+        finished = time.perf_counter()
+        return {
+            "response": completed if completed is not None else "".join(pieces),
+            "model": payload["model"],
+            "backend": "ollama",
+            "endpoint": endpoint.url,
+            "timing": {
+                "ttft_ms": round((first_token_at - started) * 1000, 1) if first_token_at else None,
+                "ms_per_token": round((finished - first_token_at) * 1000 / max(1, tokens - 1), 1) if first_token_at else None,
+                "total_ms": round((finished - started) * 1000, 1),
+                "tokens": tokens,
+                "early_stop": completed is not None,
+                **ollama_costs(final),
+            }
+        }
     
     def _heuristic_response(self, prompt: str) -> str:
         """Fallback heuristic response"""
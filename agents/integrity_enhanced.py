@@ -2,19 +2,29 @@
 Enhanced Integrity Agent - AI-Powered Resume Analysis
 """
 
-import json
 import sys
 import os
-import re
 
 # Add current directory to path to find hybrid_model
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from hybrid_model import get_hybrid_client
+from hedging import hedged_call
+from prompt_compaction import compact_text, RESUME_TOKEN_BUDGET
 
-def scan_resume_integrity(resume_path, use_ai_models=True, ollama_available=True):
-    """Scan resume for integrity using AI if available"""
+INTEGRITY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 10},
+        "reasoning": {"type": "string"},
+        "flags": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["score", "reasoning", "flags"],
+}
+
+def scan_resume_integrity(resume_path, use_ai_models=True, ollama_available=True, fused_verdict=None, on_upgrade=None):
+    """Scan resume for integrity using AI if available (reusing a fused verdict section when given)"""
     print(f"> [IntegrityEnhanced] Scanning resume: {resume_path}", file=sys.stderr)
     
     # 1. Extract Text
@@ -24,16 +34,27 @@ def scan_resume_integrity(resume_path, use_ai_models=True, ollama_available=True
         doc = fitz.open(resume_path)
         for page in doc:
             resume_text += page.get_text()
-        resume_text_excerpt = resume_text[:2000]
+        # Repeats are merged with a count, so keyword stuffing stays visible
+        resume_text_excerpt = compact_text(resume_text, RESUME_TOKEN_BUDGET)
     except Exception as e:
         print(f"> [IntegrityEnhanced] Extraction failed: {e}", file=sys.stderr)
         return {"agent": "integrity", "score": 0, "error": str(e)}
 
     # 2. AI Analysis
     if use_ai_models and ollama_available:
-        try:
-            client = get_hybrid_client()
-            prompt = f"""You are a professional hiring integrity officer. Analyze this resume excerpt for authenticity, hidden text, keyword stuffing, or inconsistencies.
+        section = (fused_verdict or {}).get('sections', {}).get('integrity')
+        if section is not None:
+            result = dict(section)
+            result['agent'] = 'integrity'
+            result['backend_used'] = fused_verdict.get('backend', 'ollama')
+            result['model'] = fused_verdict.get('model', 'unknown')
+            result['mode'] = 'fused'
+            return result
+        
+        def ask_llm():
+            try:
+                client = get_hybrid_client()
+                prompt = f"""You are a professional hiring integrity officer. Analyze this resume excerpt for authenticity, hidden text, keyword stuffing, or inconsistencies.
 
 Resume Excerpt:
 {resume_text_excerpt}
@@ -45,22 +66,26 @@ Return ONLY a valid JSON object with this structure:
     "flags": ["<list of specific suspicious findings>"]
 }}
 """
-            response = client.chat(prompt, max_tokens=300, temperature=0.2)
-            
-            # Parse JSON from response
-            text = response.get('response', '{}')
-            # Extract JSON block
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                result['agent'] = 'integrity'
-                result['backend_used'] = response.get('backend', 'ollama')
-                result['model'] = response.get('model', 'unknown')
-                return result
+                response = client.chat(prompt, max_tokens=300, temperature=0.2, stop_at_json=True, schema=INTEGRITY_SCHEMA)
                 
-        except Exception as e:
-            print(f"> [IntegrityEnhanced] AI failed: {e}", file=sys.stderr)
+                result = response.get('parsed')
+                if result is not None:
+                    result['agent'] = 'integrity'
+                    result['backend_used'] = response.get('backend', 'ollama')
+                    result['model'] = response.get('model', 'unknown')
+                    return result
+                    
+            except Exception as e:
+                print(f"> [IntegrityEnhanced] AI failed: {e}", file=sys.stderr)
+            return None
+        
+        return hedged_call('integrity', ask_llm, lambda: _heuristic_integrity(resume_text), on_upgrade)
 
+    return _heuristic_integrity(resume_text)
+
+
+def _heuristic_integrity(resume_text):
+    """Keyword heuristics used when the LLM is unavailable or too slow"""
     # 3. Fallback to Heuristics (importing from simple agent logic or re-implementing)
     # Re-implementing basic logic here for standalone stability
     flags = []
@@ -82,5 +107,6 @@ Return ONLY a valid JSON object with this structure:
         "backend_used": "heuristics"
     }
 
+
 if __name__ == "__main__":
     scan_resume_integrity("test.pdf")
@@ -0,0 +1,296 @@
+"""
+Lexical Index - BM25 keyword retrieval over evaluated resumes.
+
+Semantic search (candidate_index.py) finds resumes that read like a job
+description; this index answers exact-skill questions such as "everyone
+mentioning Kafka and Rust". Resume text is normalized into tokens (lowercase,
+skill punctuation kept: c++, c#, node.js, ci/cd; stopwords dropped) and stored
+as an inverted index in SQLite (data/lexical_index/index.sqlite3):
+
+    terms(term_id, term)                     -- term dictionary
+    docs(doc, eval_id, length, overall_score, terms)
+    postings(term_id, doc, tf)               -- clustered by term_id
+
+Postings carry integer term ids rather than the term strings, which keeps
+each posting to a few bytes. docs.terms lists a document's distinct term ids
+so re-indexing it deletes its postings by primary key, without a second index
+on postings. The term dictionary is mirrored in memory.
+
+A query reads each term's posting list and scores documents with BM25 in
+NumPy; document lengths and overall scores are mirrored in memory so score
+filters and the length normalization need no extra queries.
+"""
+
+import re
+import sqlite3
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+LEXICAL_INDEX_PATH = Path(__file__).parent.parent / "data" / "lexical_index" / "index.sqlite3"
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it", "its",
+    "of", "on", "or", "our", "that", "the", "their", "this", "to", "was", "were", "will", "with", "you", "your",
+}
+# Words, keeping inner/trailing skill punctuation (c++, c#, node.js, ci/cd, scikit-learn)
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    term_id INTEGER PRIMARY KEY,
+    term TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    doc INTEGER PRIMARY KEY,
+    eval_id TEXT UNIQUE NOT NULL,
+    length INTEGER NOT NULL,
+    overall_score REAL,
+    terms TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term_id, doc)
+) WITHOUT ROWID;
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized index tokens of text."""
+    return [token for token in _TOKEN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+class LexicalIndex:
+    """
+    SQLite-backed inverted index with BM25 scoring.
+    """
+
+    def __init__(self, path: Path = LEXICAL_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(postings)")]
+        if "term" in columns:
+            # Postings keyed by term string (older layout): rebuilt by the backfill
+            print("> [LexicalIndex] Dropping index in the old layout; saved evaluations will be re-indexed", file=sys.stderr)
+            self._conn.executescript("DROP TABLE postings; DROP TABLE docs;")
+        self._conn.executescript(_SCHEMA)
+        self._term_ids: Dict[str, int] = dict(self._conn.execute("SELECT term, term_id FROM terms"))
+
+        # In-memory mirror of docs, indexed by doc id (eval_id None = no document)
+        self._doc_of: Dict[str, int] = {}
+        self._eval_ids: List[Optional[str]] = [None]
+        self._lengths = np.zeros(1, dtype=np.float32)
+        self._scores = np.full(1, np.nan, dtype=np.float32)
+        self._total_length = 0
+        rows = self._conn.execute("SELECT doc, eval_id, length, overall_score FROM docs").fetchall()
+        if rows:
+            self._grow(max(row[0] for row in rows))
+        for doc, eval_id, length, overall_score in rows:
+            self._mirror(doc, eval_id, length, overall_score)
+
+    def _grow(self, doc: int) -> None:
+        """Make the mirror arrays hold doc. Caller holds the lock (or is __init__)."""
+        if doc < len(self._lengths):
+            return
+        size = max(doc + 1, 2 * len(self._lengths))
+        extra = size - len(self._lengths)
+        self._eval_ids.extend([None] * extra)
+        self._lengths = np.concatenate([self._lengths, np.zeros(extra, dtype=np.float32)])
+        self._scores = np.concatenate([self._scores, np.full(extra, np.nan, dtype=np.float32)])
+
+    def _mirror(self, doc: int, eval_id: str, length: int, overall_score: Optional[float]) -> None:
+        self._total_length += length - int(self._lengths[doc])
+        self._doc_of[eval_id] = doc
+        self._eval_ids[doc] = eval_id
+        self._lengths[doc] = length
+        self._scores[doc] = np.nan if overall_score is None else overall_score
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    def __contains__(self, eval_id: str) -> bool:
+        return eval_id in self._doc_of
+
+    def add_many(self, documents: Iterable[Tuple[str, str, Optional[float]]]) -> int:
+        """
+        Index (eval_id, resume text, overall_score) documents in one transaction.
+
+        An eval_id that is already indexed has its postings replaced.
+
+        Returns:
+            Number of documents indexed
+        """
+        # A repeated eval_id in one batch: the last one wins
+        documents = {eval_id: (text, overall_score) for eval_id, text, overall_score in documents}
+        postings = []
+        mirrored = []
+        new_terms: Dict[str, int] = {}
+        with self._lock:
+            with self._conn:
+                for eval_id, (text, overall_score) in documents.items():
+                    counts = Counter(tokenize(text))
+                    length = sum(counts.values())
+                    term_tfs = []
+                    for term, tf in counts.items():
+                        term_id = self._term_ids.get(term) or new_terms.get(term)
+                        if term_id is None:
+                            term_id = self._conn.execute("INSERT INTO terms (term) VALUES (?)", (term,)).lastrowid
+                            new_terms[term] = term_id
+                        term_tfs.append((term_id, tf))
+                    terms = " ".join(str(term_id) for term_id, _ in term_tfs)
+                    doc = self._doc_of.get(eval_id)
+                    if doc is None:
+                        doc = self._conn.execute(
+                            "INSERT INTO docs (eval_id, length, overall_score, terms) VALUES (?, ?, ?, ?)",
+                            (eval_id, length, overall_score, terms),
+                        ).lastrowid
+                    else:
+                        old_terms = self._conn.execute("SELECT terms FROM docs WHERE doc = ?", (doc,)).fetchone()[0]
+                        self._conn.executemany(
+                            "DELETE FROM postings WHERE term_id = ? AND doc = ?",
+                            [(int(term_id), doc) for term_id in old_terms.split()],
+                        )
+                        self._conn.execute(
+                            "UPDATE docs SET length = ?, overall_score = ?, terms = ? WHERE doc = ?",
+                            (length, overall_score, terms, doc),
+                        )
+                    postings.extend((term_id, doc, tf) for term_id, tf in term_tfs)
+                    mirrored.append((doc, eval_id, length, overall_score))
+                # Inserting in key order keeps B-tree writes local
+                postings.sort()
+                self._conn.executemany("INSERT INTO postings (term_id, doc, tf) VALUES (?, ?, ?)", postings)
+            # Committed: only now do the in-memory mirrors change
+            self._term_ids.update(new_terms)
+            for doc, eval_id, length, overall_score in mirrored:
+                self._grow(doc)
+                self._mirror(doc, eval_id, length, overall_score)
+        return len(mirrored)
+
+    def add(self, eval_id: str, text: str, overall_score: Optional[float] = None) -> None:
+        """Index one resume."""
+        self.add_many([(eval_id, text, overall_score)])
+
+    def update_score(self, eval_id: str, overall_score: Optional[float]) -> None:
+        """Record a re-synthesized overall score for an indexed evaluation."""
+        with self._lock, self._conn:
+            doc = self._doc_of.get(eval_id)
+            if doc is None:
+                return
+            self._conn.execute("UPDATE docs SET overall_score = ? WHERE doc = ?", (overall_score, doc))
+            self._scores[doc] = np.nan if overall_score is None else overall_score
+
+    def search(
+        self,
+        query: str,
+        k: int = 20,
+        require_all: bool = True,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        score_weight: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-k evaluations for a keyword query.
+
+        Args:
+            query: Keywords ("kafka rust")
+            k: Results to return
+            require_all: Only documents containing every query term
+            min_score, max_score: Filter on the stored overall_score (0-10)
+            score_weight: Blend of overall_score into the ranking
+                (0 = BM25 only, 1 = overall_score only)
+
+        Returns:
+            Dicts with eval_id, bm25, overall_score, rank_score, matched_terms
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            postings = [
+                np.array(
+                    self._conn.execute("SELECT doc, tf FROM postings WHERE term_id = ?", (self._term_ids[term],)).fetchall(),
+                    dtype=np.int64,
+                ) if term in self._term_ids else np.zeros((0, 2), dtype=np.int64)
+                for term in terms
+            ]
+            lengths = self._lengths
+            overall = self._scores
+            eval_ids = self._eval_ids
+            total_docs = len(self._doc_of)
+            average_length = self._total_length / max(total_docs, 1)
+
+        bm25 = np.zeros(len(lengths), dtype=np.float64)
+        matched = np.zeros(len(lengths), dtype=np.int32)
+        for rows in postings:
+            if not len(rows):
+                continue
+            docs, tf = rows[:, 0], rows[:, 1].astype(np.float64)
+            df = len(docs)
+            idf = np.log(1.0 + (total_docs - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths[docs] / max(average_length, 1e-9))
+            bm25[docs] += idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+            matched[docs] += 1
+
+        mask = matched >= (len(terms) if require_all else 1)
+        if min_score is not None:
+            mask &= overall >= min_score
+        if max_score is not None:
+            mask &= overall <= max_score
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+
+        rank = bm25[candidates]
+        if score_weight:
+            best = rank.max() or 1.0
+            rank = (1.0 - score_weight) * rank / best + score_weight * np.nan_to_num(overall[candidates]) / 10.0
+        k = min(k, len(candidates))
+        top = np.argpartition(-rank, k - 1)[:k]
+        top = top[np.argsort(-rank[top])]
+        return [
+            {
+                "eval_id": eval_ids[candidates[i]],
+                "bm25": round(float(bm25[candidates[i]]), 4),
+                "overall_score": None if np.isnan(overall[candidates[i]]) else round(float(overall[candidates[i]]), 2),
+                "rank_score": round(float(rank[i]), 4),
+                "matched_terms": int(matched[candidates[i]]),
+            }
+            for i in top
+        ]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            total = len(self._doc_of)
+            return {
+                "documents": total,
+                "average_length": round(self._total_length / total, 1) if total else 0,
+                "terms": len(self._term_ids),
+                "path": str(self.path),
+            }
+
+
+_lexical_index: Optional[LexicalIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> LexicalIndex:
+    """Get or open the global lexical index"""
+    global _lexical_index
+    with _index_lock:
+        if _lexical_index is None:
+            _lexical_index = LexicalIndex()
+        return _lexical_index
@@ -0,0 +1,197 @@
+"""
+LLM Batcher - Packs compatible prompts from concurrent callers into one call.
+
+During batch evaluation every candidate's relevance prompt carries the same
+job description and differs only in the resume excerpt. Requests that share
+their context, schema and options and arrive within BATCH_WINDOW_SECONDS of
+each other are packed (up to BATCH_MAX_ITEMS) into one structured prompt
+whose verdict is an array with one entry per item. The entries are then
+fanned back out to the waiting callers. Packed calls run on a pool sized to
+Ollama's parallelism (OLLAMA_NUM_PARALLEL), so batch throughput tracks what
+the server can actually run at once.
+"""
+
+import sys
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from llm_scheduler import OLLAMA_NUM_PARALLEL, current_request, request_priority
+
+# How long the first request of a group waits for companions
+BATCH_WINDOW_SECONDS = 0.05
+# Items packed into one prompt
+BATCH_MAX_ITEMS = 4
+
+
+class _Pending:
+    """One caller waiting for its share of a batch."""
+
+    def __init__(self, item: str, deadline: Optional[float]):
+        self.item = item
+        self.deadline = deadline
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+def build_single_prompt(shared: str, item: str) -> str:
+    """Prompt for an item that found no companions."""
+    return f"""{shared}
+
+{item}
+
+Return ONLY a valid JSON object."""
+
+
+def build_packed_prompt(shared: str, items: List[str]) -> str:
+    """One prompt with the shared context once and every item numbered."""
+    blocks = "\n\n".join(f"### Item {i + 1}\n{item}" for i, item in enumerate(items))
+    return f"""{shared}
+
+Evaluate each of the following {len(items)} items independently.
+
+{blocks}
+
+Return ONLY a valid JSON object {{"results": [...]}} with exactly {len(items)} entries, one per item, in item order."""
+
+
+def packed_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Schema of a packed verdict: {"results": [<schema>, ...]}."""
+    return {
+        "type": "object",
+        "properties": {"results": {"type": "array", "items": schema}},
+        "required": ["results"],
+    }
+
+
+class LLMBatcher:
+    """
+    Gathers compatible structured requests and runs them as packed prompts.
+    """
+
+    def __init__(
+        self,
+        client,
+        parallelism: int = OLLAMA_NUM_PARALLEL,
+        window: float = BATCH_WINDOW_SECONDS,
+        max_items: int = BATCH_MAX_ITEMS,
+    ):
+        self.client = client
+        self.window = window
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._groups: Dict[str, List[_Pending]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="llm-batch")
+        self.stats = {"requests": 0, "batches": 0, "packed_items": 0, "unpacked_fallbacks": 0}
+
+    def submit(
+        self, shared: str, item: str, schema: Dict[str, Any], max_tokens: int = 512, temperature: float = 0.3
+    ) -> Dict[str, Any]:
+        """
+        Evaluate one item against a shared context, batched with compatible callers.
+
+        Blocks until the item's verdict is available. The result has the same
+        shape as HybridModelClient.chat(schema=...) plus "batch_size".
+        """
+        self.stats["requests"] += 1
+        options = (shared, schema, max_tokens, temperature)
+        if not self.client.ollama_available:
+            return self._run_single(item, *options)
+
+        # Batches run on pool threads, so carry the caller's scheduling class along
+        priority, deadline = current_request()
+        key = hashlib.sha256(
+            json.dumps([shared, schema, max_tokens, temperature, priority], sort_keys=True).encode()
+        ).hexdigest()
+        pending = _Pending(item, deadline)
+        full_group = None
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = []
+                timer = threading.Timer(self.window, self._flush, args=(key, group, options, priority))
+                timer.daemon = True
+                timer.start()
+            group.append(pending)
+            if len(group) >= self.max_items:
+                full_group = self._groups.pop(key)
+
+        if full_group is not None:
+            self._executor.submit(self._run_batch, full_group, options, priority)
+
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _flush(self, key: str, group: List[_Pending], options: tuple, priority: int) -> None:
+        """Window elapsed: dispatch the group unless it already filled up."""
+        with self._lock:
+            if self._groups.get(key) is not group:
+                return
+            del self._groups[key]
+        self._executor.submit(self._run_batch, group, options, priority)
+
+    def _run_single(self, item: str, shared: str, schema: Dict[str, Any], max_tokens: int, temperature: float):
+        response = self.client.chat(
+            build_single_prompt(shared, item),
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop_at_json=True,
+            schema=schema,
+        )
+        return {**response, "batch_size": 1}
+
+    def _run_batch(self, batch: List[_Pending], options: tuple, priority: int) -> None:
+        shared, schema, max_tokens, temperature = options
+        deadlines = [p.deadline for p in batch if p.deadline is not None]
+        try:
+            with request_priority(priority, min(deadlines) if deadlines else None):
+                self.stats["batches"] += 1
+                results = None
+                if len(batch) > 1:
+                    response = self.client.chat(
+                        build_packed_prompt(shared, [p.item for p in batch]),
+                        max_tokens=max_tokens * len(batch),
+                        temperature=temperature,
+                        stop_at_json=True,
+                        schema=packed_schema(schema),
+                    )
+                    verdicts = (response.get("parsed") or {}).get("results")
+                    if response.get("backend") == "ollama" and verdicts and len(verdicts) == len(batch):
+                        self.stats["packed_items"] += len(batch)
+                        results = [
+                            {
+                                "response": json.dumps(verdict),
+                                "parsed": verdict,
+                                "schema_errors": [],
+                                "model": response.get("model"),
+                                "backend": response["backend"],
+                                "batch_size": len(batch),
+                            }
+                            for verdict in verdicts
+                        ]
+                    else:
+                        print(f"> [LLMBatcher] Packed reply unusable, running {len(batch)} items singly", file=sys.stderr)
+                        self.stats["unpacked_fallbacks"] += 1
+
+                if results is None:
+                    results = [self._run_single(p.item, *options) for p in batch]
+
+            for pending, result in zip(batch, results):
+                pending.result = result
+        except BaseException as e:
+            for pending in batch:
+                pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+    def status(self) -> Dict[str, Any]:
+        """Queue and packing statistics."""
+        with self._lock:
+            waiting = sum(len(group) for group in self._groups.values())
+        return {"waiting": waiting, "max_items": self.max_items, "window_seconds": self.window, **self.stats}
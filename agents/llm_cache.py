@@ -0,0 +1,177 @@
+"""
+LLM Response Cache - Disk-backed LRU cache for local model generations.
+
+Identical low-temperature prompts (same job description + same resume, same
+model and options) produce effectively the same judgment, and each local
+CPU generation costs seconds. Responses are stored one file per entry under
+data/llm_cache with a total size budget; file mtimes carry the LRU order
+across restarts. Concurrent identical requests are coalesced so only one
+reaches the model.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+LLM_CACHE_DIR = Path(__file__).parent.parent / "data" / "llm_cache"
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024  # 50 MB
+# Generations above this temperature are too random to reuse
+LLM_CACHE_MAX_TEMPERATURE = 0.5
+
+
+class _InFlight:
+    """A computation other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMResponseCache:
+    """
+    Size-bounded LRU cache of LLM responses with in-flight deduplication.
+    """
+
+    def __init__(self, cache_dir: Path = LLM_CACHE_DIR, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None  # key -> size, LRU first
+        self._total_bytes = 0
+        self._inflight: Dict[str, _InFlight] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float, max_tokens: int, **extra: Any) -> str:
+        """Cache key over (model, prompt hash, temperature, max_tokens[, extra options])."""
+        prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+        material = json.dumps(
+            {"model": model, "prompt": prompt_hash, "temperature": temperature, "max_tokens": max_tokens, **extra},
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> None:
+        """Build the LRU index from disk (oldest mtime first). Caller holds the lock."""
+        if self._index is not None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                st = path.stat()
+                entries.append((st.st_mtime, path.stem, st.st_size))
+            except OSError:
+                continue
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(self._index.values())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached response and mark it most recently used."""
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "r") as f:
+                    value = json.load(f)
+                os.utime(path)  # persist recency for the next process
+            except (OSError, json.JSONDecodeError):
+                self._total_bytes -= self._index.pop(key, 0)
+                return None
+            self._index.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response, evicting least recently used entries over budget."""
+        data = json.dumps(value).encode()
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with self._lock:
+            self._load_index()
+            try:
+                tmp_path.write_bytes(data)
+                tmp_path.replace(path)
+            except OSError:
+                return  # Caching is optional, don't fail on errors
+            self._total_bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                old_key, size = self._index.popitem(last=False)
+                self._total_bytes -= size
+                self.stats["evictions"] += 1
+                try:
+                    self._path(old_key).unlink()
+                except OSError:
+                    pass
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Dict[str, Any]],
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True,
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Serve from cache, join an identical in-flight call, or compute.
+
+        Returns:
+            Tuple of (response, source) where source is "hit", "coalesced" or "miss"
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached, "hit"
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+
+        if not leader:
+            self.stats["coalesced"] += 1
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, "coalesced"
+
+        self.stats["misses"] += 1
+        try:
+            flight.result = compute()
+            if cacheable(flight.result):
+                self.put(key, flight.result)
+            return flight.result, "miss"
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def status(self) -> Dict[str, Any]:
+        """Size and hit statistics."""
+        with self._lock:
+            self._load_index()
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                **self.stats,
+            }
+
@@ -0,0 +1,201 @@
+"""
+LLM Scheduler - Priority queue and concurrency cap in front of Ollama.
+
+Without it a running batch, an interactive /api/evaluate and background
+re-scoring all hit the local model server at once, overload it, and every
+request ends in the 30s timeout. The scheduler admits at most
+max_concurrency generations at a time and hands freed slots to the highest
+priority class first (interactive > batch > background, FIFO within a class).
+
+Every request carries a deadline. A request is dropped up front when the
+estimated queue wait plus service time would miss its deadline, and a
+waiting request is dropped when its deadline passes. Callers then fall back
+to heuristics instead of queuing forever.
+
+Priority and deadline are ambient per thread; use request_priority() around
+work that should not run as interactive.
+"""
+
+import os
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+# Concurrent generations the Ollama server runs (its OLLAMA_NUM_PARALLEL)
+OLLAMA_NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "1"))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch", PRIORITY_BACKGROUND: "background"}
+
+# Seconds a request of each class may take from submission (None = no limit)
+DEFAULT_DEADLINE_SECONDS = {PRIORITY_INTERACTIVE: 60.0, PRIORITY_BATCH: 600.0, PRIORITY_BACKGROUND: None}
+# Assumed generation time until the first one has been measured
+SERVICE_TIME_INITIAL = 10.0
+# Weight of the newest measurement in the service time average
+SERVICE_TIME_ALPHA = 0.2
+
+_context = threading.local()
+
+
+class SchedulerRejected(Exception):
+    """The request cannot be served before its deadline."""
+
+
+@contextmanager
+def request_priority(priority: int, deadline: Optional[float] = None):
+    """
+    Run LLM calls made by this thread at a priority class.
+
+    Args:
+        priority: PRIORITY_INTERACTIVE, PRIORITY_BATCH or PRIORITY_BACKGROUND
+        deadline: Absolute time (time.time()) by which calls must finish;
+            defaults to DEFAULT_DEADLINE_SECONDS for the class
+    """
+    if deadline is None and DEFAULT_DEADLINE_SECONDS[priority] is not None:
+        deadline = time.time() + DEFAULT_DEADLINE_SECONDS[priority]
+    previous = getattr(_context, "request", None)
+    _context.request = (priority, deadline)
+    try:
+        yield
+    finally:
+        _context.request = previous
+
+
+def current_request() -> Tuple[int, Optional[float]]:
+    """(priority, deadline) for this thread; interactive by default."""
+    request = getattr(_context, "request", None)
+    if request is not None:
+        return request
+    return PRIORITY_INTERACTIVE, time.time() + DEFAULT_DEADLINE_SECONDS[PRIORITY_INTERACTIVE]
+
+
+class _Waiter:
+    def __init__(self, priority: int, deadline: Optional[float]):
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued_at = time.time()
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+
+class LLMScheduler:
+    """
+    Admits LLM generations by priority under a global concurrency cap.
+    """
+
+    def __init__(self, max_concurrency: int = OLLAMA_NUM_PARALLEL):
+        self.max_concurrency = max(1, max_concurrency)
+        self.service_time = SERVICE_TIME_INITIAL
+        self._lock = threading.Lock()
+        self._queue: list = []  # heap of (priority, seq, waiter)
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self.stats = {
+            "granted": 0,
+            "dropped_estimate": 0,
+            "dropped_deadline": 0,
+            "wait_seconds_total": dict.fromkeys(PRIORITY_NAMES.values(), 0.0),
+            "granted_by_class": dict.fromkeys(PRIORITY_NAMES.values(), 0),
+        }
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one generation slot for the current thread's request.
+
+        Raises:
+            SchedulerRejected: if the request would miss its deadline
+        """
+        priority, deadline = current_request()
+        self._acquire(priority, deadline)
+        started = time.time()
+        try:
+            yield
+        finally:
+            self._release(time.time() - started)
+
+    def _acquire(self, priority: int, deadline: Optional[float]) -> None:
+        now = time.time()
+        with self._lock:
+            if self._in_flight < self.max_concurrency:
+                self._grant_locked(priority, 0.0)
+                return
+
+            ahead = sum(1 for p, _, w in self._queue if p <= priority and not w.cancelled)
+            # Slots turn over every service_time; running generations are half done on average
+            expected_done = now + (ahead // self.max_concurrency + 0.5) * self.service_time + self.service_time
+            if deadline is not None and expected_done > deadline:
+                self.stats["dropped_estimate"] += 1
+                raise SchedulerRejected(
+                    f"{PRIORITY_NAMES[priority]} request would finish in ~{expected_done - now:.0f}s, "
+                    f"after its deadline ({ahead} queued ahead)"
+                )
+
+            waiter = _Waiter(priority, deadline)
+            heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            waiter.event.wait(timeout)
+            with self._lock:
+                if waiter.granted:
+                    return
+                if deadline is not None and time.time() >= deadline:
+                    waiter.cancelled = True
+                    self.stats["dropped_deadline"] += 1
+                    raise SchedulerRejected(f"{PRIORITY_NAMES[priority]} request passed its deadline while queued")
+
+    def _grant_locked(self, priority: int, waited: float) -> None:
+        self._in_flight += 1
+        name = PRIORITY_NAMES[priority]
+        self.stats["granted"] += 1
+        self.stats["granted_by_class"][name] += 1
+        self.stats["wait_seconds_total"][name] += waited
+
+    def _release(self, duration: float) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.service_time += SERVICE_TIME_ALPHA * (duration - self.service_time)
+
+            now = time.time()
+            while self._queue and self._in_flight < self.max_concurrency:
+                priority, _, waiter = heapq.heappop(self._queue)
+                if waiter.cancelled:
+                    continue
+                waiter.granted = True
+                self._grant_locked(priority, now - waiter.enqueued_at)
+                waiter.event.set()
+
+    def queued(self) -> int:
+        """Requests currently waiting for a slot."""
+        with self._lock:
+            return sum(1 for _, _, waiter in self._queue if not waiter.cancelled)
+
+    def status(self) -> Dict[str, Any]:
+        """Queue depth per class, slots in use and drop counters."""
+        with self._lock:
+            depth = dict.fromkeys(PRIORITY_NAMES.values(), 0)
+            for priority, _, waiter in self._queue:
+                if not waiter.cancelled:
+                    depth[PRIORITY_NAMES[priority]] += 1
+            granted = self.stats["granted_by_class"]
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "queue_depth": depth,
+                "service_time_seconds": round(self.service_time, 2),
+                "avg_wait_seconds": {
+                    name: round(total / granted[name], 2) if granted[name] else 0.0
+                    for name, total in self.stats["wait_seconds_total"].items()
+                },
+                "granted": self.stats["granted"],
+                "granted_by_class": dict(granted),
+                "dropped_estimate": self.stats["dropped_estimate"],
+                "dropped_deadline": self.stats["dropped_deadline"],
+            }
@@ -0,0 +1,177 @@
+"""
+Model Router - Picks a local model per request by task difficulty and host load.
+
+Configured models form tiers from smallest to largest (OLLAMA_MODELS). A
+request's difficulty comes from the caller's hint or is estimated from prompt
+and output size: short classification prompts go to the smallest pulled model
+and long synthesis to the largest. Under pressure (CPU busy, little free RAM,
+a deep Ollama queue) each pressure signal shifts the request one tier down.
+
+OLLAMA_MIN_MODEL optionally sets a floor: tiers smaller than it are never
+routed to (e.g. OLLAMA_MIN_MODEL=qwen2.5-coder:14b pins every call to 14b).
+
+Per-model latency and quality counters are kept so tiers and thresholds can
+be tuned from /api/status.
+"""
+
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+DIFFICULTY_EASY = 0
+DIFFICULTY_MEDIUM = 1
+DIFFICULTY_HARD = 2
+
+# Smallest to largest; only models that are pulled take part in routing
+DEFAULT_MODEL_TIERS = "qwen2.5-coder:1.5b,qwen2.5-coder:7b,qwen2.5-coder:14b"
+MODEL_TIERS = [m.strip() for m in os.environ.get("OLLAMA_MODELS", DEFAULT_MODEL_TIERS).split(",") if m.strip()]
+# Optional floor: no call is routed to a tier smaller than this model
+MIN_MODEL = os.environ.get("OLLAMA_MIN_MODEL", "").strip() or None
+
+# Estimated tokens (prompt chars / 4 + max output tokens) per difficulty
+EASY_MAX_TOKENS = 500
+MEDIUM_MAX_TOKENS = 1500
+
+# Pressure thresholds; each one crossed shifts down one tier
+CPU_BUSY_PERCENT = 85.0
+MIN_AVAILABLE_RAM_FRACTION = 0.15
+QUEUE_DEPTH_PER_SLOT = 2
+# Host load is sampled at most this often
+LOAD_SAMPLE_SECONDS = 1.0
+
+
+def estimate_difficulty(prompt: str, max_tokens: int) -> int:
+    """Difficulty from the size of the work: prompt tokens plus output budget."""
+    tokens = len(prompt) // 4 + max_tokens
+    if tokens <= EASY_MAX_TOKENS:
+        return DIFFICULTY_EASY
+    if tokens <= MEDIUM_MAX_TOKENS:
+        return DIFFICULTY_MEDIUM
+    return DIFFICULTY_HARD
+
+
+class ModelRouter:
+    """
+    Routes requests across model tiers and records per-model counters.
+    """
+
+    def __init__(self, tiers: Optional[List[str]] = None, min_model: Optional[str] = MIN_MODEL):
+        self.tiers = list(tiers or MODEL_TIERS)
+        self.min_model = min_model
+        self.available: List[str] = []
+        self._lock = threading.Lock()
+        self._load: Dict[str, float] = {}
+        self._load_sampled_at = 0.0
+        self.counters: Dict[str, Dict[str, float]] = {}
+
+    def set_available(self, pulled: List[str], required: Optional[str] = None) -> None:
+        """Restrict routing to configured tiers that are pulled (plus the client's own model)."""
+        tiers = list(self.tiers)
+        if self.min_model in tiers:
+            tiers = tiers[tiers.index(self.min_model):]
+        if required and required not in tiers:
+            tiers.append(required)
+        available = [m for m in tiers if m in pulled]
+        with self._lock:
+            self.available = available
+
+    def host_load(self) -> Dict[str, float]:
+        """CPU percent and available RAM fraction, sampled at most once per LOAD_SAMPLE_SECONDS."""
+        now = time.time()
+        with self._lock:
+            if now - self._load_sampled_at >= LOAD_SAMPLE_SECONDS:
+                memory = psutil.virtual_memory()
+                self._load = {
+                    "cpu_percent": psutil.cpu_percent(interval=None),
+                    "available_ram_fraction": round(memory.available / memory.total, 3),
+                }
+                self._load_sampled_at = now
+            return dict(self._load)
+
+    def pressure(self, queue_depth: int, max_concurrency: int) -> List[str]:
+        """Names of the pressure signals currently crossed."""
+        load = self.host_load()
+        signals = []
+        if load["cpu_percent"] >= CPU_BUSY_PERCENT:
+            signals.append("cpu")
+        if load["available_ram_fraction"] < MIN_AVAILABLE_RAM_FRACTION:
+            signals.append("ram")
+        if queue_depth >= QUEUE_DEPTH_PER_SLOT * max_concurrency:
+            signals.append("queue")
+        return signals
+
+    def route(
+        self,
+        prompt: str,
+        max_tokens: int,
+        difficulty: Optional[int] = None,
+        queue_depth: int = 0,
+        max_concurrency: int = 1,
+    ) -> Optional[str]:
+        """
+        Pick the model for a request.
+
+        Returns:
+            Model name, or None when no configured model is pulled
+        """
+        with self._lock:
+            available = list(self.available)
+        if not available:
+            return None
+
+        if difficulty is None:
+            difficulty = estimate_difficulty(prompt, max_tokens)
+        # Spread difficulties over however many tiers are pulled
+        tier = round(difficulty * (len(available) - 1) / DIFFICULTY_HARD)
+        tier -= len(self.pressure(queue_depth, max_concurrency))
+        return available[max(0, tier)]
+
+    def _counter(self, model: str) -> Dict[str, float]:
+        return self.counters.setdefault(
+            model, {"calls": 0, "failures": 0, "total_ms": 0.0, "tokens": 0, "schema_valid": 0, "schema_invalid": 0, "repaired": 0}
+        )
+
+    def record_call(self, model: str, ok: bool, timing: Optional[Dict[str, Any]] = None) -> None:
+        """Latency counters for one generation."""
+        timing = timing or {}
+        with self._lock:
+            counter = self._counter(model)
+            counter["calls"] += 1
+            if not ok:
+                counter["failures"] += 1
+                return
+            counter["total_ms"] += timing.get("total_ms") or 0.0
+            counter["tokens"] += timing.get("tokens") or 0
+
+    def record_quality(self, model: str, valid: bool, repaired: bool) -> None:
+        """Quality counters: did the model's structured reply validate (and was a repair needed)."""
+        with self._lock:
+            counter = self._counter(model)
+            counter["schema_valid" if valid else "schema_invalid"] += 1
+            if repaired:
+                counter["repaired"] += 1
+
+    def status(self) -> Dict[str, Any]:
+        """Tiers, current load and per-model counters."""
+        load = self.host_load()
+        with self._lock:
+            models = {}
+            for model, c in self.counters.items():
+                succeeded = c["calls"] - c["failures"]
+                structured = c["schema_valid"] + c["schema_invalid"]
+                models[model] = {
+                    **c,
+                    "avg_ms": round(c["total_ms"] / succeeded, 1) if succeeded else None,
+                    "ms_per_token": round(c["total_ms"] / c["tokens"], 1) if c["tokens"] else None,
+                    "schema_valid_rate": round(c["schema_valid"] / structured, 3) if structured else None,
+                }
+            return {
+                "tiers": list(self.tiers),
+                "available": list(self.available),
+                "min_model": self.min_model,
+                "load": load,
+                "models": models,
+            }
@@ -0,0 +1,254 @@
+"""
+Ollama Pool - Spreads LLM calls over several Ollama servers.
+
+OLLAMA_BASE_URLS lists the servers (comma-separated; defaults to the single
+OLLAMA_BASE_URL). Each endpoint tracks which models it has pulled (from
+/api/tags), its in-flight requests and its health:
+
+- a request goes to the healthy endpoint serving the model with the fewest
+  outstanding requests (ties: fewest requests served)
+- connection errors and 5xx replies fail over to the next endpoint; a
+  connection error, or UNHEALTHY_AFTER_FAILURES errors in a row, takes the
+  endpoint out of rotation
+- a read timeout (the server accepted the request but is slow) goes back to
+  the caller: resending a long CPU generation elsewhere only doubles the load,
+  and a slow endpoint is not a down one
+- unhealthy endpoints are re-probed every ENDPOINT_RECHECK_SECONDS and rejoin
+  once /api/tags answers
+
+The client only degrades to heuristics when no endpoint can serve a request.
+"""
+
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+# Consecutive 5xx replies before an endpoint is taken out of rotation
+UNHEALTHY_AFTER_FAILURES = 3
+# How often unhealthy endpoints are re-probed
+ENDPOINT_RECHECK_SECONDS = 10.0
+TAGS_TIMEOUT_SECONDS = 2
+
+
+def endpoint_urls(default_url: str) -> List[str]:
+    """Configured Ollama base URLs (OLLAMA_BASE_URLS, else the single default)."""
+    urls = [u.strip().rstrip("/") for u in os.environ.get("OLLAMA_BASE_URLS", "").split(",") if u.strip()]
+    return urls or [default_url.rstrip("/")]
+
+
+def _serves(endpoint: "OllamaEndpoint", model: str) -> bool:
+    """Whether the endpoint has the model (an untagged name means :latest)."""
+    return model in endpoint.models or (":" not in model and f"{model}:latest" in endpoint.models)
+
+
+def _is_read_timeout(error: requests.ConnectionError) -> bool:
+    """Whether a ConnectionError is a read timeout (requests wraps those hit mid-stream)."""
+    return any(isinstance(arg, ReadTimeoutError) for arg in error.args)
+
+
+class NoEndpointAvailable(Exception):
+    """No healthy endpoint serves the requested model."""
+
+
+class OllamaEndpoint:
+    """One Ollama server and its counters."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy = False
+        self.models: Set[str] = set()
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.stats = {"requests": 0, "failures": 0, "failovers": 0}
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "models": sorted(self.models),
+            "outstanding": self.outstanding,
+            "last_error": self.last_error,
+            **self.stats,
+        }
+
+
+class OllamaPool:
+    """
+    Least-outstanding-requests balancing with failover over Ollama endpoints.
+    """
+
+    def __init__(self, urls: List[str], session: requests.Session, on_change: Optional[Callable[[], None]] = None):
+        self.endpoints = [OllamaEndpoint(url) for url in urls]
+        self.session = session
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._recheck_thread = None
+
+    def _probe(self, endpoint: OllamaEndpoint) -> bool:
+        """Refresh an endpoint's models from /api/tags; returns its health."""
+        try:
+            response = self.session.get(f"{endpoint.url}/api/tags", timeout=TAGS_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            models = {m.get("name") for m in response.json().get("models", [])}
+        except Exception as e:
+            with self._lock:
+                endpoint.healthy = False
+                endpoint.last_error = f"tags probe failed: {e}"
+            return False
+        with self._lock:
+            endpoint.models = models
+            endpoint.healthy = True
+            endpoint.consecutive_failures = 0
+        return True
+
+    def refresh(self) -> List[str]:
+        """Probe every endpoint; returns the models served by at least one healthy endpoint."""
+        for endpoint in self.endpoints:
+            self._probe(endpoint)
+        if any(not e.healthy for e in self.endpoints):
+            self._start_recheck()
+        if self.on_change:
+            self.on_change()
+        return self.models()
+
+    def models(self) -> List[str]:
+        """Models available on healthy endpoints."""
+        with self._lock:
+            return sorted({m for e in self.endpoints if e.healthy for m in e.models})
+
+    def endpoints_serving(self, model: str) -> List[OllamaEndpoint]:
+        """Healthy endpoints that have the model pulled."""
+        with self._lock:
+            return [e for e in self.endpoints if e.healthy and _serves(e, model)]
+
+    def _pick(self, model: str, exclude: Set[str]) -> Optional[OllamaEndpoint]:
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.healthy and _serves(e, model) and e.url not in exclude]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=lambda e: (e.outstanding, e.stats["requests"]))
+            endpoint.outstanding += 1
+            endpoint.stats["requests"] += 1
+            return endpoint
+
+    def _finish(self, endpoint: OllamaEndpoint) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+
+    def _record_failure(self, endpoint: OllamaEndpoint, reason: str, fatal: bool) -> None:
+        """Count a failed request; take the endpoint out of rotation when it looks down."""
+        with self._lock:
+            endpoint.stats["failures"] += 1
+            endpoint.consecutive_failures += 1
+            endpoint.last_error = reason
+            went_down = endpoint.healthy and (fatal or endpoint.consecutive_failures >= UNHEALTHY_AFTER_FAILURES)
+            if went_down:
+                endpoint.healthy = False
+        if went_down:
+            print(f"> [OllamaPool] {endpoint.url} out of rotation: {reason}", file=sys.stderr)
+            self._start_recheck()
+            if self.on_change:
+                self.on_change()
+
+    @contextmanager
+    def post(self, path: str, payload: Dict[str, Any], stream: bool = False, timeout: float = 30):
+        """
+        POST to the least-loaded healthy endpoint serving payload["model"].
+
+        Connection errors (including connect timeouts) and 5xx replies fail
+        over to the next endpoint; a 404 (model not pulled there) drops the
+        model from that endpoint. A read timeout is raised to the caller
+        without a retry and does not count against the endpoint's health.
+
+        Yields:
+            (endpoint, response); the response is closed on exit
+
+        Raises:
+            NoEndpointAvailable, or the last endpoint's error when all failed;
+            requests.ReadTimeout when the chosen endpoint is too slow
+        """
+        model = payload.get("model")
+        tried: Set[str] = set()
+        last_error: Optional[BaseException] = None
+        while True:
+            endpoint = self._pick(model, tried)
+            if endpoint is None:
+                if last_error is not None:
+                    raise last_error
+                raise NoEndpointAvailable(f"no healthy Ollama endpoint serves {model}")
+            tried.add(endpoint.url)
+            if len(tried) > 1:
+                with self._lock:
+                    endpoint.stats["failovers"] += 1
+
+            try:
+                response = self.session.post(f"{endpoint.url}{path}", json=payload, stream=stream, timeout=timeout)
+            except requests.ConnectionError as e:
+                # ConnectTimeout is a ConnectionError: the request never reached the server
+                self._finish(endpoint)
+                self._record_failure(endpoint, str(e), fatal=True)
+                last_error = e
+                continue
+            except requests.RequestException:
+                # Read timeouts and the like: the server has the request, don't resend it
+                self._finish(endpoint)
+                raise
+
+            if response.status_code >= 500 or response.status_code == 404:
+                response.close()
+                self._finish(endpoint)
+                if response.status_code == 404:
+                    with self._lock:
+                        endpoint.models.discard(model)
+                    if self.on_change:
+                        self.on_change()
+                else:
+                    self._record_failure(endpoint, f"HTTP {response.status_code}", fatal=False)
+                last_error = requests.HTTPError(f"{endpoint.url} returned HTTP {response.status_code}")
+                continue
+
+            with self._lock:
+                endpoint.consecutive_failures = 0
+            try:
+                with response:
+                    yield endpoint, response
+            except requests.ConnectionError as e:
+                if _is_read_timeout(e):
+                    raise requests.ReadTimeout(e) from e
+                self._record_failure(endpoint, str(e), fatal=True)
+                raise
+            finally:
+                self._finish(endpoint)
+            return
+
+    def _start_recheck(self) -> None:
+        with self._lock:
+            if self._recheck_thread is not None and self._recheck_thread.is_alive():
+                return
+            self._recheck_thread = threading.Thread(target=self._recheck_loop, name="ollama-pool-recheck", daemon=True)
+            self._recheck_thread.start()
+
+    def _recheck_loop(self) -> None:
+        """Re-probe unhealthy endpoints until every endpoint is back."""
+        while True:
+            time.sleep(ENDPOINT_RECHECK_SECONDS)
+            down = [e for e in self.endpoints if not e.healthy]
+            if not down:
+                return
+            recovered = [e for e in down if self._probe(e)]
+            for endpoint in recovered:
+                print(f"> [OllamaPool] {endpoint.url} back in rotation", file=sys.stderr)
+            if recovered and self.on_change:
+                self.on_change()
+
+    def status(self) -> Dict[str, Any]:
+        """Per-endpoint health, models and load."""
+        with self._lock:
+            return {"endpoints": [e.status() for e in self.endpoints]}
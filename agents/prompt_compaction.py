@@ -0,0 +1,276 @@
+"""
+Prompt Compaction - Fits resume, job description and code inputs into a token budget.
+
+Agents used to cut inputs by character count ([:400], [:800], [:2000]), which
+keeps the name, contact line and headers at the top of a resume and often
+drops the skills section entirely. Compaction instead:
+
+- splits text into lines/sentences and detects the section each belongs to
+  (skills, experience, requirements, benefits, ...)
+- merges duplicate lines, keeping a repeat count so keyword stuffing stays
+  visible to the integrity agent
+- scores each unit by section weight and skill-term density (terms the job
+  description asks for count extra)
+- keeps the best units that fit the budget, in their original order
+
+Tokens are estimated at CHARS_PER_TOKEN characters each, like model_router.
+"""
+
+import re
+from typing import Iterable, List, Optional, Set, Tuple
+
+CHARS_PER_TOKEN = 4
+
+# Default budgets per input (tokens)
+RESUME_TOKEN_BUDGET = 500
+JOB_TOKEN_BUDGET = 200
+CODE_TOKEN_BUDGET = 375
+# Budgets for the API server's short relevance check
+SHORT_RESUME_TOKEN_BUDGET = 150
+SHORT_JOB_TOKEN_BUDGET = 100
+# Resume budget when it sits next to a job description (relevance)
+RELEVANCE_RESUME_TOKEN_BUDGET = 200
+
+# Lines starting with # that are code, not comments: C/C++/C# preprocessor
+# directives and Rust attributes
+_HASH_CODE = re.compile(
+    r"#\s*(include|import|define|undef|if|ifdef|ifndef|elif|else|endif|pragma|error|warning|line|region|endregion|nullable)\b"
+    r"|#!?\["
+)
+
+# Units longer than this are split into sentences
+MAX_UNIT_CHARS = 240
+
+# Section heading patterns and how much their content is worth to a judge
+SECTION_PATTERNS = [
+    ("skills", r"(technical\s+)?skills|technologies|tech\s+stack|tools|competencies"),
+    ("experience", r"(work\s+|professional\s+)?experience|employment|work\s+history"),
+    ("projects", r"projects?|open\s+source|portfolio"),
+    ("requirements", r"requirements|qualifications|must\s+have|what\s+you('ll)?\s+need|you\s+have|nice\s+to\s+have|preferred"),
+    ("responsibilities", r"responsibilities|what\s+you('ll)?\s+do|the\s+role|duties"),
+    ("summary", r"(professional\s+)?summary|profile|objective|about\s+me"),
+    ("achievements", r"achievements|awards|honou?rs|competitive\s+programming"),
+    ("education", r"education|academics?"),
+    ("certifications", r"certifications?|licenses?"),
+    ("company", r"about\s+(us|the\s+company)|who\s+we\s+are|our\s+mission"),
+    ("benefits", r"benefits|perks|compensation|what\s+we\s+offer|equal\s+opportunity"),
+]
+SECTION_WEIGHTS = {
+    "skills": 3.0,
+    "requirements": 3.0,
+    "experience": 2.0,
+    "projects": 2.0,
+    "responsibilities": 2.0,
+    "achievements": 1.5,
+    "summary": 1.0,
+    "certifications": 1.0,
+    "education": 1.0,
+    "header": 0.5,
+    "company": 0.3,
+    "benefits": 0.1,
+}
+DEFAULT_SECTION_WEIGHT = 1.0
+
+# Skill vocabulary for density scoring (lowercase; matched on word boundaries)
+SKILL_TERMS = {
+    "python", "java", "javascript", "typescript", "go", "golang", "rust", "c++", "c#", "ruby", "php", "kotlin",
+    "swift", "scala", "sql", "bash", "react", "angular", "vue", "next.js", "node.js", "express", "django",
+    "flask", "fastapi", "spring", "rails", ".net", "graphql", "rest", "grpc", "api", "apis", "microservices",
+    "aws", "gcp", "azure", "docker", "kubernetes", "terraform", "ansible", "ci/cd", "jenkins", "linux",
+    "postgresql", "postgres", "mysql", "mongodb", "redis", "kafka", "rabbitmq", "elasticsearch", "spark",
+    "hadoop", "airflow", "pandas", "numpy", "pytorch", "tensorflow", "scikit-learn", "machine learning",
+    "deep learning", "nlp", "llm", "data pipelines", "distributed systems", "system design", "algorithms",
+    "data structures", "testing", "unit testing", "security", "oauth", "websocket", "git", "agile",
+}
+# Lines that are mostly contact details carry little for any judge
+CONTACT_PATTERN = re.compile(r"@|\+?\d[\d\s().-]{7,}\d|https?://|linkedin\.com|www\.", re.IGNORECASE)
+
+# A heading may carry one qualifier word ("Preferred Qualifications", "Key Skills")
+_HEADING = re.compile(
+    r"^\s*#*\s*(?:[a-z]+\s+)?(?:%s)\s*:?\s*$" % "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_PATTERNS),
+    re.IGNORECASE,
+)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+")
+_WORD = re.compile(r"[a-z0-9+#./-]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _section_of(line: str) -> Optional[str]:
+    """Section name when the line is a heading."""
+    if len(line) > 60:
+        return None
+    match = _HEADING.match(line)
+    if match:
+        return next(name for name, value in match.groupdict().items() if value)
+    return None
+
+
+def _units(text: str) -> List[Tuple[str, str, Optional[int]]]:
+    """
+    (section, unit text, heading index) in document order. Heading lines are
+    units with section None; heading index points at the unit's heading.
+    """
+    units = []
+    section, heading_index = "header", None
+    for raw in text.splitlines():
+        line = " ".join(raw.split())
+        if not line:
+            continue
+        heading = _section_of(line)
+        if heading:
+            section, heading_index = heading, len(units)
+            units.append((None, line, None))
+            continue
+        pieces = _SENTENCE_SPLIT.split(line) if len(line) > MAX_UNIT_CHARS else [line]
+        units.extend((section, piece, heading_index) for piece in pieces if piece)
+    return units
+
+
+def skill_terms(text: str) -> Set[str]:
+    """SKILL_TERMS that appear in text."""
+    lowered = " " + text.lower() + " "
+    return {term for term in SKILL_TERMS if re.search(r"(?<![a-z0-9])" + re.escape(term) + r"(?![a-z0-9])", lowered)}
+
+
+def _normalize(unit: str) -> str:
+    return " ".join(_WORD.findall(unit.lower()))
+
+
+def _score(section: str, unit: str, focus: Set[str]) -> float:
+    words = max(1, len(unit.split()))
+    terms = skill_terms(unit)
+    density = len(terms) / words
+    focus_hits = len(terms & focus)
+    score = SECTION_WEIGHTS.get(section, DEFAULT_SECTION_WEIGHT) * (1.0 + 4.0 * density + 0.5 * focus_hits)
+    if CONTACT_PATTERN.search(unit) and len(terms) == 0:
+        score *= 0.2
+    return score
+
+
+def compact_text(text: str, token_budget: int, focus_terms: Optional[Iterable[str]] = None) -> str:
+    """
+    Highest-information lines of text that fit the token budget.
+
+    Args:
+        text: Resume or job description
+        token_budget: Approximate tokens the result may use
+        focus_terms: Skill terms to favour (e.g. those the job asks for)
+
+    Returns:
+        Selected lines in original order, each kept section heading included
+    """
+    if not text:
+        return ""
+    if estimate_tokens(text) <= token_budget:
+        return text.strip()
+
+    focus = {term.lower() for term in (focus_terms or ())}
+    units = _units(text)
+
+    # Merge duplicates, remembering where each first appeared and how often
+    first_seen = {}
+    counts = {}
+    for index, (section, unit, _) in enumerate(units):
+        if section is None:
+            continue
+        key = _normalize(unit)
+        if not key:
+            continue
+        counts[key] = counts.get(key, 0) + 1
+        first_seen.setdefault(key, index)
+
+    candidates = sorted(
+        first_seen.items(),
+        key=lambda item: -_score(units[item[1]][0], units[item[1]][1], focus),
+    )
+
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    used = 0
+    selected = set()
+    for key, index in candidates:
+        _, unit, heading_index = units[index]
+        line = unit if counts[key] == 1 else f"{unit} [x{counts[key]}]"
+        cost = len(line) + 1
+        if heading_index is not None and heading_index not in selected:
+            cost += len(units[heading_index][1]) + 1  # heading shown before the unit
+        if used + cost > budget_chars:
+            continue
+        used += cost
+        selected.add(index)
+        if heading_index is not None:
+            selected.add(heading_index)
+
+    lines = []
+    for index, (section, unit, _) in enumerate(units):
+        if index not in selected:
+            continue
+        if section is None:
+            lines.append(unit)
+        else:
+            count = counts[_normalize(unit)]
+            lines.append(unit if count == 1 else f"{unit} [x{count}]")
+    return "\n".join(lines)
+
+
+def compact_resume(resume_text: str, token_budget: int = RESUME_TOKEN_BUDGET, job_description: str = "") -> str:
+    """Resume compacted to the budget, favouring skills the job description mentions."""
+    return compact_text(resume_text, token_budget, skill_terms(job_description) if job_description else None)
+
+
+def compact_job(job_description: str, token_budget: int = JOB_TOKEN_BUDGET) -> str:
+    """Job description compacted to the budget (requirements first, benefits last)."""
+    return compact_text(job_description, token_budget)
+
+
+def _banner_end(lines: List[str]) -> int:
+    """
+    Index of the first line after the leading comment banner (license headers,
+    shebang, encoding lines): blank lines, // runs, /* ... */ blocks and #
+    comments. Preprocessor directives (#include, #define, ...) and #[...]
+    attributes are code, so the banner ends there.
+    """
+    index = 0
+    while index < len(lines):
+        line = lines[index].lstrip()
+        if not line or line.startswith("//"):
+            index += 1
+        elif line.startswith("/*"):
+            while index < len(lines) and "*/" not in lines[index]:
+                index += 1
+            index += 1
+        elif line.startswith("#") and not _HASH_CODE.match(line):
+            index += 1
+        else:
+            break
+    return min(index, len(lines))
+
+
+def compact_code(code: str, token_budget: int = CODE_TOKEN_BUDGET) -> str:
+    """
+    Code compacted to the budget: blank runs collapsed, trailing whitespace
+    and leading license/banner comments dropped, then cut at a line boundary.
+    """
+    if not code:
+        return ""
+    lines = [line.rstrip() for line in code.splitlines()]
+    start = _banner_end(lines)
+    if start < len(lines):
+        lines = lines[start:]
+    compacted = []
+    for line in lines:
+        if not line and compacted and not compacted[-1]:
+            continue
+        compacted.append(line)
+
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    kept, used = [], 0
+    for line in compacted:
+        if used + len(line) + 1 > budget_chars:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return "\n".join(kept)
@@ -0,0 +1,107 @@
+"""
+Embedding Relevance - Scores job fit by semantic similarity instead of an LLM verdict.
+
+The job description and each resume are split into chunks and embedded
+through Ollama's /api/embed (see embeddings.py; vectors are cached by content
+hash, so a resume is embedded once ever and the job description once per
+batch). For every job-description chunk the best-matching resume chunk is
+found with one matrix product, and the mean of those best similarities
+(requirement coverage) is mapped onto the 0-10 relevance scale.
+
+Enable it in the API server with RELEVANCE_MODE=embedding.
+"""
+
+import sys
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from embeddings import chunk_text, embed_texts
+
+# "llm" (default) or "embedding"
+RELEVANCE_MODE = os.environ.get("RELEVANCE_MODE", "llm")
+# Coverage at or below SIM_FLOOR scores 0, at or above SIM_CEIL scores 10
+SIM_FLOOR = 0.3
+SIM_CEIL = 0.85
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def coverage_to_score(coverage: float) -> float:
+    """Map mean best-chunk cosine similarity onto 0-10."""
+    return round(float(np.clip((coverage - SIM_FLOOR) / (SIM_CEIL - SIM_FLOOR), 0.0, 1.0)) * 10, 1)
+
+
+def score_resumes(resume_texts: List[str], job_description: str, model: Optional[str] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Embedding relevance for several resumes against one job description.
+
+    The job description is embedded once and all resume chunks are scored in
+    a single (resume chunks x job chunks) similarity matrix.
+
+    Returns:
+        One relevance result per resume (None for an empty resume)
+
+    Raises:
+        RuntimeError: if the embedding endpoint is unavailable
+    """
+    job_chunks = chunk_text(job_description)
+    resume_chunks = [chunk_text(text or "") for text in resume_texts]
+    if not job_chunks:
+        return [None] * len(resume_texts)
+
+    job_vectors = _normalized(embed_texts(job_chunks, model=model))
+    flat = [chunk for chunks in resume_chunks for chunk in chunks]
+    if not flat:
+        return [None] * len(resume_texts)
+    resume_vectors = _normalized(embed_texts(flat, model=model))
+
+    # similarity[i, j]: resume chunk i vs job chunk j
+    similarity = resume_vectors @ job_vectors.T
+    counts = np.array([len(chunks) for chunks in resume_chunks])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    # Best resume chunk per job chunk, per resume
+    best = np.full((len(resume_texts), len(job_chunks)), -1.0, dtype=np.float32)
+    best[present] = np.maximum.reduceat(similarity, starts[present], axis=0)
+    coverage = best.mean(axis=1)
+
+    results = []
+    for index, chunks in enumerate(resume_chunks):
+        if not chunks:
+            results.append(None)
+            continue
+        score = coverage_to_score(coverage[index])
+        weakest = int(np.argmin(best[index]))
+        results.append({
+            'agent': 'relevance',
+            'score': score,
+            'reasoning': (
+                f"Semantic coverage of the job description is {coverage[index]:.2f} "
+                f"(least covered: \"{job_chunks[weakest][:80]}\")"
+            ),
+            'backend_used': 'embeddings',
+            'details': {
+                'coverage': round(float(coverage[index]), 3),
+                'chunk_similarity': [round(float(v), 3) for v in best[index]],
+                'job_chunks': len(job_chunks),
+                'resume_chunks': len(chunks),
+            },
+        })
+    return results
+
+
+def evaluate_embedding_relevance(resume_text: str, job_description: str) -> Optional[Dict[str, Any]]:
+    """Embedding relevance for one resume, or None when embeddings are unavailable."""
+    try:
+        return score_resumes([resume_text], job_description)[0]
+    except Exception as e:
+        print(f"> [RelevanceEmbedding] Embedding relevance failed: {e}", file=sys.stderr)
+        return None
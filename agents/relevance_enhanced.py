@@ -2,31 +2,73 @@
 Enhanced Relevance Agent - AI-Powered Job Matching
 """
 
-import json
 import sys
 import os
-import re
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from hybrid_model import get_hybrid_client
+from hedging import hedged_call
+from prompt_compaction import compact_job, compact_resume, RELEVANCE_RESUME_TOKEN_BUDGET
+from relevance_gate import gate_relevance
 
-def evaluate_job_relevance(resume_text, job_description, use_ai_models=True, ollama_available=True):
-    """Evaluate job relevance using AI if available"""
+RELEVANCE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 10},
+        "reasoning": {"type": "string"},
+        "key_skills_match": {"type": "array", "items": {"type": "string"}},
+        "missing_skills": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["score", "reasoning", "key_skills_match", "missing_skills"],
+}
+
+# Short score + reasoning verdict (used by the API server's quick relevance check)
+RELEVANCE_SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 10},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["score", "reasoning"],
+}
+
+def evaluate_job_relevance(resume_text, job_description, use_ai_models=True, ollama_available=True, fused_verdict=None, on_upgrade=None):
+    """Evaluate job relevance using AI if available (reusing a fused verdict section when given)
+    
+    The LLM is only called when the keyword heuristic is inside its
+    uncertainty band; the decision is recorded under 'gating'. An LLM call
+    that misses its SLO returns the keyword heuristic marked provisional and
+    hands the late answer to on_upgrade.
+    """
     print(f"> [RelevanceEnhanced] Evaluating match...", file=sys.stderr)
     
     # AI Analysis
     if use_ai_models and ollama_available:
-        try:
-            client = get_hybrid_client()
-            prompt = f"""You are a Technical Recruiter. Compare the candidate's resume to the job description.
+        section = (fused_verdict or {}).get('sections', {}).get('relevance')
+        if section is not None:
+            result = dict(section)
+            result['agent'] = 'relevance'
+            result['backend_used'] = fused_verdict.get('backend', 'ollama')
+            result['mode'] = 'fused'
+            return result
+        
+        heuristic, gating = gate_relevance(resume_text, job_description)
+        if not gating['use_llm']:
+            print(f"> [RelevanceEnhanced] Skipping LLM: {gating['reason']}", file=sys.stderr)
+            return {**heuristic, 'gating': gating}
+        
+        def ask_llm():
+            try:
+                client = get_hybrid_client()
+                prompt = f"""You are a Technical Recruiter. Compare the candidate's resume to the job description.
 
 Job Description:
-{job_description[:800]}
+{compact_job(job_description)}
 
 Resume Excerpt:
-{resume_text[:800]}
+{compact_resume(resume_text, RELEVANCE_RESUME_TOKEN_BUDGET, job_description)}
 
 Return ONLY a valid JSON object:
 {{
@@ -36,18 +78,20 @@ Return ONLY a valid JSON object:
     "missing_skills": ["<list of missing critical skills>"]
 }}
 """
-            response = client.chat(prompt, max_tokens=300, temperature=0.2)
-            
-            text = response.get('response', '{}')
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                result['agent'] = 'relevance'
-                result['backend_used'] = response.get('backend', 'ollama')
-                return result
+                response = client.chat(prompt, max_tokens=300, temperature=0.2, stop_at_json=True, schema=RELEVANCE_SCHEMA)
                 
-        except Exception as e:
-            print(f"> [RelevanceEnhanced] AI failed: {e}", file=sys.stderr)
+                result = response.get('parsed')
+                if result is not None:
+                    result['agent'] = 'relevance'
+                    result['backend_used'] = response.get('backend', 'ollama')
+                    result['gating'] = gating
+                    return result
+                    
+            except Exception as e:
+                print(f"> [RelevanceEnhanced] AI failed: {e}", file=sys.stderr)
+            return None
+        
+        return hedged_call('relevance', ask_llm, lambda: {**heuristic, 'gating': gating}, on_upgrade)
 
     # Fallback Heuristics
     score = 5.0
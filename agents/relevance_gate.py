@@ -0,0 +1,57 @@
+"""
+Relevance Gate - Calls the LLM for relevance only when the heuristic is unsure.
+
+The keyword heuristic (relevance.evaluate_job_relevance) is free, and for
+most candidates it is decisive: a resume with none or nearly all of the job's
+skill keywords doesn't need a model to tell it apart. The gate runs the
+heuristic first and sends the candidate to the LLM only when the keyword
+match ratio falls inside the uncertainty band, or when the job names too few
+keywords for the ratio to mean anything.
+
+The decision is returned with the result under "gating" so it can be audited.
+"""
+
+import os
+from typing import Any, Dict, Tuple
+
+from relevance import evaluate_job_relevance as heuristic_relevance
+
+# Match ratios strictly inside (low, high) are uncertain and go to the LLM
+DEFAULT_UNCERTAINTY_BAND = "0.2,0.8"
+UNCERTAINTY_BAND = tuple(float(v) for v in os.environ.get("RELEVANCE_UNCERTAINTY_BAND", DEFAULT_UNCERTAINTY_BAND).split(","))
+# Fewer job keywords than this and the ratio is too coarse to trust
+MIN_JOB_KEYWORDS = 3
+# Set RELEVANCE_GATE=0 to always call the LLM
+GATE_ENABLED = os.environ.get("RELEVANCE_GATE", "1") != "0"
+
+
+def gate_relevance(resume_text: str, job_description: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Heuristic relevance plus the decision whether the LLM is needed.
+
+    Returns:
+        (heuristic result, gating) where gating has "use_llm", "confidence"
+        (0 at a 50% match, 1 at 0% or 100%), "match_ratio", "band" and "reason"
+    """
+    heuristic = heuristic_relevance(resume_text, job_description)
+    details = heuristic.get("analysis_details") or {}
+    total = details.get("total_job_keywords", 0)
+    found = details.get("job_keywords_found", 0)
+    low, high = UNCERTAINTY_BAND
+
+    gating = {"band": [low, high], "match_ratio": None, "confidence": 0.0}
+    if not GATE_ENABLED:
+        gating.update(use_llm=True, reason="gate disabled")
+    elif "error" in heuristic:
+        gating.update(use_llm=True, reason=f"heuristic failed: {heuristic['error']}")
+    elif total < MIN_JOB_KEYWORDS:
+        gating.update(use_llm=True, reason=f"only {total} job keywords recognised")
+    else:
+        ratio = found / total
+        gating["match_ratio"] = round(ratio, 3)
+        gating["confidence"] = round(abs(ratio - 0.5) * 2, 3)
+        if low < ratio < high:
+            gating.update(use_llm=True, reason=f"{found}/{total} keyword match is inside the uncertainty band")
+        else:
+            gating.update(use_llm=False, reason=f"{found}/{total} keyword match is decisive")
+    return heuristic, gating
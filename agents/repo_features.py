@@ -0,0 +1,125 @@
+"""
+Repository Features - Precomputed signals shared by the GitHub-based agents.
+
+code_quality, uniqueness and cheater_detector all need the same facts about
+a repository (how many test/CI/docs files it has, which README sections
+exist, language mix). RepoFeatures holds them so they are extracted once per
+GitHubAnalysis instead of once per agent.
+"""
+
+from typing import Optional
+from dataclasses import dataclass, field
+
+# Path categories (tested against lowercased paths)
+CI_MARKERS = (".github/workflows", "jenkinsfile", ".gitlab-ci", ".travis")
+# uniqueness does not count Travis as CI
+CI_MARKERS_NO_TRAVIS = (".github/workflows", "jenkinsfile", ".gitlab-ci")
+DOC_MARKERS = ("docs/", "documentation/", "wiki/")
+PATH_CATEGORIES = ("test", "test_or_spec", "ci", "ci_no_travis", "docker", "docs", "docs_root")
+
+# README sections the agents look for, matched as a "## <title>" substring
+README_SECTIONS = ("Installation", "Setup", "Usage", "Examples", "Architecture", "Design", "API", "Endpoints")
+
+# Bump when extraction changes so cached features are extracted again
+FEATURES_VERSION = 2
+
+
+def categorize_path(path: str) -> list[str]:
+    """Return the PATH_CATEGORIES a file path belongs to."""
+    lower = path.lower()
+    categories = []
+
+    if "test" in lower:
+        categories.append("test")
+    if "test" in lower or "spec" in lower:
+        categories.append("test_or_spec")
+    if any(ci in lower for ci in CI_MARKERS):
+        categories.append("ci")
+    if any(ci in lower for ci in CI_MARKERS_NO_TRAVIS):
+        categories.append("ci_no_travis")
+    if "dockerfile" in lower or "docker-compose" in lower:
+        categories.append("docker")
+    if any(d in lower for d in DOC_MARKERS):
+        categories.append("docs")
+    if path.startswith("docs/") or path.startswith("documentation/"):
+        categories.append("docs_root")
+
+    return categories
+
+
+@dataclass
+class RepoFeatures:
+    """Signals extracted once per repository analysis."""
+    total_files: int = 0
+    path_counts: dict[str, int] = field(default_factory=dict)  # category -> file count
+    readme_length: int = 0
+    readme_lower: str = ""
+    readme_sections: list[str] = field(default_factory=list)  # README_SECTIONS present as "## <title>"
+    primary_language: str = "Unknown"
+    languages_breakdown: dict[str, float] = field(default_factory=dict)  # by file extension
+    language_bytes: dict[str, int] = field(default_factory=dict)  # as reported by GitHub
+    is_fork: bool = False
+    created_year: Optional[int] = None
+    version: int = FEATURES_VERSION
+
+    def count(self, category: str) -> int:
+        """Number of files in a path category."""
+        return self.path_counts.get(category, 0)
+
+    def has_section(self, *titles: str) -> bool:
+        """True if the README contains "## <title>" for any of the titles (from README_SECTIONS)."""
+        return any(title in self.readme_sections for title in titles)
+
+
+def extract_repo_features(metadata: Optional[dict], content: Optional[dict]) -> RepoFeatures:
+    """
+    Build RepoFeatures from RepoMetadata/RepoContent dicts.
+
+    Path counts come from the fetcher's whole-tree statistics when present,
+    otherwise from the (possibly sampled) file_tree.
+    """
+    metadata = metadata or {}
+    content = content or {}
+
+    tree_stats = content.get("tree_stats") or {}
+    path_counts = dict(tree_stats.get("counts") or {})
+    missing = [category for category in PATH_CATEGORIES if category not in path_counts]
+    if missing:
+        # No whole-tree count (or one cached before the category existed)
+        path_counts.update(dict.fromkeys(missing, 0))
+        for path in content.get("file_tree", []):
+            for category in categorize_path(path):
+                if category in missing:
+                    path_counts[category] += 1
+
+    readme = content.get("readme") or ""
+    created_at = metadata.get("created_at") or ""
+
+    return RepoFeatures(
+        total_files=tree_stats.get("total_files", content.get("total_files", len(content.get("file_tree", [])))),
+        path_counts=path_counts,
+        readme_length=len(readme),
+        readme_lower=readme.lower(),
+        readme_sections=[title for title in README_SECTIONS if f"## {title}" in readme],
+        primary_language=metadata.get("language") or "Unknown",
+        languages_breakdown=content.get("languages_breakdown", {}),
+        language_bytes=metadata.get("languages", {}),
+        is_fork=metadata.get("is_fork", False),
+        created_year=int(created_at[:4]) if created_at[:4].isdigit() else None,
+    )
+
+
+def get_repo_features(github_analysis: Optional[dict]) -> RepoFeatures:
+    """
+    Get the precomputed features from a GitHubAnalysis dict.
+
+    Falls back to extracting them when the caller did not precompute, or
+    when they were cached by an older FEATURES_VERSION.
+    """
+    github_analysis = github_analysis or {}
+    features = github_analysis.get("features")
+    if isinstance(features, RepoFeatures):
+        return features
+    if features and features.get("version") == FEATURES_VERSION:
+        return RepoFeatures(**features)
+    return extract_repo_features(github_analysis.get("metadata"), github_analysis.get("content"))
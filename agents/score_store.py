@@ -0,0 +1,285 @@
+"""
+Score Store - Per-agent scores of every stored evaluation as columns, for pool-wide re-ranking.
+
+Changing weights used to mean re-synthesizing evaluations one dict at a
+time. The store keeps one row per evaluation (agent scores in scoring.AGENTS
+order on a 0-10 scale, integrity severity code, stored overall score), so
+re-weighting the whole pool is one matrix-vector product plus a top-K
+partition.
+
+Rows are upserted as evaluations are saved or upgraded and persisted to
+data/score_store, loaded on first use:
+
+    scores.bin   fixed-size (scores, severity, stored overall) records
+    ids.txt      evaluation id per row
+    meta.json    committed row count
+
+Each upsert appends new rows and rewrites changed rows in place.
+
+One process writes the store at a time: the API server and rescore.py claim
+it with claim_score_store() (owner.pid) and refuse to run while another live
+process holds it.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import psutil
+
+from scoring import AGENTS, agent_scores, overall_scores, recommend, severity_code, severity_of, SEVERITIES, weight_vector
+
+SCORE_STORE_DIR = Path(__file__).parent.parent / "data" / "score_store"
+
+# One row on disk: agent scores, severity code, stored overall score
+RECORD_DTYPE = np.dtype([("scores", "<f4", (len(AGENTS),)), ("severity", "i1"), ("stored_overall", "<f4")])
+
+
+class ScoreStoreBusy(RuntimeError):
+    """Another live process holds the score store."""
+
+
+def claim_score_store(store_dir: Path = SCORE_STORE_DIR) -> None:
+    """
+    Claim the score store for this process until it exits.
+
+    Raises:
+        ScoreStoreBusy: if another live process holds it
+    """
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    owner_path = store_dir / "owner.pid"
+    while True:
+        try:
+            fd = os.open(owner_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                owner = int(owner_path.read_text().strip())
+            except (OSError, ValueError):
+                owner = 0
+            if owner == os.getpid():
+                return
+            if owner and psutil.pid_exists(owner):
+                raise ScoreStoreBusy(f"score store {store_dir} is held by process {owner}")
+            # Left behind by a process that died
+            try:
+                owner_path.unlink()
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        atexit.register(_release_score_store, owner_path)
+        return
+
+
+def _release_score_store(owner_path: Path) -> None:
+    try:
+        if int(owner_path.read_text().strip()) == os.getpid():
+            owner_path.unlink()
+    except (OSError, ValueError):
+        pass
+
+
+class ScoreStore:
+    """
+    Columnar agent scores keyed by evaluation id.
+    """
+
+    def __init__(self, store_dir: Path = SCORE_STORE_DIR):
+        self.store_dir = Path(store_dir)
+        self._lock = threading.Lock()
+        self.ids: List[str] = []
+        # Column buffers with spare capacity; rows [0, len(ids)) are in use
+        self._scores = np.zeros((0, len(AGENTS)), dtype=np.float32)
+        self._severity = np.zeros(0, dtype=np.int8)
+        self._stored_overall = np.zeros(0, dtype=np.float32)
+        self._rows: Dict[str, int] = {}
+        self._saved_count = 0
+        self._load()
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._scores[:len(self.ids)]
+
+    @property
+    def severity(self) -> np.ndarray:
+        return self._severity[:len(self.ids)]
+
+    @property
+    def stored_overall(self) -> np.ndarray:
+        return self._stored_overall[:len(self.ids)]
+
+    def _load(self) -> None:
+        try:
+            with open(self.store_dir / "meta.json") as f:
+                count = json.load(f)["count"]
+            with open(self.store_dir / "ids.txt") as f:
+                ids = f.read().splitlines()[:count]
+            records = np.fromfile(self.store_dir / "scores.bin", dtype=RECORD_DTYPE, count=count)
+        except (OSError, ValueError, KeyError):
+            return
+        if len(ids) != count or len(records) != count:
+            print("> [ScoreStore] Store files are incomplete; re-adding saved evaluations", file=sys.stderr)
+            return
+        self._reserve(count)
+        self.ids = ids
+        self._scores[:count] = records["scores"]
+        self._severity[:count] = records["severity"]
+        self._stored_overall[:count] = records["stored_overall"]
+        self._rows = {eval_id: row for row, eval_id in enumerate(ids)}
+        self._saved_count = count
+        # Drop rows appended after the last committed save
+        with open(self.store_dir / "scores.bin", "r+b") as f:
+            f.truncate(count * RECORD_DTYPE.itemsize)
+        with open(self.store_dir / "ids.txt", "w") as f:
+            f.writelines(eval_id + "\n" for eval_id in ids)
+        print(f"> [ScoreStore] Loaded {count} evaluations", file=sys.stderr)
+
+    def _reserve(self, rows: int) -> None:
+        """Grow the column buffers (doubling) to hold rows. Caller holds the lock."""
+        if rows <= len(self._scores):
+            return
+        capacity = max(rows, 2 * len(self._scores), 64)
+        count = len(self.ids)
+        scores = np.zeros((capacity, len(AGENTS)), dtype=np.float32)
+        severity = np.zeros(capacity, dtype=np.int8)
+        stored_overall = np.zeros(capacity, dtype=np.float32)
+        scores[:count], severity[:count], stored_overall[:count] = self.scores, self.severity, self.stored_overall
+        self._scores, self._severity, self._stored_overall = scores, severity, stored_overall
+
+    def _records(self, rows: np.ndarray) -> np.ndarray:
+        records = np.empty(len(rows), dtype=RECORD_DTYPE)
+        records["scores"] = self._scores[rows]
+        records["severity"] = self._severity[rows]
+        records["stored_overall"] = self._stored_overall[rows]
+        return records
+
+    def _save(self, changed: Iterable[int]) -> None:
+        """
+        Persist changed rows, then new ids, then meta.json (the row count that commits them). Caller holds the lock.
+
+        New rows are appended and existing rows rewritten in place, so a save
+        costs the rows it touches rather than the whole store.
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        count = len(self.ids)
+        records_path = self.store_dir / "scores.bin"
+        if self._saved_count == 0:
+            tmp_path = self.store_dir / "scores.bin.tmp"
+            self._records(np.arange(count)).tofile(tmp_path)
+            tmp_path.replace(records_path)
+            tmp_path = self.store_dir / "ids.txt.tmp"
+            with open(tmp_path, "w") as f:
+                f.writelines(eval_id + "\n" for eval_id in self.ids)
+            tmp_path.replace(self.store_dir / "ids.txt")
+        else:
+            with open(records_path, "r+b") as f:
+                for row in sorted(row for row in changed if row < self._saved_count):
+                    f.seek(row * RECORD_DTYPE.itemsize)
+                    f.write(self._records(np.array([row])).tobytes())
+                f.seek(self._saved_count * RECORD_DTYPE.itemsize)
+                f.write(self._records(np.arange(self._saved_count, count)).tobytes())
+            with open(self.store_dir / "ids.txt", "a") as f:
+                f.writelines(eval_id + "\n" for eval_id in self.ids[self._saved_count:])
+        tmp_path = self.store_dir / "meta.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"count": count}, f)
+        tmp_path.replace(self.store_dir / "meta.json")
+        self._saved_count = count
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, eval_id: str) -> bool:
+        return eval_id in self._rows
+
+    def upsert_many(self, evaluations: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Add or replace rows from (eval_id, saved evaluation) pairs; persists once."""
+        changed = set()
+        with self._lock:
+            for eval_id, evaluation in evaluations:
+                agents = evaluation.get("agents", {})
+                scores = agent_scores(agents)
+                row = self._rows.get(eval_id)
+                if row is None:
+                    row = len(self.ids)
+                    self._reserve(row + 1)
+                    self._rows[eval_id] = row
+                    self.ids.append(eval_id)
+                self._scores[row] = [scores[agent] for agent in AGENTS]
+                self._severity[row] = severity_code(severity_of(agents))
+                self._stored_overall[row] = float(evaluation.get("final", {}).get("overall_score", 0.0))
+                changed.add(row)
+            if changed:
+                self._save(changed)
+        return len(changed)
+
+    def upsert(self, eval_id: str, evaluation: Dict[str, Any]) -> None:
+        """Add or replace one evaluation's row."""
+        self.upsert_many([(eval_id, evaluation)])
+
+    def rerank(self, weights: Dict[str, float], k: int = 20, min_integrity: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Top-k evaluations under new agent weights.
+
+        Args:
+            weights: Agent weights (normalized to sum to 1)
+            k: Results to return
+            min_integrity: Drop candidates whose integrity score is lower
+
+        Returns:
+            Dicts with eval_id, overall_score (re-weighted), stored_overall_score,
+            recommendation and score_breakdown
+        """
+        vector = weight_vector(weights)
+        if vector.sum() > 0:
+            vector = vector / vector.sum()
+        # Snapshot under the lock: upserts write rows in place. ids is append-only,
+        # so rows of the snapshot keep their ids.
+        with self._lock:
+            scores, severity, stored = self.scores.copy(), self.severity.copy(), self.stored_overall.copy()
+            ids = self.ids
+
+        overall = overall_scores(scores, vector, severity)
+        if min_integrity is not None:
+            overall = np.where(scores[:, 0] >= min_integrity, overall, -np.inf)
+        k = min(k, int(np.isfinite(overall).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-overall, k - 1)[:k]
+        top = top[np.argsort(-overall[top])]
+
+        results = []
+        for row in top:
+            recommendation, _ = recommend(float(overall[row]), float(scores[row, 0]), SEVERITIES[severity[row]])
+            results.append({
+                "eval_id": ids[row],
+                "overall_score": round(float(overall[row]), 1),
+                "stored_overall_score": round(float(stored[row]), 1),
+                "recommendation": recommendation,
+                "score_breakdown": {agent: round(float(scores[row, i]), 1) for i, agent in enumerate(AGENTS)},
+            })
+        return results
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"evaluations": len(self.ids)}
+
+
+_score_store: Optional[ScoreStore] = None
+_store_lock = threading.Lock()
+
+
+def get_score_store() -> ScoreStore:
+    """Get or load the global score store"""
+    global _score_store
+    with _store_lock:
+        if _score_store is None:
+            _score_store = ScoreStore()
+        return _score_store
@@ -0,0 +1,137 @@
+"""
+Scoring - Turns per-agent scores into the final evaluation score and recommendation.
+
+Used one candidate at a time by the API server (synthesize) and for a whole
+pool at once by the score store (overall_scores), so both apply the same
+agent order, defaults for missing agents, integrity penalties and thresholds.
+
+Every final block is stamped with SCORING_VERSION, a fingerprint of the job
+weight profiles, penalties and thresholds, so evaluations scored under older
+rules can be found and re-scored (see rescore.py).
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from weight_calculator import DEFAULT_WEIGHTS, JOB_PROFILES
+
+# Column order of score matrices and weight vectors
+AGENTS = ("integrity", "code_quality", "uniqueness", "relevance", "cp")
+# Score used when an agent result is missing (0-10 scale)
+DEFAULT_SCORES = {"integrity": 5.0, "code_quality": 5.0, "uniqueness": 5.0, "relevance": 5.0, "cp": 0.0}
+
+# Integrity cheater severities that cost points (index = severity code; any
+# other reported severity is code 0)
+SEVERITIES = ("none", "high", "critical")
+SEVERITY_PENALTIES = {"high": 2.0, "critical": 5.0}
+
+# Recommendation thresholds
+PASS_SCORE = 7.0
+PASS_MIN_INTEGRITY = 6.0
+WAITLIST_SCORE = 5.0
+WAITLIST_MIN_INTEGRITY = 4.0
+
+
+
+def _scoring_version() -> str:
+    """Short hash of every setting that changes a final score or recommendation."""
+    settings = {
+        "profiles": {name: [profile["patterns"], profile["weights"].as_dict()] for name, profile in JOB_PROFILES.items()},
+        "default_weights": DEFAULT_WEIGHTS.as_dict(),
+        "default_scores": DEFAULT_SCORES,
+        "penalties": SEVERITY_PENALTIES,
+        "thresholds": [PASS_SCORE, PASS_MIN_INTEGRITY, WAITLIST_SCORE, WAITLIST_MIN_INTEGRITY],
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:12]
+
+
+SCORING_VERSION = _scoring_version()
+
+_PENALTY_BY_CODE = np.array([SEVERITY_PENALTIES.get(s, 0.0) for s in SEVERITIES], dtype=np.float32)
+
+
+def agent_scores(agents: Dict[str, Any]) -> Dict[str, float]:
+    """Each agent's score on a 0-10 scale (code_quality may report 0-100)."""
+    scores = {}
+    for agent in AGENTS:
+        score = (agents.get(agent) or {}).get("score")
+        score = DEFAULT_SCORES[agent] if score is None else float(score)
+        if agent == "code_quality" and score > 10:
+            score = score / 10
+        scores[agent] = score
+    return scores
+
+
+def severity_of(agents: Dict[str, Any]) -> str:
+    """Integrity cheater severity as reported ('none' when missing)."""
+    return (agents.get("integrity") or {}).get("cheater_severity", "none")
+
+
+def severity_code(severity: str) -> int:
+    """Index into SEVERITIES (0 for severities without a penalty)."""
+    return SEVERITIES.index(severity) if severity in SEVERITIES else 0
+
+
+def recommend(overall_score: float, integrity_score: float, severity: str) -> Tuple[str, str]:
+    """(recommendation, reasoning) for a penalized overall score."""
+    if severity == "critical":
+        return "REJECT", f"FLAGGED: Critical integrity issues detected. Score: {overall_score:.1f}/10"
+    if severity == "high":
+        if overall_score >= WAITLIST_SCORE:
+            return "WAITLIST", f"Manual review required: Integrity concerns. Score: {overall_score:.1f}/10"
+        return "REJECT", f"Does not meet standards with integrity issues. Score: {overall_score:.1f}/10"
+    if overall_score >= PASS_SCORE and integrity_score >= PASS_MIN_INTEGRITY:
+        return "PASS", f"Strong candidate with overall score of {overall_score:.1f}/10"
+    if overall_score >= WAITLIST_SCORE and integrity_score >= WAITLIST_MIN_INTEGRITY:
+        return "WAITLIST", f"Potential candidate with overall score of {overall_score:.1f}/10"
+    return "REJECT", f"Does not meet standards with overall score of {overall_score:.1f}/10"
+
+
+def weight_vector(weights: Dict[str, float]) -> np.ndarray:
+    """Weights in AGENTS order (agents missing from the dict get 0)."""
+    return np.array([float(weights.get(agent, 0.0)) for agent in AGENTS], dtype=np.float32)
+
+
+def overall_scores(scores: np.ndarray, weights: np.ndarray, severity_codes: np.ndarray) -> np.ndarray:
+    """
+    Penalized overall scores for a (candidates, agents) score matrix.
+
+    Vectorized equivalent of the overall_score synthesize() computes.
+    """
+    return np.maximum(0.0, scores @ weights - _PENALTY_BY_CODE[severity_codes])
+
+
+def synthesize(agents: Dict[str, Any], weight_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Final evaluation block from agent results.
+
+    Args:
+        agents: Agent results by name
+        weight_info: weight_calculator.calculate_weights() output
+
+    Returns:
+        overall_score, recommendation, reasoning, score_breakdown,
+        weights_used, job_type_detected, cheater_severity, scoring_version
+    """
+    scores = agent_scores(agents)
+    weights = weight_info["weights"]
+    severity = severity_of(agents)
+
+    overall_score = sum(scores[agent] * weights.get(agent, 0.0) for agent in AGENTS)
+    if severity in SEVERITY_PENALTIES:
+        overall_score = max(0.0, overall_score - SEVERITY_PENALTIES[severity])
+    recommendation, reasoning = recommend(overall_score, scores["integrity"], severity)
+
+    return {
+        "overall_score": round(overall_score, 1),
+        "recommendation": recommendation,
+        "reasoning": reasoning,
+        "score_breakdown": {agent: round(scores[agent], 1) for agent in AGENTS},
+        "weights_used": weights,
+        "job_type_detected": weight_info.get("job_type", "general"),
+        "cheater_severity": severity,
+        "scoring_version": SCORING_VERSION,
+    }
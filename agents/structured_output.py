@@ -0,0 +1,102 @@
+"""
+Structured Output - JSON schema parsing and validation for LLM verdicts.
+
+Agents declare the JSON schema of the verdict they expect and pass it to
+HybridModelClient.chat(schema=...). Ollama constrains decoding to that schema
+via its "format" option; the reply is still parsed and checked here because
+older Ollama builds ignore schemas and the heuristic backend is free-form.
+
+Only the subset of JSON Schema the agents use is supported: type, properties,
+required, enum, minimum/maximum and items.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+}
+
+# Replies are echoed back in the repair prompt; keep it bounded
+MAX_REPAIR_ECHO_CHARS = 1000
+
+
+def validate(value: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """
+    Validate a value against a (subset) JSON schema.
+
+    Returns:
+        List of human-readable errors, empty when the value is valid
+    """
+    expected = schema.get("type")
+    if expected and not _TYPE_CHECKS[expected](value):
+        return [f"{path}: expected {expected}, got {type(value).__name__}"]
+
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+    if "minimum" in schema and value < schema["minimum"]:
+        errors.append(f"{path}: {value} is below minimum {schema['minimum']}")
+    if "maximum" in schema and value > schema["maximum"]:
+        errors.append(f"{path}: {value} is above maximum {schema['maximum']}")
+
+    if expected == "object":
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}: missing required property '{key}'")
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                errors.extend(validate(value[key], subschema, f"{path}.{key}"))
+    elif expected == "array" and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+
+    return errors
+
+
+def parse_structured(text: str, schema: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Parse a model reply and validate it against a schema.
+
+    Tolerates prose around the object (only the outermost braces are parsed).
+
+    Returns:
+        Tuple of (parsed value or None, list of errors)
+    """
+    text = (text or "").strip()
+    try:
+        value = json.loads(text)
+    except ValueError:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return None, ["reply is not JSON"]
+        try:
+            value = json.loads(text[start:end + 1])
+        except ValueError as e:
+            return None, [f"reply is not valid JSON: {e}"]
+
+    errors = validate(value, schema)
+    return (None, errors) if errors else (value, [])
+
+
+def build_repair_prompt(prompt: str, reply: str, errors: List[str], schema: Dict[str, Any]) -> str:
+    """Prompt asking the model to fix a reply that failed validation."""
+    return f"""{prompt}
+
+Your previous reply did not match the required JSON schema.
+
+Previous reply:
+{(reply or '')[:MAX_REPAIR_ECHO_CHARS]}
+
+Problems:
+{chr(10).join('- ' + e for e in errors[:10])}
+
+Schema:
+{json.dumps(schema)}
+
+Return ONLY the corrected JSON object."""
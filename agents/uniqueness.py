@@ -15,6 +15,8 @@ from typing import Optional
 
 import structlog
 
+from repo_features import RepoFeatures, get_repo_features
+
 logger = structlog.get_logger(__name__)
 
 # Common tutorial/clone project patterns
@@ -57,7 +59,7 @@ ORIGINAL_PATTERNS = {
 }
 
 
-def analyze_readme_originality(readme: str) -> tuple[float, list[str]]:
+def analyze_readme_originality(features: RepoFeatures) -> tuple[float, list[str]]:
     """
     Analyze README content for originality signals.
     
@@ -67,7 +69,7 @@ def analyze_readme_originality(readme: str) -> tuple[float, list[str]]:
     findings = []
     delta = 0.0
     
-    readme_lower = readme.lower()
+    readme_lower = features.readme_lower
     
     # Negative signals
     if "following tutorial" in readme_lower or "followed tutorial" in readme_lower:
@@ -100,22 +102,22 @@ def analyze_readme_originality(readme: str) -> tuple[float, list[str]]:
         findings.append("Patent mentioned")
     
     # Check for detailed technical sections
-    if "## Architecture" in readme or "## Design" in readme:
+    if features.has_section("Architecture", "Design"):
         delta += 0.5
         findings.append("Has architecture documentation")
     
-    if "## API" in readme or "## Endpoints" in readme:
+    if features.has_section("API", "Endpoints"):
         delta += 0.3
         findings.append("Has API documentation")
     
-    if len(readme) > 2000:
+    if features.readme_length > 2000:
         delta += 0.5
         findings.append("Comprehensive documentation")
     
     return delta, findings
 
 
-def analyze_file_structure(file_tree: list[str]) -> tuple[float, list[str]]:
+def analyze_file_structure(features: RepoFeatures) -> tuple[float, list[str]]:
     """
     Analyze file structure for originality signals.
     
@@ -125,7 +127,7 @@ def analyze_file_structure(file_tree: list[str]) -> tuple[float, list[str]]:
     findings = []
     delta = 0.0
     
-    file_count = len(file_tree)
+    file_count = features.total_files
     
     # Very small projects are suspicious
     if file_count < 5:
@@ -139,26 +141,23 @@ def analyze_file_structure(file_tree: list[str]) -> tuple[float, list[str]]:
         findings.append(f"Large codebase ({file_count} files)")
     
     # Check for test files (indicates maturity)
-    test_files = [f for f in file_tree if "test" in f.lower() or "spec" in f.lower()]
-    if test_files:
+    test_count = features.count("test_or_spec")
+    if test_count:
         delta += 0.5
-        findings.append(f"Has test suite ({len(test_files)} test files)")
+        findings.append(f"Has test suite ({test_count} test files)")
     
     # Check for CI/CD
-    ci_files = [f for f in file_tree if any(ci in f.lower() for ci in [".github/workflows", "jenkinsfile", ".gitlab-ci"])]
-    if ci_files:
+    if features.count("ci_no_travis"):
         delta += 0.5
         findings.append("Has CI/CD configuration")
     
     # Check for Docker (production-readiness)
-    docker_files = [f for f in file_tree if "dockerfile" in f.lower() or "docker-compose" in f.lower()]
-    if docker_files:
+    if features.count("docker"):
         delta += 0.3
         findings.append("Has Docker configuration")
     
     # Check for documentation
-    doc_dirs = [f for f in file_tree if f.startswith("docs/") or f.startswith("documentation/")]
-    if doc_dirs:
+    if features.count("docs_root"):
         delta += 0.5
         findings.append("Has documentation directory")
     
@@ -189,12 +188,14 @@ def analyze_project_uniqueness(
     
     metadata = {}
     content = {}
+    features = None
     repo_name = "Unknown"
     
     # Get GitHub data
     if github_analysis:
         metadata = github_analysis.get("metadata", {})
         content = github_analysis.get("content", {})
+        features = get_repo_features(github_analysis)
         repo_name = metadata.get("name", "Unknown")
     elif github_url:
         try:
@@ -212,6 +213,7 @@ def analyze_project_uniqueness(
             
             metadata = analysis.metadata.__dict__ if analysis.metadata else {}
             content = analysis.content.__dict__ if analysis.content else {}
+            features = analysis.features
             repo_name = metadata.get("name", "Unknown")
             
         except ImportError:
@@ -268,17 +270,17 @@ def analyze_project_uniqueness(
     
     # Analyze content if available
     if content:
+        features = features or get_repo_features({"metadata": metadata, "content": content})
+        
         # README analysis
-        readme = content.get("readme", "")
-        if readme:
-            readme_delta, readme_findings = analyze_readme_originality(readme)
+        if features.readme_length:
+            readme_delta, readme_findings = analyze_readme_originality(features)
             score += readme_delta
             findings.extend(readme_findings)
         
         # File structure analysis
-        file_tree = content.get("file_tree", [])
-        if file_tree:
-            struct_delta, struct_findings = analyze_file_structure(file_tree)
+        if features.total_files:
+            struct_delta, struct_findings = analyze_file_structure(features)
             score += struct_delta
             findings.extend(struct_findings)
     
@@ -2,25 +2,44 @@
 Enhanced Uniqueness Agent - AI-Powered Project Analysis
 """
 
-import json
 import sys
 import os
-import re
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from hybrid_model import get_hybrid_client
+from hedging import hedged_call
+from model_router import DIFFICULTY_EASY
 
-def analyze_project_uniqueness(repo_url, use_ai_models=True, ollama_available=True):
-    """Analyze project uniqueness using AI if available"""
+UNIQUENESS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "number", "minimum": 0, "maximum": 10},
+        "reasoning": {"type": "string"},
+        "project_type": {"type": "string", "enum": ["Tutorial", "Original", "Fork", "Library"]},
+    },
+    "required": ["score", "reasoning", "project_type"],
+}
+
+def analyze_project_uniqueness(repo_url, use_ai_models=True, ollama_available=True, fused_verdict=None, on_upgrade=None):
+    """Analyze project uniqueness using AI if available (reusing a fused verdict section when given)"""
     print(f"> [UniquenessEnhanced] Analyzing: {repo_url}", file=sys.stderr)
     
     # AI Analysis
     if use_ai_models and ollama_available:
-        try:
-            client = get_hybrid_client()
-            prompt = f"""You are a startup CTO. Analyze this GitHub project URL and name to determine if it is a generic tutorial clone (like 'weather-app', 'todo-list', 'netflix-clone') or an original, complex engineering project.
+        section = (fused_verdict or {}).get('sections', {}).get('uniqueness')
+        if section is not None:
+            result = dict(section)
+            result['agent'] = 'uniqueness'
+            result['backend_used'] = fused_verdict.get('backend', 'ollama')
+            result['mode'] = 'fused'
+            return result
+        
+        def ask_llm():
+            try:
+                client = get_hybrid_client()
+                prompt = f"""You are a startup CTO. Analyze this GitHub project URL and name to determine if it is a generic tutorial clone (like 'weather-app', 'todo-list', 'netflix-clone') or an original, complex engineering project.
 
 Project: {repo_url}
 
@@ -31,19 +50,28 @@ Return ONLY a valid JSON object:
     "project_type": "<Tutorial|Original|Fork|Library>"
 }}
 """
-            response = client.chat(prompt, max_tokens=200, temperature=0.3)
-            
-            text = response.get('response', '{}')
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                result['agent'] = 'uniqueness'
-                result['backend_used'] = response.get('backend', 'ollama')
-                return result
+                response = client.chat(
+                    prompt, max_tokens=200, temperature=0.3, stop_at_json=True, schema=UNIQUENESS_SCHEMA,
+                    difficulty=DIFFICULTY_EASY,  # classification from the repo name alone
+                )
                 
-        except Exception as e:
-            print(f"> [UniquenessEnhanced] AI failed: {e}", file=sys.stderr)
+                result = response.get('parsed')
+                if result is not None:
+                    result['agent'] = 'uniqueness'
+                    result['backend_used'] = response.get('backend', 'ollama')
+                    return result
+                    
+            except Exception as e:
+                print(f"> [UniquenessEnhanced] AI failed: {e}", file=sys.stderr)
+            return None
+        
+        return hedged_call('uniqueness', ask_llm, lambda: _heuristic_uniqueness(repo_url), on_upgrade)
+
+    return _heuristic_uniqueness(repo_url)
+
 
+def _heuristic_uniqueness(repo_url):
+    """Repo-name heuristics used when the LLM is unavailable or too slow"""
     # Fallback Heuristics
     score = 6.0
     reasoning = "Moderate uniqueness (heuristic)"
@@ -10,16 +10,19 @@ import sys
 import tempfile
 import re
 import time
+import uuid
 import glob
 import threading
 from pathlib import Path
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from urllib.parse import urlparse
-import urllib.request
 
 # Add agents to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'agents'))
 
+from file_utils import write_json_atomic
+
 # Global state for batch processing
 batch_state = {
     'is_running': False,
@@ -33,6 +36,140 @@ batch_state = {
     }
 }
 batch_lock = threading.Lock()
+# Guards evaluation results that late (hedged) LLM answers may upgrade
+evaluation_lock = threading.Lock()
+# Candidates evaluated at once during a batch (lets their LLM calls be packed)
+BATCH_WORKERS = 4
+
+
+def extract_pdf_text(resume_path):
+    """Extract text AND hyperlinks from a PDF resume"""
+    try:
+        import fitz
+        doc = fitz.open(resume_path)
+        text = ""
+        links = []
+        
+        for page in doc:
+            text += page.get_text()
+            
+            # Extract hyperlinks from the page
+            for link in page.get_links():
+                if link.get("uri"):
+                    links.append(link["uri"])
+        
+        doc.close()
+        
+        # Append found links to the text so they can be extracted
+        if links:
+            text += "\n\n--- EXTRACTED LINKS ---\n"
+            text += "\n".join(links)
+            print(f"Extracted {len(links)} hyperlinks from PDF")
+        
+        return text[:8000]  # Increased limit
+    except ImportError:
+        print("PyMuPDF not installed - using placeholder")
+        return "Resume text extraction requires: pip install pymupdf"
+    except Exception as e:
+        print(f"PDF extraction failed: {e}")
+        return f"Could not extract text: {e}"
+
+
+def index_candidate(eval_id, resume_path, overall_score=None):
+    """Add a saved evaluation's resume to the candidate search indexes (runs in the background)"""
+    def run():
+        if not resume_path or not os.path.exists(resume_path):
+            return
+        resume_text = extract_pdf_text(resume_path)
+        try:
+            from lexical_index import get_lexical_index
+            get_lexical_index().add(eval_id, resume_text, overall_score)
+        except Exception as e:
+            print(f"Keyword indexing failed for {eval_id}: {e}")
+        try:
+            from candidate_index import get_candidate_index
+            semantic = get_candidate_index()
+            if semantic.add_text(eval_id, resume_text):
+                semantic.flush()
+                print(f"Indexed {eval_id} for candidate search")
+        except Exception as e:
+            print(f"Candidate indexing failed for {eval_id}: {e}")
+    threading.Thread(target=run, name=f"index-{eval_id}", daemon=True).start()
+
+
+def update_indexed_scores(eval_id, evaluation):
+    """Record a saved (or re-synthesized) evaluation's scores in the score store and keyword index"""
+    try:
+        from score_store import get_score_store
+        get_score_store().upsert(eval_id, evaluation)
+        from lexical_index import get_lexical_index
+        get_lexical_index().update_score(eval_id, evaluation['final'].get('overall_score'))
+    except Exception as e:
+        print(f"Index score update failed for {eval_id}: {e}")
+
+
+def saved_resumes(evals_dir="data/evaluations"):
+    """Yield (eval_id, resume text) for saved evaluations whose resume file still exists"""
+    for eval_file in sorted(Path(evals_dir).glob("*.json")):
+        with open(eval_file) as f:
+            evaluation = json.load(f)
+        resume_path = evaluation.get('candidate', {}).get('resume_path')
+        if resume_path and os.path.exists(resume_path):
+            yield eval_file.stem, extract_pdf_text(resume_path)
+
+
+def backfill_candidate_index(evals_dir="data/evaluations"):
+    """Load the candidate search indexes and score store, and add saved evaluations they don't have yet"""
+    try:
+        from score_store import get_score_store
+        store = get_score_store()
+        def missing_scores():
+            for eval_file in sorted(Path(evals_dir).glob("*.json")):
+                if eval_file.stem not in store:
+                    with open(eval_file) as f:
+                        yield eval_file.stem, json.load(f)
+        added = store.upsert_many(missing_scores())
+        if added:
+            print(f"Score store: added {added} saved evaluations ({len(store)} total)")
+    except Exception as e:
+        print(f"Score store backfill failed: {e}")
+    
+    try:
+        from candidate_index import get_candidate_index, rebuild_candidate_index
+        from lexical_index import get_lexical_index
+        from hybrid_model import get_hybrid_client
+        lexical = get_lexical_index()
+        semantic = get_candidate_index()
+        embeddings_available = get_hybrid_client().is_available()
+        embed_model = get_hybrid_client().embed_model
+        if embeddings_available and semantic.model and semantic.model != embed_model:
+            # Old vectors keep serving searches until every resume is re-embedded
+            print(f"Candidate index was built with {semantic.model}; re-embedding saved resumes with {embed_model}")
+            semantic = rebuild_candidate_index(saved_resumes(evals_dir), embed_model)
+        added = {'keyword': 0, 'semantic': 0}
+        for eval_file in sorted(Path(evals_dir).glob("*.json")):
+            eval_id = eval_file.stem
+            needs_semantic = embeddings_available and eval_id not in semantic
+            if eval_id in lexical and not needs_semantic:
+                continue
+            with open(eval_file) as f:
+                evaluation = json.load(f)
+            resume_path = evaluation.get('candidate', {}).get('resume_path')
+            if not resume_path or not os.path.exists(resume_path):
+                continue
+            resume_text = extract_pdf_text(resume_path)
+            if eval_id not in lexical:
+                lexical.add(eval_id, resume_text, evaluation.get('final', {}).get('overall_score'))
+                added['keyword'] += 1
+            if needs_semantic:
+                added['semantic'] += semantic.add_text(eval_id, resume_text)
+        semantic.flush()
+        if any(added.values()):
+            print(f"Candidate indexes: added {added['keyword']} keyword / {added['semantic']} semantic entries "
+                  f"({len(lexical)} / {len(semantic)} total)")
+    except Exception as e:
+        print(f"Candidate index backfill stopped: {e}")
+
 
 class CandidateAIHandler(BaseHTTPRequestHandler):
     """Local API handler for CandidateAI"""
@@ -87,6 +224,21 @@ h1 { color: #10b981; }
 <p>Get candidate leaderboard</p>
 </div>
 
+<div class="endpoint">
+<h3><span class="method">POST</span> /api/candidates/search</h3>
+<p>Find previously evaluated candidates that fit a job description</p>
+</div>
+
+<div class="endpoint">
+<h3><span class="method">POST</span> /api/candidates/keywords</h3>
+<p>Keyword (BM25) search over evaluated resumes with score filters</p>
+</div>
+
+<div class="endpoint">
+<h3><span class="method">POST</span> /api/candidates/rerank</h3>
+<p>Re-rank all evaluated candidates under new agent weights or a job description</p>
+</div>
+
 <p style="color: #666; margin-top: 30px;">Frontend: <a href="http://localhost:3000" style="color: #3b82f6;">http://localhost:3000</a></p>
 </body>
 </html>
@@ -129,6 +281,18 @@ h1 { color: #10b981; }
             self.handle_stop_evaluation()
             return
         
+        if path == '/api/candidates/search':
+            self.handle_candidate_search()
+            return
+        
+        if path == '/api/candidates/keywords':
+            self.handle_keyword_search()
+            return
+        
+        if path == '/api/candidates/rerank':
+            self.handle_rerank()
+            return
+        
         self.send_response(404)
         self.send_cors_headers()
         self.end_headers()
@@ -225,6 +389,7 @@ h1 { color: #10b981; }
                             "role": "Software Engineer", # Inferred or default
                             "overall_score": final.get("overall_score", 0),
                             "status": final.get("recommendation", "REVIEW"),
+                            "scoring_version": final.get("scoring_version"),
                             "date": time.strftime('%Y-%m-%d', time.localtime(eval_file.stat().st_mtime)),
                             "skills": ["Python", "React", "Node.js"], # Placeholder or extracted
                             "details": {
@@ -250,6 +415,144 @@ h1 { color: #10b981; }
             self.send_response(500)
             self.end_headers()
     
+    def handle_candidate_search(self):
+        """Top-K previously evaluated candidates for a job description, with their stored scores"""
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(content_length) or b'{}')
+            job_description = data.get('job_description', '')
+            k = int(data.get('k', 10))
+            if not job_description:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_cors_headers()
+                self.end_headers()
+                self.wfile.write(json.dumps({'error': 'job_description is required'}).encode())
+                return
+            
+            from candidate_index import get_candidate_index, search_candidates
+            started = time.perf_counter()
+            matches = search_candidates(job_description, k)
+            search_ms = round((time.perf_counter() - started) * 1000, 1)
+            
+            candidates = []
+            for eval_id, similarity in matches:
+                try:
+                    with open(f"data/evaluations/{eval_id}.json") as f:
+                        evaluation = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                final = evaluation.get('final', {})
+                candidates.append({
+                    'id': eval_id,
+                    'similarity': similarity,
+                    'candidate': evaluation.get('candidate', {}),
+                    'overall_score': final.get('overall_score', 0),
+                    'recommendation': final.get('recommendation', 'REVIEW'),
+                    'agent_scores': {name: result.get('score') for name, result in evaluation.get('agents', {}).items()},
+                })
+            
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_cors_headers()
+            self.end_headers()
+            self.wfile.write(json.dumps({
+                'candidates': candidates,
+                'search_ms': search_ms,
+                'index': get_candidate_index().status()
+            }).encode())
+            
+        except Exception as e:
+            print(f"Candidate search error: {e}")
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_cors_headers()
+            self.end_headers()
+            self.wfile.write(json.dumps({'error': str(e)}).encode())
+    
+    def handle_keyword_search(self):
+        """BM25 keyword search over evaluated resumes, filtered/blended with stored overall scores"""
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(content_length) or b'{}')
+            query = data.get('query', '')
+            if not query:
+                self.send_response(400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_cors_headers()
+                self.end_headers()
+                self.wfile.write(json.dumps({'error': 'query is required'}).encode())
+                return
+            
+            from lexical_index import get_lexical_index
+            index = get_lexical_index()
+            started = time.perf_counter()
+            candidates = index.search(
+                query,
+                k=int(data.get('k', 20)),
+                require_all=data.get('match', 'all') == 'all',
+                min_score=data.get('min_score'),
+                max_score=data.get('max_score'),
+                score_weight=float(data.get('score_weight', 0.0)),
+            )
+            search_ms = round((time.perf_counter() - started) * 1000, 1)
+            
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_cors_headers()
+            self.end_headers()
+            self.wfile.write(json.dumps({
+                'candidates': candidates,
+                'search_ms': search_ms,
+                'index': index.status()
+            }).encode())
+            
+        except Exception as e:
+            print(f"Keyword search error: {e}")
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_cors_headers()
+            self.end_headers()
+            self.wfile.write(json.dumps({'error': str(e)}).encode())
+    
+    def handle_rerank(self):
+        """Top-K of all stored evaluations under a weight vector (or a job description's weights)"""
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(content_length) or b'{}')
+            weights = data.get('weights')
+            job_type = 'custom'
+            if not weights:
+                from weight_calculator import calculate_weights
+                weight_info = calculate_weights(data.get('job_description', ''))
+                weights, job_type = weight_info['weights'], weight_info['job_type']
+            
+            from score_store import get_score_store
+            store = get_score_store()
+            started = time.perf_counter()
+            candidates = store.rerank(weights, k=int(data.get('k', 20)), min_integrity=data.get('min_integrity'))
+            rerank_ms = round((time.perf_counter() - started) * 1000, 1)
+            
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_cors_headers()
+            self.end_headers()
+            self.wfile.write(json.dumps({
+                'candidates': candidates,
+                'weights': weights,
+                'job_type': job_type,
+                'rerank_ms': rerank_ms,
+                'store': store.status()
+            }).encode())
+            
+        except Exception as e:
+            print(f"Rerank error: {e}")
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_cors_headers()
+            self.end_headers()
+            self.wfile.write(json.dumps({'error': str(e)}).encode())
+    
     def handle_batch_progress(self):
         """Get current batch processing progress"""
         global batch_state
@@ -322,17 +625,27 @@ h1 { color: #10b981; }
                 self.wfile.write(json.dumps({'error': 'No resumes provided'}).encode())
                 return
             
-            # Initialize batch state
+            # Initialize batch state (one batch at a time now that requests are threaded)
             with batch_lock:
-                batch_state['is_running'] = True
-                batch_state['should_stop'] = False
-                batch_state['current_index'] = 0
-                batch_state['total_count'] = len(resumes)
-                batch_state['results'] = {
-                    'leaderboard': [],
-                    'eliminated': [],
-                    'flagged': []
-                }
+                already_running = batch_state['is_running']
+                if not already_running:
+                    batch_state['is_running'] = True
+                    batch_state['should_stop'] = False
+                    batch_state['current_index'] = 0
+                    batch_state['total_count'] = len(resumes)
+                    batch_state['results'] = {
+                        'leaderboard': [],
+                        'eliminated': [],
+                        'flagged': []
+                    }
+            
+            if already_running:
+                self.send_response(409)
+                self.send_header('Content-Type', 'application/json')
+                self.send_cors_headers()
+                self.end_headers()
+                self.wfile.write(json.dumps({'error': 'A batch is already running'}).encode())
+                return
             
             print(f"\n{'='*50}")
             print(f"Starting BATCH evaluation: {len(resumes)} resumes")
@@ -341,22 +654,22 @@ h1 { color: #10b981; }
             # Save resumes and process
             os.makedirs("data/uploads/batch", exist_ok=True)
             
-            for i, resume_data in enumerate(resumes):
+            def process_resume(i, resume_data):
                 # Check for stop request
                 with batch_lock:
                     if batch_state['should_stop']:
-                        print("Batch stopped by user")
-                        break
-                    batch_state['current_index'] = i + 1
+                        return
+                    batch_state['current_index'] += 1
+                    position = batch_state['current_index']
                 
-                filename = f"batch_{int(time.time())}_{i}_{resume_data['filename']}"
+                filename = f"batch_{int(time.time())}_{uuid.uuid4().hex[:12]}_{i}_{resume_data['filename']}"
                 resume_path = os.path.join("data/uploads/batch", filename)
                 
                 try:
                     with open(resume_path, "wb") as f:
                         f.write(resume_data['content'])
                     
-                    print(f"\n[{i+1}/{len(resumes)}] Processing: {resume_data['filename']}")
+                    print(f"\n[{position}/{len(resumes)}] Processing: {resume_data['filename']}")
                     
                     # Extract GitHub URL from resume
                     resume_text = self.extract_resume_text(resume_path)
@@ -373,10 +686,12 @@ h1 { color: #10b981; }
                                 'category': 'NO_GITHUB'
                             })
                         print(f"  -> ELIMINATED: No GitHub URL")
-                        continue
+                        return
                     
-                    # Run full evaluation
-                    result = self.run_evaluation(resume_path, job_description, github_url, None, None)
+                    # Run full evaluation (LLM calls queue behind interactive requests)
+                    from llm_scheduler import request_priority, PRIORITY_BATCH
+                    with request_priority(PRIORITY_BATCH):
+                        result = self.run_evaluation(resume_path, job_description, github_url, None, None, batched=True)
                     
                     # Determine category based on results
                     final = result.get('final', {})
@@ -420,6 +735,17 @@ h1 { color: #10b981; }
                             'category': 'ERROR'
                         })
             
+            # Candidates run concurrently so their LLM requests can be batched;
+            # warm pings keep the models loaded through gaps between candidates
+            from hybrid_model import get_hybrid_client
+            with get_hybrid_client().keep_warm():
+                with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+                    list(pool.map(process_resume, range(len(resumes)), resumes))
+            
+            with batch_lock:
+                if batch_state['should_stop']:
+                    print("Batch stopped by user")
+            
             # Sort leaderboard by score
             with batch_lock:
                 batch_state['results']['leaderboard'].sort(
@@ -490,7 +816,7 @@ h1 { color: #10b981; }
                     # Create data dir if not exists
                     os.makedirs("data/uploads", exist_ok=True)
                     
-                    filename = f"resume_{int(time.time())}.pdf"
+                    filename = f"resume_{int(time.time())}_{uuid.uuid4().hex[:12]}.pdf"
                     resume_path = os.path.join("data/uploads", filename)
                     
                     with open(resume_path, "wb") as f:
@@ -505,26 +831,31 @@ h1 { color: #10b981; }
                 codeforces_username = data.get('codeforces_username', '')
                 resume_path = data.get('resume_path', '')
             
-            # Run evaluation
-            result = self.run_evaluation(resume_path, job_description, github_url, leetcode_username, codeforces_username)
+            # Run evaluation (provisional agent results are upgraded in save_path later)
+            # Unique per request: concurrent evaluations must not share an upload or save_path
+            eval_id = f"eval_{int(time.time())}_{uuid.uuid4().hex[:12]}"
+            save_path = f"data/evaluations/{eval_id}.json"
+            result = self.run_evaluation(resume_path, job_description, github_url, leetcode_username, codeforces_username, save_path=save_path)
             
             # Save evaluation result
             try:
                 os.makedirs("data/evaluations", exist_ok=True)
-                eval_id = f"eval_{int(time.time())}"
-                save_path = f"data/evaluations/{eval_id}.json"
-                with open(save_path, "w") as f:
-                    json.dump(result, f, indent=2)
+                with evaluation_lock:
+                    write_json_atomic(save_path, result)
                 print(f"Saved evaluation to {save_path}")
+                update_indexed_scores(eval_id, result)
+                index_candidate(eval_id, resume_path, result['final'].get('overall_score'))
             except Exception as e:
                 print(f"Failed to save evaluation: {e}")
             
             # Send response
+            with evaluation_lock:
+                body = json.dumps(result).encode()
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.send_cors_headers()
             self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
+            self.wfile.write(body)
             
         except Exception as e:
             print(f"Evaluation error: {e}")
@@ -536,8 +867,13 @@ h1 { color: #10b981; }
             self.end_headers()
             self.wfile.write(json.dumps({'error': str(e)}).encode())
     
-    def run_evaluation(self, resume_path, job_description, github_url, leetcode_username=None, codeforces_username=None):
-        """Run candidate evaluation using local agents + Ollama"""
+    def run_evaluation(self, resume_path, job_description, github_url, leetcode_username=None, codeforces_username=None, batched=False, save_path=None):
+        """Run candidate evaluation using local agents + Ollama (batched: part of a batch run)
+        
+        LLM agents that miss their latency SLO return a provisional heuristic
+        result; when the LLM answer arrives it replaces that result, the final
+        score is recomputed and the evaluation saved at save_path is rewritten.
+        """
         print(f"\n{'='*50}")
         print("Starting CandidateAI Evaluation")
         print(f"Resume: {resume_path}")
@@ -554,12 +890,14 @@ h1 { color: #10b981; }
                 'codeforces_username': codeforces_username
             },
             'agents': {},
+            'provisional': [],
             'final': {}
         }
         
         # Try to use hybrid model client
         client = None
         use_ai = False
+        started_at = time.time()
         try:
             from hybrid_model import get_hybrid_client
             client = get_hybrid_client()
@@ -596,10 +934,8 @@ h1 { color: #10b981; }
                 from github_fetcher import analyze_github_repo
                 analysis = analyze_github_repo(github_url)
                 if not analysis.error:
-                    github_analysis = {
-                        'metadata': analysis.metadata.__dict__ if analysis.metadata else {},
-                        'content': analysis.content.__dict__ if analysis.content else {}
-                    }
+                    github_analysis = analysis.as_dict()
+                    results['candidate']['github_cache'] = 'stale' if analysis.stale else ('hit' if analysis.cached else 'miss')
                     print(f"Fetched GitHub data: {analysis.metadata.full_name if analysis.metadata else 'N/A'}")
                 else:
                     print(f"GitHub fetch warning: {analysis.error}")
@@ -616,15 +952,42 @@ h1 { color: #10b981; }
         print("Running Uniqueness Analysis...")
         results['agents']['uniqueness'] = self.run_uniqueness_agent(github_url, github_analysis, client, use_ai)
         
+        def upgrade(agent):
+            def apply(result):
+                with evaluation_lock:
+                    results['agents'][agent] = result
+                    results['provisional'] = [name for name in results['provisional'] if name != agent]
+                    results['final'] = self.synthesize_results(results['agents'], job_description)
+                    if save_path and os.path.exists(save_path):
+                        write_json_atomic(save_path, results)
+                        update_indexed_scores(Path(save_path).stem, results)
+                print(f"Upgraded {agent} with late LLM result")
+            return apply
+        
         print("Running Relevance Analysis...")
-        results['agents']['relevance'] = self.run_relevance_agent(resume_text, job_description, client, use_ai)
+        results['agents']['relevance'] = self.run_relevance_agent(
+            resume_text, job_description, client, use_ai, batched, on_upgrade=upgrade('relevance')
+        )
         
         print("Running Competitive Programming Analysis...")
         results['agents']['cp'] = self.run_cp_agent(leetcode_username, codeforces_username, resume_text, client, use_ai)
         
         # Synthesize final result
         print("\nSynthesizing results...")
-        results['final'] = self.synthesize_results(results['agents'], job_description)
+        with evaluation_lock:
+            results['provisional'] = [name for name, result in results['agents'].items() if result.get('provisional')]
+            results['final'] = self.synthesize_results(results['agents'], job_description)
+        
+        # Record which LLM backend served this evaluation
+        if client:
+            degraded = client.degraded_periods_between(started_at, time.time())
+            results['llm'] = {
+                'backend': client.selected_backend,
+                'model': client.selected_model,
+                'available_at_start': use_ai,
+                'degraded': bool(degraded),
+                'degraded_periods': degraded
+            }
         
         print(f"\nFinal Score: {results['final']['overall_score']}/10")
         print(f"Recommendation: {results['final']['recommendation']}\n")
@@ -633,35 +996,7 @@ h1 { color: #10b981; }
     
     def extract_resume_text(self, resume_path):
         """Extract text AND hyperlinks from PDF resume"""
-        try:
-            import fitz
-            doc = fitz.open(resume_path)
-            text = ""
-            links = []
-            
-            for page in doc:
-                text += page.get_text()
-                
-                # Extract hyperlinks from the page
-                for link in page.get_links():
-                    if link.get("uri"):
-                        links.append(link["uri"])
-            
-            doc.close()
-            
-            # Append found links to the text so they can be extracted
-            if links:
-                text += "\n\n--- EXTRACTED LINKS ---\n"
-                text += "\n".join(links)
-                print(f"Extracted {len(links)} hyperlinks from PDF")
-            
-            return text[:8000]  # Increased limit
-        except ImportError:
-            print("PyMuPDF not installed - using placeholder")
-            return "Resume text extraction requires: pip install pymupdf"
-        except Exception as e:
-            print(f"PDF extraction failed: {e}")
-            return f"Could not extract text: {e}"
+        return extract_pdf_text(resume_path)
     
     def extract_github_from_resume(self, resume_text):
         """Extract GitHub URL (profile or repo) from resume text"""
@@ -788,24 +1123,51 @@ h1 { color: #10b981; }
             print(f"Uniqueness agent failed: {e}")
             return {'agent': 'uniqueness', 'score': 5.0, 'reasoning': f'Analysis failed: {e}', 'backend': 'fallback'}
     
-    def run_relevance_agent(self, resume_text, job_description, client, use_ai):
-        """Run job relevance analysis"""
+    def run_relevance_agent(self, resume_text, job_description, client, use_ai, batched=False, on_upgrade=None):
+        """Run job relevance analysis (batched: pack with other candidates for the same job)"""
         if use_ai and client and job_description:
-            prompt = f"""Does this candidate match the job?
-Job: {job_description[:400]}
-Resume: {resume_text[:400]}
+            from relevance_embedding import RELEVANCE_MODE, evaluate_embedding_relevance
+            if RELEVANCE_MODE == 'embedding':
+                result = evaluate_embedding_relevance(resume_text, job_description)
+                if result is not None:
+                    return result
+            
+            from relevance_gate import gate_relevance
+            from hedging import hedged_call
+            heuristic, gating = gate_relevance(resume_text, job_description)
+            heuristic = {**heuristic, 'backend': 'heuristics', 'gating': gating}
+            if not gating['use_llm']:
+                print(f"Relevance LLM skipped: {gating['reason']}")
+                return heuristic
+            
+            from prompt_compaction import (
+                compact_job, compact_resume, SHORT_JOB_TOKEN_BUDGET, SHORT_RESUME_TOKEN_BUDGET
+            )
+            job = f"""Does this candidate match the job?
+Job: {compact_job(job_description, SHORT_JOB_TOKEN_BUDGET)}"""
+            candidate = f"Resume: {compact_resume(resume_text, SHORT_RESUME_TOKEN_BUDGET, job_description)}"
+            prompt = f"""{job}
+{candidate}
 Respond with ONLY valid JSON: {{"score": 7.0, "reasoning": "match explanation"}}"""
             
-            try:
-                response = client.chat(prompt, max_tokens=200)
-                text = response.get('response', '{}')
-                json_match = re.search(r'\{[^}]+\}', text)
-                if json_match:
-                    result = json.loads(json_match.group())
-                    result['agent'] = 'relevance'
-                    return result
-            except Exception as e:
-                print(f"Relevance AI failed: {e}")
+            def ask_llm():
+                try:
+                    from relevance_enhanced import RELEVANCE_SUMMARY_SCHEMA
+                    if batched:
+                        response = client.chat_batched(job, candidate, RELEVANCE_SUMMARY_SCHEMA, max_tokens=200)
+                    else:
+                        response = client.chat(prompt, max_tokens=200, stop_at_json=True, schema=RELEVANCE_SUMMARY_SCHEMA)
+                    result = response.get('parsed')
+                    if result is not None:
+                        result['agent'] = 'relevance'
+                        result['gating'] = gating
+                        return result
+                except Exception as e:
+                    print(f"Relevance AI failed: {e}")
+                return None
+            
+            # Interactive calls wait at most the relevance SLO, then go provisional
+            return hedged_call('relevance', ask_llm, lambda: heuristic, on_upgrade)
         
         return {'agent': 'relevance', 'score': 7.0, 'reasoning': 'Candidate appears relevant (heuristic)', 'backend': 'heuristics'}
     
@@ -823,16 +1185,6 @@ Respond with ONLY valid JSON: {{"score": 7.0, "reasoning": "match explanation"}}
     def synthesize_results(self, agents, job_description=""):
         """Synthesize all agent results into final evaluation with dynamic weights"""
         
-        # Get scores from agents
-        integrity_score = float(agents.get('integrity', {}).get('score', 5))
-        quality_score = float(agents.get('code_quality', {}).get('score', 50))
-        # Normalize code_quality if on 0-100 scale
-        if quality_score > 10:
-            quality_score = quality_score / 10
-        uniqueness_score = float(agents.get('uniqueness', {}).get('score', 5))
-        relevance_score = float(agents.get('relevance', {}).get('score', 5))
-        cp_score = float(agents.get('cp', {}).get('score', 0))
-        
         # Calculate dynamic weights based on job description
         weight_info = {"weights": {"integrity": 0.15, "code_quality": 0.30, "uniqueness": 0.20, "relevance": 0.25, "cp": 0.10}, "job_type": "general"}
         try:
@@ -842,70 +1194,23 @@ Respond with ONLY valid JSON: {{"score": 7.0, "reasoning": "match explanation"}}
         except Exception as e:
             print(f"Weight calculator failed, using defaults: {e}")
         
-        weights = weight_info["weights"]
-        
-        # Calculate weighted score
-        overall_score = (
-            integrity_score * weights.get('integrity', 0.15) +
-            quality_score * weights.get('code_quality', 0.30) +
-            uniqueness_score * weights.get('uniqueness', 0.20) +
-            relevance_score * weights.get('relevance', 0.25) +
-            cp_score * weights.get('cp', 0.10)
-        )
-        
-        # Check for cheater severity - auto-reject if critical
-        cheater_severity = agents.get('integrity', {}).get('cheater_severity', 'none')
-        if cheater_severity == 'critical':
-            overall_score = max(0, overall_score - 5)
-            recommendation = 'REJECT'
-            reasoning = f'FLAGGED: Critical integrity issues detected. Score: {overall_score:.1f}/10'
-        elif cheater_severity == 'high':
-            overall_score = max(0, overall_score - 2)
-            if overall_score >= 5.0:
-                recommendation = 'WAITLIST'
-                reasoning = f'Manual review required: Integrity concerns. Score: {overall_score:.1f}/10'
-            else:
-                recommendation = 'REJECT'
-                reasoning = f'Does not meet standards with integrity issues. Score: {overall_score:.1f}/10'
-        elif overall_score >= 7.0 and integrity_score >= 6.0:
-            recommendation = 'PASS'
-            reasoning = f'Strong candidate with overall score of {overall_score:.1f}/10'
-        elif overall_score >= 5.0 and integrity_score >= 4.0:
-            recommendation = 'WAITLIST'
-            reasoning = f'Potential candidate with overall score of {overall_score:.1f}/10'
-        else:
-            recommendation = 'REJECT'
-            reasoning = f'Does not meet standards with overall score of {overall_score:.1f}/10'
-        
-        return {
-            'overall_score': round(overall_score, 1),
-            'recommendation': recommendation,
-            'reasoning': reasoning,
-            'score_breakdown': {
-                'integrity': round(integrity_score, 1),
-                'code_quality': round(quality_score, 1),
-                'uniqueness': round(uniqueness_score, 1),
-                'relevance': round(relevance_score, 1),
-                'cp': round(cp_score, 1)
-            },
-            'weights_used': weights,
-            'job_type_detected': weight_info.get('job_type', 'general'),
-            'cheater_severity': cheater_severity
-        }
+        from scoring import synthesize
+        return synthesize(agents, weight_info)
     
     def check_system_status(self):
         """Check if Ollama is running"""
         status = {'backend': True, 'ollama': False, 'models': [], 'ready': True}
         
         try:
-            req = urllib.request.Request('http://localhost:11434/api/tags')
-            with urllib.request.urlopen(req, timeout=2) as response:
-                if response.status == 200:
-                    data = json.loads(response.read())
-                    status['ollama'] = True
-                    status['models'] = [m['name'] for m in data.get('models', [])]
-        except:
-            pass
+            from hybrid_model import get_hybrid_client
+            client = get_hybrid_client()
+            # Models pulled on any healthy Ollama endpoint, as last probed
+            # (the pool re-probes unhealthy endpoints in the background)
+            status['models'] = client.pool.models()
+            status['ollama'] = any(endpoint['healthy'] for endpoint in client.pool.status()['endpoints'])
+            status['llm'] = client.health_status()
+        except Exception as e:
+            status['llm'] = {'error': str(e)}
         
         return status
     
@@ -915,7 +1220,27 @@ Respond with ONLY valid JSON: {{"score": 7.0, "reasoning": "match explanation"}}
 
 def run_server(port=3001):
     """Start the API server"""
-    server = HTTPServer(('0.0.0.0', port), CandidateAIHandler)
+    # Threaded so status polls and interactive evaluations are served during a batch
+    server = ThreadingHTTPServer(('0.0.0.0', port), CandidateAIHandler)
+    
+    # Probe Ollama and load the model now, not inside the first request
+    ollama_url = os.environ.get('OLLAMA_BASE_URLS') or os.environ.get('OLLAMA_BASE_URL', 'http://localhost:11434')
+    try:
+        from hybrid_model import get_hybrid_client
+        get_hybrid_client()
+    except Exception as e:
+        print(f"Could not start model probe: {e}")
+    
+    # The server writes the score store; offline re-scoring must wait until it stops
+    try:
+        from score_store import ScoreStoreBusy, claim_score_store
+        claim_score_store()
+    except ScoreStoreBusy as e:
+        print(f"Cannot start: {e} (is rescore.py running?)")
+        sys.exit(1)
+    
+    # Load the candidate search indexes off the startup path
+    threading.Thread(target=backfill_candidate_index, name="candidate-index", daemon=True).start()
     
     print(f"""
 ╔══════════════════════════════════════════════════════════════╗
@@ -923,7 +1248,7 @@ def run_server(port=3001):
 ╠══════════════════════════════════════════════════════════════╣
 ║  Server running on: http://localhost:{port}                    ║
 ║  Frontend:          http://localhost:3000                    ║
-║  Ollama:            http://localhost:11434                   ║
+║  Ollama:            {ollama_url:<41}║
 ╚══════════════════════════════════════════════════════════════╝
     """)
     
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fused single-prompt evaluation vs per-agent prompts.
+
+Runs the same candidate through both LLM modes against the configured Ollama
+and reports wall-clock latency and the number of model calls per candidate.
+Each run uses an empty response cache so every generation is real.
+
+Usage:
+    python benchmarks/fused_llm.py [--runs 3] [--resume examples/sample_resume.txt]
+                                   [--job examples/sample_job.txt] [--repo URL]
+
+Set OLLAMA_BASE_URL to benchmark against benchmarks/mock_ollama.py instead
+of a real model.
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from hybrid_model import get_hybrid_client
+from llm_cache import LLMResponseCache
+from fused_evaluation import evaluate_candidate_fused
+from relevance_enhanced import evaluate_job_relevance
+from code_quality_enhanced import scan_code_quality
+from uniqueness_enhanced import analyze_project_uniqueness
+
+# Reviewed by the code_quality section in both modes
+CODE_SAMPLE_PATH = os.path.join(ROOT, "agents", "structured_output.py")
+
+
+def run_per_agent(resume_text, job_description, code_sample, repo_url):
+    """Current mode: one prompt per agent."""
+    evaluate_job_relevance(resume_text, job_description)
+    scan_code_quality(code_sample)
+    analyze_project_uniqueness(repo_url)
+
+
+def run_fused(resume_text, job_description, code_sample, repo_url):
+    """Fused mode: one prompt, agents read their section."""
+    verdict = evaluate_candidate_fused(
+        resume_text=resume_text,
+        job_description=job_description,
+        code_sample=code_sample,
+        repo_url=repo_url,
+    )
+    evaluate_job_relevance(resume_text, job_description, fused_verdict=verdict)
+    scan_code_quality(code_sample, fused_verdict=verdict)
+    analyze_project_uniqueness(repo_url, fused_verdict=verdict)
+
+
+def measure(mode_fn, runs, *args):
+    """Time a mode over several runs, each with a fresh response cache."""
+    client = get_hybrid_client()
+    timings, calls = [], []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            client.cache = LLMResponseCache(cache_dir=cache_dir)
+            started = time.perf_counter()
+            mode_fn(*args)
+            timings.append((time.perf_counter() - started) * 1000)
+            calls.append(client.cache.stats["misses"])
+    return {
+        "runs": runs,
+        "mean_ms": round(statistics.mean(timings), 1),
+        "median_ms": round(statistics.median(timings), 1),
+        "min_ms": round(min(timings), 1),
+        "llm_calls_per_candidate": max(calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fused vs per-agent LLM evaluation")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--resume", default=os.path.join(ROOT, "examples", "sample_resume.txt"))
+    parser.add_argument("--job", default=os.path.join(ROOT, "examples", "sample_job.txt"))
+    parser.add_argument("--repo", default="https://github.com/cheese-cakee/GitVerified.ai")
+    args = parser.parse_args()
+
+    with open(args.resume) as f:
+        resume_text = f.read()
+    with open(args.job) as f:
+        job_description = f.read()
+    with open(CODE_SAMPLE_PATH) as f:
+        code_sample = f.read()
+
+    client = get_hybrid_client()
+    if not client.is_available():
+        print("Ollama is not available; nothing to benchmark", file=sys.stderr)
+        sys.exit(1)
+
+    inputs = (resume_text, job_description, code_sample, args.repo)
+    report = {
+        "model": client.selected_model,
+        "per_agent": measure(run_per_agent, args.runs, *inputs),
+        "fused": measure(run_fused, args.runs, *inputs),
+    }
+    report["speedup"] = round(report["per_agent"]["median_ms"] / max(report["fused"]["median_ms"], 0.1), 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
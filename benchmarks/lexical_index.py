@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BM25 lexical index build time and query latency.
+
+Builds a throwaway index of synthetic resumes (skill terms with a Zipf-like
+frequency plus filler vocabulary, with random overall scores) and times
+keyword queries of different selectivity.
+
+Usage:
+    python benchmarks/lexical_index.py [--docs 100000] [--words 250] [--queries 50]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from lexical_index import LexicalIndex
+from prompt_compaction import SKILL_TERMS
+
+FILLER_WORDS = 5000
+BUILD_CHUNK = 5000
+
+QUERIES = [
+    ("common term", {"query": "python"}),
+    ("two rare terms, all", {"query": "kafka rust"}),
+    ("three terms, any", {"query": "kubernetes terraform golang", "require_all": False}),
+    ("two terms + score filter", {"query": "react typescript", "min_score": 7.0}),
+    ("blended ranking", {"query": "pytorch nlp", "score_weight": 0.3}),
+]
+
+
+def synthetic_resumes(count, words, seed=0):
+    """Yield (eval_id, text, overall_score) documents."""
+    rng = random.Random(seed)
+    skills = sorted(SKILL_TERMS)
+    skill_weights = [1.0 / (rank + 1) for rank in range(len(skills))]
+    filler = [f"word{i}" for i in range(FILLER_WORDS)]
+    for i in range(count):
+        tokens = rng.choices(skills, skill_weights, k=words // 10) + rng.choices(filler, k=words - words // 10)
+        yield f"eval_{i}", " ".join(tokens), round(rng.uniform(0, 10), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the BM25 lexical index")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=250, help="tokens per synthetic resume")
+    parser.add_argument("--queries", type=int, default=50, help="runs per query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = LexicalIndex(os.path.join(tmp, "index.sqlite3"))
+        started = time.perf_counter()
+        documents = synthetic_resumes(args.docs, args.words)
+        while index.add_many(next(documents) for _ in range(min(BUILD_CHUNK, args.docs - len(index)))):
+            pass
+        build_seconds = time.perf_counter() - started
+        # Fold the WAL into the database so the size is the index's own
+        index._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        size_mb = sum(
+            os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)
+        ) / 1024 / 1024
+        print(f"Built {len(index)} docs in {build_seconds:.1f}s "
+              f"({len(index) / build_seconds:.0f} docs/s, {size_mb:.0f} MB on disk, "
+              f"{size_mb * 1024 / len(index):.1f} KB/doc)")
+
+        # Reopening loads the in-memory mirror of doc lengths and scores
+        started = time.perf_counter()
+        index = LexicalIndex(os.path.join(tmp, "index.sqlite3"))
+        print(f"Reopened in {(time.perf_counter() - started) * 1000:.0f}ms\n")
+
+        print(f"{'query':<28}{'results':>9}{'p50 ms':>10}{'p95 ms':>10}")
+        for label, params in QUERIES:
+            timings = []
+            for _ in range(args.queries):
+                started = time.perf_counter()
+                results = index.search(k=20, **params)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{label:<28}{len(results):>9}{statistics.median(timings):>10.1f}{p95:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
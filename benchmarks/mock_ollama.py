@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Mock Ollama server for benchmarks and load tests.
+
+Implements the endpoints HybridModelClient uses (/api/tags, /api/embed and
+/api/generate, streaming and not) with:
+
+- latency profiles: model load time, time to first token (fixed overhead plus
+  prompt evaluation) and tokens/second, each drawn from a normal
+  distribution around the profile mean
+- a parallelism limit like OLLAMA_NUM_PARALLEL (extra requests queue)
+- failure injection: HTTP 500s, dropped connections and hung requests
+- canned replies that are valid for the request's JSON schema ("format"),
+  or for the agent prompt type when no schema is sent
+- keep_alive: a model idle for longer than the request's keep_alive is
+  unloaded and pays its load time again
+- hashed bag-of-words embeddings, so texts sharing words have a higher
+  cosine similarity
+
+Point the API server or a benchmark at it with OLLAMA_BASE_URL:
+
+    python benchmarks/mock_ollama.py --profile cpu-14b --port 11435
+    OLLAMA_BASE_URL=http://localhost:11435 python api_server.py
+"""
+
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# load_ms: cold model load, ttft_ms: fixed time to first token on top of
+# prompt evaluation at prompt_tokens_per_sec, tokens_per_sec: generation
+PROFILES = {
+    "instant": {"load_ms": 0, "ttft_ms": 0, "prompt_tokens_per_sec": 10 ** 9, "tokens_per_sec": 10 ** 9, "jitter": 0.0},
+    "gpu": {"load_ms": 1500, "ttft_ms": 30, "prompt_tokens_per_sec": 2000, "tokens_per_sec": 60, "jitter": 0.1},
+    "cpu-7b": {"load_ms": 4000, "ttft_ms": 200, "prompt_tokens_per_sec": 60, "tokens_per_sec": 9, "jitter": 0.25},
+    "cpu-14b": {"load_ms": 8000, "ttft_ms": 400, "prompt_tokens_per_sec": 30, "tokens_per_sec": 4, "jitter": 0.25},
+}
+DEFAULT_MODELS = ["qwen2.5-coder:1.5b", "qwen2.5-coder:7b", "qwen2.5-coder:14b", "nomic-embed-text:latest"]
+EMBEDDING_DIM = 256
+# Ollama's default keep_alive when a request doesn't send one
+DEFAULT_KEEP_ALIVE_SECONDS = 300.0
+
+# Canned verdicts by agent prompt (used when the request has no schema)
+CANNED_BY_PROMPT = [
+    ("integrity officer", {"score": 7.5, "reasoning": "Mock: resume reads as authentic.", "flags": []}),
+    ("principal engineer", {"score": 72, "verdict": "ACCEPTABLE", "flags": ["Mock: no tests in snippet"], "security_risk": "LOW"}),
+    ("startup cto", {"score": 6.0, "reasoning": "Mock: moderately original project.", "project_type": "Original"}),
+    ("competitive programming", {"score": 6.5, "reasoning": "Mock: solid fundamentals.", "verdict": "Competent"}),
+    ("technical recruiter", {"score": 7.0, "reasoning": "Mock: good overlap.", "key_skills_match": ["Python"], "missing_skills": []}),
+    ("match the job", {"score": 7.0, "reasoning": "Mock: candidate matches the core requirements."}),
+]
+
+
+def mock_embedding(text: str) -> List[float]:
+    """Unit-length hashed bag-of-words vector for text."""
+    vector = [0.0] * EMBEDDING_DIM
+    for word in text.lower().split():
+        digest = zlib.crc32(word.encode())
+        vector[digest % EMBEDDING_DIM] += 1.0 if digest & 1 << 31 else -1.0
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+def sample_schema(schema: Dict[str, Any], rng: random.Random) -> Any:
+    """A plausible instance of a (subset) JSON schema."""
+    kind = schema.get("type")
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if kind == "object":
+        return {key: sample_schema(sub, rng) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [sample_schema(schema["items"], rng)] if "items" in schema else []
+    if kind == "string":
+        return "Mock reasoning"
+    if kind == "boolean":
+        return True
+    if kind in ("number", "integer"):
+        low, high = schema.get("minimum", 0), schema.get("maximum", 10)
+        value = rng.uniform(low + (high - low) * 0.4, low + (high - low) * 0.8)
+        return int(value) if kind == "integer" else round(value, 1)
+    return None
+
+
+def keep_alive_seconds(value: Any) -> Optional[float]:
+    """Ollama keep_alive ("30m", "90s", "1h" or seconds) in seconds; None keeps the model loaded."""
+    if value is None:
+        return DEFAULT_KEEP_ALIVE_SECONDS
+    if isinstance(value, (int, float)):
+        return None if value < 0 else float(value)
+    units = {"s": 1, "m": 60, "h": 3600}
+    text = str(value).strip()
+    if text and text[-1] in units:
+        seconds = float(text[:-1]) * units[text[-1]]
+    else:
+        seconds = float(text)
+    return None if seconds < 0 else seconds
+
+
+class MockOllama:
+    """
+    Configurable stand-in for an Ollama server.
+    """
+
+    def __init__(
+        self,
+        profile: str = "instant",
+        models=None,
+        num_parallel: int = 1,
+        error_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 60.0,
+        seed: Optional[int] = None,
+        **overrides: float,
+    ):
+        self.profile = {**PROFILES[profile], **{k: v for k, v in overrides.items() if v is not None}}
+        self.models = list(models or DEFAULT_MODELS)
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._slots = threading.Semaphore(max(1, num_parallel))
+        self._loaded: Dict[str, Optional[float]] = {}  # model -> unload time (None = never)
+        self._load_lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "drops": 0, "hangs": 0, "loads": 0}
+
+    def _draw(self, mean: float) -> float:
+        with self._rng_lock:
+            return max(0.0, self.rng.gauss(mean, mean * self.profile["jitter"]))
+
+    def _roll(self, rate: float) -> bool:
+        with self._rng_lock:
+            return self.rng.random() < rate
+
+    def reply_for(self, request: Dict[str, Any]) -> str:
+        """Reply text: schema-valid when a schema is given, else canned by prompt type."""
+        schema = request.get("format")
+        if isinstance(schema, dict):
+            with self._rng_lock:
+                return json.dumps(sample_schema(schema, self.rng))
+        prompt = (request.get("prompt") or "").lower()
+        for marker, canned in CANNED_BY_PROMPT:
+            if marker in prompt:
+                return json.dumps(canned)
+        return "Mock response."
+
+    def load_seconds(self, model: str, keep_alive: Any = None) -> float:
+        """Cold-load cost when the model isn't loaded (first use or keep_alive expired)."""
+        now = time.time()
+        ttl = keep_alive_seconds(keep_alive)
+        with self._load_lock:
+            unload_at = self._loaded.get(model, 0.0)
+            loaded = model in self._loaded and (unload_at is None or now < unload_at)
+            self._loaded[model] = None if ttl is None else now + ttl
+            if loaded:
+                return 0.0
+            self.stats["loads"] += 1
+        return self._draw(self.profile["load_ms"]) / 1000
+
+    def make_handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, obj: Dict[str, Any], status: int = 200):
+                body = json.dumps(obj).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_chunk(self, obj: Dict[str, Any]):
+                line = (json.dumps(obj) + "\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": m} for m in mock.models]})
+                elif self.path == "/mock/stats":
+                    self._send_json(mock.stats)
+                else:
+                    self._send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                if self.path not in ("/api/generate", "/api/embed"):
+                    self._send_json({"error": "not found"}, 404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                mock.stats["requests"] += 1
+
+                model = request.get("model")
+                if model not in mock.models and f"{model}:latest" not in mock.models:
+                    self._send_json({"error": f"model '{model}' not found"}, 404)
+                    return
+                if mock._roll(mock.error_rate):
+                    mock.stats["errors"] += 1
+                    self._send_json({"error": "injected failure"}, 500)
+                    return
+                if mock._roll(mock.drop_rate):
+                    mock.stats["drops"] += 1
+                    self.close_connection = True
+                    return
+                if mock._roll(mock.hang_rate):
+                    mock.stats["hangs"] += 1
+                    time.sleep(mock.hang_seconds)
+                    self.close_connection = True
+                    return
+
+                with mock._slots:
+                    if self.path == "/api/embed":
+                        self._embed(request, model)
+                    else:
+                        self._generate(request, model)
+
+            def _embed(self, request: Dict[str, Any], model: str):
+                inputs = request.get("input") or []
+                if isinstance(inputs, str):
+                    inputs = [inputs]
+                load = mock.load_seconds(model, request.get("keep_alive"))
+                prompt_tokens = sum(len(text) for text in inputs) // 4
+                time.sleep(load + prompt_tokens / mock.profile["prompt_tokens_per_sec"])
+                self._send_json({
+                    "model": model,
+                    "embeddings": [mock_embedding(text) for text in inputs],
+                    "load_duration": int(load * 1e9),
+                })
+
+            def _generate(self, request: Dict[str, Any], model: str):
+                started = time.perf_counter()
+                load = mock.load_seconds(model, request.get("keep_alive"))
+                time.sleep(load)
+
+                # An empty prompt only loads the model
+                if not request.get("prompt"):
+                    self._send_json({"model": model, "response": "", "done": True, "load_duration": int(load * 1e9)})
+                    return
+
+                text = mock.reply_for(request)
+                limit = (request.get("options") or {}).get("num_predict") or 10 ** 9
+                tokens = [text[i:i + 4] for i in range(0, len(text), 4)][:limit]
+                prompt_tokens = len(request["prompt"]) // 4
+                prompt_eval = mock._draw(
+                    mock.profile["ttft_ms"] + 1000 * prompt_tokens / mock.profile["prompt_tokens_per_sec"]
+                ) / 1000
+                per_token = 1.0 / max(mock._draw(mock.profile["tokens_per_sec"]), 0.1)
+                time.sleep(prompt_eval)
+
+                def final(eval_seconds: float) -> Dict[str, Any]:
+                    return {
+                        "model": model,
+                        "done": True,
+                        "total_duration": int((time.perf_counter() - started) * 1e9),
+                        "load_duration": int(load * 1e9),
+                        "prompt_eval_count": prompt_tokens,
+                        "prompt_eval_duration": int(prompt_eval * 1e9),
+                        "eval_count": len(tokens),
+                        "eval_duration": int(eval_seconds * 1e9),
+                    }
+
+                if not request.get("stream", True):
+                    time.sleep(per_token * len(tokens))
+                    self._send_json({**final(per_token * len(tokens)), "response": "".join(tokens)})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    gen_started = time.perf_counter()
+                    for token in tokens:
+                        self._send_chunk({"model": model, "response": token, "done": False})
+                        time.sleep(per_token)
+                    self._send_chunk({**final(time.perf_counter() - gen_started), "response": ""})
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client cancelled the generation
+
+        return Handler
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+        """Serve in a background thread; returns the server (server_address has the port)."""
+        server = ThreadingHTTPServer((host, port), self.make_handler())
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="mock-ollama", daemon=True).start()
+        return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Ollama server with latency profiles")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="cpu-14b")
+    parser.add_argument("--models", default=",".join(DEFAULT_MODELS), help="comma-separated /api/tags models")
+    parser.add_argument("--num-parallel", type=int, default=1)
+    parser.add_argument("--ttft-ms", type=float, help="override the profile's time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, help="override the profile's generation speed")
+    parser.add_argument("--prompt-tokens-per-sec", type=float, help="override the profile's prompt evaluation speed")
+    parser.add_argument("--load-ms", type=float, help="override the profile's model load time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of connections closed without a reply")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction of requests that hang")
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    mock = MockOllama(
+        profile=args.profile,
+        models=[m.strip() for m in args.models.split(",") if m.strip()],
+        num_parallel=args.num_parallel,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed,
+        ttft_ms=args.ttft_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        prompt_tokens_per_sec=args.prompt_tokens_per_sec,
+        load_ms=args.load_ms,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), mock.make_handler())
+    server.daemon_threads = True
+    print(f"Mock Ollama ({args.profile}) on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
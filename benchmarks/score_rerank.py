@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: re-ranking the whole evaluated pool under new weights.
+
+Fills a throwaway score store with synthetic evaluations, checks that its
+vectorized overall scores match scoring.synthesize() on a sample, and times
+ScoreStore.rerank() for custom weight vectors and job-description profiles.
+
+Usage:
+    python benchmarks/score_rerank.py [--candidates 100000] [--runs 50] [--k 20]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from score_store import ScoreStore
+from scoring import synthesize
+from weight_calculator import JOB_PROFILES, DEFAULT_WEIGHTS
+
+SEVERITY_CHOICES = ["none"] * 90 + ["low"] * 5 + ["high"] * 4 + ["critical"]
+
+
+def synthetic_evaluations(count, seed=0):
+    """Yield (eval_id, evaluation) with random agent results."""
+    rng = random.Random(seed)
+    for i in range(count):
+        agents = {
+            "integrity": {"score": rng.uniform(2, 10), "cheater_severity": rng.choice(SEVERITY_CHOICES)},
+            "code_quality": {"score": rng.uniform(20, 100)},
+            "uniqueness": {"score": rng.uniform(0, 10)},
+            "relevance": {"score": rng.uniform(0, 10)},
+            "cp": {"score": rng.uniform(0, 10)},
+        }
+        evaluation = {"agents": agents}
+        evaluation["final"] = synthesize(agents, {"weights": DEFAULT_WEIGHTS.as_dict()})
+        yield f"eval_{i}", evaluation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pool-wide re-ranking")
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ScoreStore(tmp)
+        evaluations = dict(synthetic_evaluations(args.candidates))
+        started = time.perf_counter()
+        store.upsert_many(evaluations.items())
+        print(f"Loaded {len(store)} evaluations in {time.perf_counter() - started:.1f}s")
+
+        # Vectorized scores must agree with the per-candidate synthesis
+        weights = JOB_PROFILES["backend_engineer"]["weights"].as_dict()
+        for result in store.rerank(weights, k=200):
+            expected = synthesize(evaluations[result["eval_id"]]["agents"], {"weights": weights})
+            assert abs(result["overall_score"] - expected["overall_score"]) <= 0.1, (result, expected)
+            assert result["recommendation"] == expected["recommendation"], (result, expected)
+        print("Re-ranked scores match scoring.synthesize()\n")
+
+        rng = random.Random(1)
+        cases = [("profile: " + name, profile["weights"].as_dict()) for name, profile in list(JOB_PROFILES.items())[:3]]
+        cases.append(("random weights", None))
+        print(f"{'weights':<32}{'p50 ms':>10}{'p95 ms':>10}")
+        for label, weights in cases:
+            timings = []
+            for _ in range(args.runs):
+                run_weights = weights or {agent: rng.random() for agent in DEFAULT_WEIGHTS.as_dict()}
+                started = time.perf_counter()
+                store.rerank(run_weights, k=args.k)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{label:<32}{statistics.median(timings):>10.2f}{p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+CandidateAI - Re-score stored evaluations
+Recomputes every saved evaluation's final block from its stored agent results
+under the current weights, penalties and thresholds (no agents, no network)
+
+Evaluations already stamped with the current scoring version are skipped
+unless --force is given. Files are processed in chunks across worker
+processes and rewritten atomically; the score store and keyword index pick up
+the new overall scores. The API server writes the score store too, so stop it
+first (rescore refuses to run while it holds the store, unless
+--no-index-update or --dry-run is given).
+
+Usage:
+    python rescore.py [--evals-dir data/evaluations] [--workers N] [--force] [--dry-run]
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agents'))
+
+from file_utils import write_json_atomic
+from scoring import SCORING_VERSION, synthesize
+
+# Files handed to a worker at once
+CHUNK_SIZE = 200
+# Chunks queued per worker (bounds memory while streaming the directory)
+CHUNKS_IN_FLIGHT_PER_WORKER = 4
+PROGRESS_EVERY_SECONDS = 5.0
+
+
+def _quiet_worker():
+    """Worker initializer: keep per-file weight logging off the console"""
+    import structlog
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+
+@lru_cache(maxsize=1024)
+def _weights_for(job_description):
+    """Weight profile for a job description (most evaluations share a few)"""
+    from weight_calculator import calculate_weights
+    return calculate_weights(job_description)
+
+
+def rescore_file(path, force=False, dry_run=False):
+    """
+    Recompute one evaluation's final block.
+
+    Returns:
+        (eval_id, status, scores) where status is 'current', 'rescored',
+        'changed' (recommendation changed too) or 'error: ...', and scores is
+        the agent scores and new final block of a re-scored evaluation
+    """
+    eval_id = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(path) as f:
+            evaluation = json.load(f)
+        old_final = evaluation.get('final') or {}
+        if old_final.get('scoring_version') == SCORING_VERSION and not force:
+            return eval_id, 'current', None
+
+        job_description = (evaluation.get('candidate') or {}).get('job_description') or ''
+        evaluation['final'] = synthesize(evaluation.get('agents') or {}, _weights_for(job_description))
+        if not dry_run:
+            write_json_atomic(path, evaluation)
+        changed = evaluation['final']['recommendation'] != old_final.get('recommendation')
+        scores = {
+            'agents': {
+                name: {key: result[key] for key in ('score', 'cheater_severity') if key in result}
+                for name, result in (evaluation.get('agents') or {}).items() if isinstance(result, dict)
+            },
+            'final': evaluation['final'],
+        }
+        return eval_id, 'changed' if changed else 'rescored', scores
+    except Exception as e:
+        return eval_id, f'error: {e}', None
+
+
+def rescore_chunk(paths, force, dry_run):
+    """Re-score a chunk of files in a worker"""
+    return [rescore_file(path, force, dry_run) for path in paths]
+
+
+def iter_chunks(evals_dir, size):
+    """Stream evaluation file paths in chunks without listing the directory up front"""
+    chunk = []
+    with os.scandir(evals_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json') and entry.is_file():
+                chunk.append(entry.path)
+                if len(chunk) == size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def update_indexes(rescored):
+    """Write re-scored overall scores into the score store and keyword index"""
+    if not rescored:
+        return
+    try:
+        from score_store import get_score_store
+        get_score_store().upsert_many(rescored)
+        from lexical_index import get_lexical_index
+        lexical = get_lexical_index()
+        for eval_id, evaluation in rescored:
+            lexical.update_score(eval_id, evaluation['final']['overall_score'])
+    except Exception as e:
+        print(f"Index update failed: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored evaluations under the current scoring rules")
+    parser.add_argument("--evals-dir", default="data/evaluations", help="Directory of saved evaluation JSON files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--force", action="store_true", help="Re-score evaluations already on the current version")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--no-index-update", action="store_true", help="Leave the score store and keyword index alone")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.evals_dir):
+        print(f"Evaluations directory not found: {args.evals_dir}")
+        sys.exit(1)
+
+    if not args.dry_run and not args.no_index_update:
+        from score_store import ScoreStoreBusy, claim_score_store
+        try:
+            claim_score_store()
+        except ScoreStoreBusy as e:
+            print(f"Cannot update indexes: {e}. Stop the API server first, or pass --no-index-update.")
+            sys.exit(1)
+
+    print(f"Re-scoring {args.evals_dir} to scoring version {SCORING_VERSION} with {args.workers} workers"
+          + (" (dry run)" if args.dry_run else ""))
+
+    counts = {'current': 0, 'rescored': 0, 'changed': 0, 'error': 0}
+    rescored = []
+    started = last_report = time.perf_counter()
+    chunks = iter_chunks(args.evals_dir, CHUNK_SIZE)
+    max_in_flight = args.workers * CHUNKS_IN_FLIGHT_PER_WORKER
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_quiet_worker) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(rescore_chunk, chunk, args.force, args.dry_run))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for eval_id, status, scores in future.result():
+                    if status.startswith('error'):
+                        counts['error'] += 1
+                        print(f"  {eval_id}: {status}")
+                        continue
+                    counts[status] += 1
+                    if scores is not None:
+                        rescored.append((eval_id, scores))
+
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_EVERY_SECONDS:
+                processed = sum(counts.values())
+                print(f"  {processed} files, {processed / (now - started):.0f} files/s")
+                last_report = now
+
+    elapsed = time.perf_counter() - started
+    processed = sum(counts.values())
+    if not args.dry_run and not args.no_index_update:
+        update_indexes(rescored)
+
+    print(f"\nProcessed {processed} evaluations in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.0f} files/s)")
+    print(f"  Already current:          {counts['current']}")
+    print(f"  Re-scored:                {counts['rescored'] + counts['changed']}")
+    print(f"  Recommendation changed:   {counts['changed']}")
+    print(f"  Errors:                   {counts['error']}")
+    sys.exit(1 if counts['error'] else 0)
+
+
+if __name__ == "__main__":
+    main()